@@ -1,58 +1,52 @@
+import time
+INICIO_PROCESSO = time.perf_counter()  # 🔥 Referência para medir o tempo de inicialização
+
 import sys
 import platform
+import importlib
+import threading
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QComboBox, QLineEdit, QTextEdit, QFileDialog, QHBoxLayout,
-    QGroupBox, QGridLayout, QProgressBar, QFrame
+    QComboBox, QLineEdit, QFileDialog, QHBoxLayout,
+    QGroupBox, QGridLayout, QProgressBar, QFrame, QListWidget, QCheckBox
 )
 from PyQt6.QtCore import Qt, QTimer, QMetaObject
 from PyQt6.QtGui import QIcon
 from functions import *  # Importa o editor de prompts
 from prompt import PromptEditor  # Agora importamos do prompt.py
-from transcritor import TranscricaoThread, calcular_duracao_audio
+from transcritor import TranscricaoThread, FilaTranscricaoThread
+from nucleo_transcricao import calcular_duracao_audio, chave_historico, MODO_PADRAO, MODO_PARALELO, MODO_JANELAS
+from quantizacao import PRECISAO_PADRAO, PRECISAO_INT8
+from visualizador import VisualizadorTranscricao
+from saida import gerar_saida, FORMATOS
+from motores import MOTOR_PADRAO, motores_disponiveis
+from fila_transcricao import adicionar_trabalho, carregar_fila, limpar_finalizados
 from popup import Popup
 import pyperclip  
-import wmi
-from estimador import registrar_transcricao, atualizar_tempo_real, estimar_tempo
+from estimador import estimar_etapas
+from gerenciador_modelos import gerenciador_modelos
+from dispositivos import get_devices
 import platform
 import json
-from py3nvml.py3nvml import nvmlInit, nvmlDeviceGetHandleByIndex, nvmlDeviceGetName, nvmlDeviceGetCount, nvmlShutdown
-
 
-def get_devices():
-    devices = []
+TEMPO_IMPORTACOES = time.perf_counter() - INICIO_PROCESSO
 
-    # Detectar CPU (usando WMI)
-    try:
-        w = wmi.WMI()
-        for cpu in w.Win32_Processor():
-            devices.append(f"CPU: {cpu.Name.strip()}")
-    except Exception as e:
-        print(f"Erro ao detectar CPU: {e}")
-        devices.append("CPU: Erro ao detectar")
 
-    # Detectar GPU (usando NVML)
+def pre_carregar_bibliotecas():
+    """Importa Torch e Whisper em segundo plano, para que a primeira transcrição não espere por elas."""
+    inicio = time.perf_counter()
     try:
-        # Inicializar NVML para detectar GPUs
-        nvmlInit()
-        gpu_count = nvmlDeviceGetCount()
-        for i in range(gpu_count):
-            handle = nvmlDeviceGetHandleByIndex(i)
-            gpu_name = nvmlDeviceGetName(handle)  # Remove .decode("utf-8")
-            devices.append(f"GPU: {gpu_name}")
+        for biblioteca in ("torch", "whisper"):
+            importlib.import_module(biblioteca)  # Só aquece o cache de módulos; o uso real fica no motor
+        print(f"📚 Torch e Whisper carregados em segundo plano em {time.perf_counter() - inicio:.2f} segundos")
     except Exception as e:
-        print(f"Erro ao detectar GPUs: {e}")
-    finally:
-        try:
-            nvmlShutdown()
-        except:
-            pass
-
-    return devices
-
-
+        print(f"⚠️ Erro ao pré-carregar bibliotecas: {e}")
 
 
+def formatar_tempo(segundos):
+    """Formata uma duração em segundos como "X min Y s"."""
+    minutos, segundos = divmod(int(segundos), 60)
+    return f"{minutos} min {segundos} s" if minutos else f"{segundos} s"
 
 
 class TranscriptionApp(QWidget):
@@ -116,10 +110,34 @@ class TranscriptionApp(QWidget):
         self.deviceSelector.addItems(get_devices())
         self.deviceSelector.setFixedWidth(500)
 
+        modeLabel = QLabel("Modo de Execução")
+        self.executionMode = QComboBox()
+        self.executionMode.addItems(["Padrão", "Paralelo (CPU)", "Janelas (memória constante, gravações longas)"])
+        self.executionMode.setFixedWidth(500)
+
+        self.quantizedMode = QCheckBox("Modelo quantizado int8 (somente CPU, mais rápido e com menos memória)")
+        self.vadMode = QCheckBox("Ignorar silêncios longos (decodifica apenas os trechos com fala)")
+        self.vadMode.setChecked(True)
+        self.draftMode = QCheckBox("Rascunho rápido (modelo small) refinado em segundo plano pelo modelo escolhido")
+
+        engineLabel = QLabel("Motor de Inferência")
+        self.engineSelector = QComboBox()
+        nomes_motores = {"whisper": "Whisper (PyTorch)", "ctranslate2": "CTranslate2 (faster-whisper, otimizado para CPU)"}
+        for motor in motores_disponiveis():
+            self.engineSelector.addItem(nomes_motores.get(motor, motor), motor)
+        self.engineSelector.setFixedWidth(500)
+
         settingsLayout.addWidget(whisperLabel, 0, 0)
         settingsLayout.addWidget(self.whisperModel, 0, 1)
         settingsLayout.addWidget(deviceLabel, 1, 0)
         settingsLayout.addWidget(self.deviceSelector, 1, 1)
+        settingsLayout.addWidget(modeLabel, 2, 0)
+        settingsLayout.addWidget(self.executionMode, 2, 1)
+        settingsLayout.addWidget(self.quantizedMode, 3, 1)
+        settingsLayout.addWidget(engineLabel, 4, 0)
+        settingsLayout.addWidget(self.engineSelector, 4, 1)
+        settingsLayout.addWidget(self.vadMode, 5, 1)
+        settingsLayout.addWidget(self.draftMode, 6, 1)
         settingsGroup.setLayout(settingsLayout)
         mainLayout.addWidget(settingsGroup)
 
@@ -146,15 +164,42 @@ class TranscriptionApp(QWidget):
 
         # Texto da Transcrição
         transcriptionLabel = QLabel("Texto da Transcrição")
-        self.transcriptionText = QTextEdit()
-        self.transcriptionText.setPlaceholderText("O texto transcrito aparecerá aqui...")
+        self.transcriptionView = VisualizadorTranscricao()
         mainLayout.addWidget(transcriptionLabel)
-        mainLayout.addWidget(self.transcriptionText)
+        mainLayout.addWidget(self.transcriptionView)
+
+        # Fila de Transcrições
+        self.queueGroup = queueGroup = QGroupBox("Fila de Transcrições")
+        queueLayout = QVBoxLayout()
+        self.queueList = QListWidget()
+        self.queueList.setFixedHeight(100)
+        queueLayout.addWidget(self.queueList)
+
+        queueOptionsLayout = QHBoxLayout()
+        self.queuePriority = QComboBox()
+        self.queuePriority.addItems(["Prioridade Normal", "Prioridade Alta", "Prioridade Urgente"])
+        self.queueByPriority = QCheckBox("Executar por prioridade")
+        self.queueByPriority.setChecked(True)
+        btnAddQueue = QPushButton("Adicionar Arquivos")
+        btnAddQueue.clicked.connect(self.addFilesToQueue)
+        btnRunQueue = QPushButton("Processar Fila")
+        btnRunQueue.clicked.connect(self.processQueue)
+        btnClearQueue = QPushButton("Limpar Finalizados")
+        btnClearQueue.clicked.connect(self.clearFinishedJobs)
+        queueOptionsLayout.addWidget(self.queuePriority)
+        queueOptionsLayout.addWidget(self.queueByPriority)
+        queueOptionsLayout.addWidget(btnAddQueue)
+        queueOptionsLayout.addWidget(btnRunQueue)
+        queueOptionsLayout.addWidget(btnClearQueue)
+        queueLayout.addLayout(queueOptionsLayout)
+        queueGroup.setLayout(queueLayout)
+        mainLayout.addWidget(queueGroup)
 
-        self.timer_progresso = QTimer()
-        self.timer_progresso.timeout.connect(self.incrementarProgresso)
         self.tempo_estimado = 0
-        self.progresso_atual = 0
+        self.recebendo_segmentos = False  # Indica se o texto já está sendo exibido em tempo real
+        self.thread_transcricao = None
+        self.thread_fila = None
+        self.atualizarListaFila()
 
 
         # Barra de Carregamento
@@ -192,17 +237,27 @@ class TranscriptionApp(QWidget):
         btnCopy.setStyleSheet("background-color: #28a745; color: white; padding: 10px 20px;")
         btnCopy.clicked.connect(self.copyTranscription)
 
+        btnExport = QPushButton("Exportar Transcrição")
+        btnExport.setStyleSheet("background-color: #17a2b8; color: white; padding: 10px 20px;")
+        btnExport.clicked.connect(self.exportTranscription)
+
         btnEditPrompt = QPushButton("Editar Prompt")
         btnEditPrompt.setStyleSheet("background-color: #6f42c1; color: white; padding: 10px 20px;")
         btnEditPrompt.clicked.connect(self.openPromptEditor)
 
+        btnCancel = QPushButton("Cancelar Transcrição")
+        btnCancel.setStyleSheet("background-color: #fd7e14; color: white; padding: 10px 20px;")
+        btnCancel.clicked.connect(self.cancelarTranscricao)
+
         btnClear = QPushButton("Limpar Conteúdo")
         btnClear.setStyleSheet("background-color: #dc3545; color: white; padding: 10px 20px;")
         btnClear.clicked.connect(self.clearContent)
 
         btnLayout.addWidget(btnTranscribe)
         btnLayout.addWidget(btnCopy)
+        btnLayout.addWidget(btnExport)
         btnLayout.addWidget(btnEditPrompt)
+        btnLayout.addWidget(btnCancel)
         btnLayout.addWidget(btnClear)
         mainLayout.addLayout(btnLayout)
 
@@ -227,7 +282,7 @@ class TranscriptionApp(QWidget):
         # Obter os valores atuais dos campos preenchidos pelo usuário
         nome_parte = self.partNameInput.text().strip() or "Não informado"
         tipo_procedimento = self.partType.currentText()
-        conteudo_transcrito = self.transcriptionText.toPlainText().strip()
+        conteudo_transcrito = self.transcriptionView.texto().strip()
         
         # Verificar se há transcrição antes de copiar
         if not conteudo_transcrito:
@@ -272,17 +327,46 @@ class TranscriptionApp(QWidget):
         popup = Popup("Transcrição copiada para a área de transferência!", "success", parent=self)
         popup.show()
 
+    def exportTranscription(self):
+        """Salva a transcrição exibida (com as edições do operador) em TXT, SRT ou JSON."""
+        segmentos = self.transcriptionView.segmentos()
+        if not segmentos:
+            popup = Popup("Nenhuma transcrição disponível para exportar.", "warning", parent=self)
+            popup.show()
+            return
+
+        nome_base = os.path.splitext(os.path.basename(self.fileInput.text()))[0] or "transcricao"
+        filtros = ";;".join(f"{formato.upper()} (*.{formato})" for formato in FORMATOS)
+        caminho, filtro = QFileDialog.getSaveFileName(self, "Exportar Transcrição", f"{nome_base}.txt", filtros)
+        if not caminho:
+            return
+
+        formato = os.path.splitext(caminho)[1].lstrip(".").lower()
+        if formato not in FORMATOS:
+            formato = filtro.split()[0].lower()
+            caminho += f".{formato}"
+        try:
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(gerar_saida({"texto": self.transcriptionView.texto(), "segmentos": segmentos}, formato))
+        except OSError as e:
+            popup = Popup(f"Erro ao exportar: {e}", "error", parent=self)
+            popup.show()
+            return
+
+        popup = Popup(f"Transcrição exportada para {os.path.basename(caminho)}", "success", parent=self)
+        popup.show()
+
     def clearContent(self):
-        """Limpa os campos de entrada, transcrição e reseta a barra de carregamento."""
-        self.transcriptionText.clear()
+        """Limpa os campos de entrada, transcrição e reseta a barra de carregamento (cancelando a transcrição em andamento)."""
+        self.cancelarTranscricao()
+        self.transcriptionView.limpar()
         self.fileInput.clear()
         self.partNameInput.clear()
         self.partType.setCurrentIndex(0)
 
         # 🔥 Resetar a barra de progresso
         self.progressBar.setValue(0)
-        self.timer_progresso.stop()  # Garante que a contagem pare se estiver ativa
-        self.progresso_atual = 0  # Reinicia a variável de controle
+        self.progressBar.setFormat("%p%")
 
         # 🔔 Exibir popup informando que o conteúdo foi limpo
         popup = Popup("Conteúdo limpo com sucesso!", "info", parent=self)
@@ -299,17 +383,64 @@ class TranscriptionApp(QWidget):
         self.promptEditor.show()
 
 
+    def configuracaoAtual(self):
+        """Retorna o modelo Whisper, o dispositivo, o modo, a precisão e o motor selecionados na interface."""
+        modelo = self.whisperModel.currentText().lower()
+        dispositivo = "GPU" if "GPU" in self.deviceSelector.currentText() else "CPU"
+        modo = (MODO_PADRAO, MODO_PARALELO, MODO_JANELAS)[self.executionMode.currentIndex()]
+        precisao = PRECISAO_INT8 if self.quantizedMode.isChecked() and dispositivo == "CPU" else PRECISAO_PADRAO
+
+        motor = self.engineSelector.currentData() or MOTOR_PADRAO
+
+        modelos_whisper = {"preciso": "large", "moderado": "medium", "rápido": "small"}
+        return modelos_whisper.get(modelo, "base"), dispositivo, modo, precisao, motor
+
+    def estimarTrabalho(self, modelo_whisper, dispositivo, modo, duracao, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO):
+        """Estima o tempo de um trabalho pelo histórico, descontando a carga se o modelo já estiver em memória."""
+        modelo_carregado = gerenciador_modelos.contem(modelo_whisper, "cuda" if dispositivo == "GPU" else "cpu",
+                                                      precisao, motor)
+        return estimar_etapas(modelo_whisper, chave_historico(dispositivo, modo, precisao, motor), duracao,
+                              modelo_carregado=modelo_carregado)
+
+    def cancelarTranscricao(self):
+        """Interrompe a transcrição ou a fila em andamento; os trechos já concluídos ficam salvos para serem retomados."""
+        for thread in (self.thread_transcricao, self.thread_fila):
+            if thread is not None and thread.isRunning():
+                thread.cancelar()
+
+    def transcricaoCancelada(self, posicao):
+        """Informa que a transcrição foi interrompida e, se algum trecho ficou salvo, que pode ser retomada."""
+        self.recebendo_segmentos = False
+        self.progressBar.setValue(0)
+        self.progressBar.setFormat("%p%")
+        if posicao:
+            mensagem = (f"Transcrição cancelada após {formatar_tempo(posicao)} de áudio. "
+                        "Transcreva o mesmo arquivo novamente para retomar de onde parou.")
+        else:
+            mensagem = "Transcrição cancelada. Nenhum trecho foi concluído; a próxima execução começará do início."
+        popup = Popup(mensagem, "info", parent=self)
+        popup.show()
+
+    def transcricaoEmAndamento(self):
+        """Avisa e retorna True se já houver uma transcrição ou fila em execução."""
+        for thread in (self.thread_transcricao, self.thread_fila):
+            if thread is not None and thread.isRunning():
+                popup = Popup("Já existe uma transcrição em andamento. Aguarde a conclusão.", "warning", parent=self)
+                popup.show()
+                return True
+        return False
+
     def transcribeAudio(self):
         """Função para transcrever o áudio/vídeo sem travar a UI."""
         input_file = self.fileInput.text()
         modelo = self.whisperModel.currentText().lower()
-        dispositivo = "GPU" if "GPU" in self.deviceSelector.currentText() else "CPU"
+        modelo_whisper, dispositivo, modo, precisao, motor = self.configuracaoAtual()
 
         multiplicadores = {"rápido": 1.0, "moderado": 1.5, "preciso": 3.5}
         fator_tempo = multiplicadores.get(modelo, 2.0)
 
-        modelos_whisper = {"preciso": "large", "moderado": "medium", "rápido": "small"}
-        modelo_whisper = modelos_whisper.get(modelo, "base")
+        if self.transcricaoEmAndamento():
+            return
 
         if not input_file:
             popup = Popup("Por favor, selecione um arquivo de áudio ou vídeo.", "warning", parent=self)
@@ -323,8 +454,7 @@ class TranscriptionApp(QWidget):
         mensagem_transcricao = f"🎥 Transcrevendo {tipo_transcricao} de {nome_parte}\n Aguarde..." if nome_parte else f"🎥 Transcrevendo {tipo_transcricao}\n Aguarde..."
         
         # 🔥 **Definir o texto indicando que a transcrição está em andamento**
-        self.transcriptionText.setStyleSheet("font-size: 24px; font-weight: bold")
-        self.transcriptionText.setPlainText(mensagem_transcricao)
+        self.transcriptionView.mostrarMensagem(mensagem_transcricao, destaque=True)
         
         # 🔥 **Forçar a atualização da interface antes de continuar**
         QApplication.processEvents()
@@ -335,18 +465,22 @@ class TranscriptionApp(QWidget):
             if duracao <= 0:
                 raise ValueError("Duração do áudio inválida.")
             
-            estimativa_real = estimar_tempo(modelo, dispositivo, duracao)
-            
-            self.tempo_estimado = estimativa_real if estimativa_real is not None else int(duracao * fator_tempo)
-            print(f"📊 Estimativa de tempo: {self.tempo_estimado} segundos")
-
-            registrar_transcricao(modelo.lower(), dispositivo, duracao)
+            estimativa = self.estimarTrabalho(modelo_whisper, dispositivo, modo, duracao, precisao, motor)
+
+            if estimativa is not None:
+                self.tempo_estimado = round(estimativa["total"])
+                minimo, maximo = estimativa["intervalo"]
+                texto_estimativa = f"{formatar_tempo(self.tempo_estimado)} ({formatar_tempo(minimo)} a {formatar_tempo(maximo)})"
+                etapas = ", ".join(f"{etapa}: {formatar_tempo(tempo)}" for etapa, tempo in estimativa["etapas"].items())
+                print(f"📊 Estimativa de tempo: {texto_estimativa} — {etapas}")
+            else:
+                self.tempo_estimado = int(duracao * fator_tempo)
+                texto_estimativa = formatar_tempo(self.tempo_estimado)
+                print(f"📊 Estimativa de tempo (sem histórico): {self.tempo_estimado} segundos")
 
             self.progressBar.setRange(0, 100)
             self.progressBar.setValue(0)
-
-            self.progresso_atual = 0
-            self.timer_progresso.start(1000)
+            self.progressBar.setFormat(f"%p% — estimativa: {texto_estimativa}")
 
         except Exception as e:
             popup = Popup(f"(main)Erro ao calcular duração: {e}", "error", parent=self)
@@ -357,41 +491,55 @@ class TranscriptionApp(QWidget):
         popup = Popup("Iniciando transcrição, aguarde...", "info", parent=self)
         popup.show()
 
-        self.thread_transcricao = TranscricaoThread(input_file, modelo=modelo_whisper, dispositivo=dispositivo)
+        self.recebendo_segmentos = False
+        self.thread_transcricao = TranscricaoThread(input_file, modelo=modelo_whisper, dispositivo=dispositivo, modo=modo,
+                                                   precisao=precisao, motor=motor, usar_vad=self.vadMode.isChecked(),
+                                                   refinar=self.draftMode.isChecked())
         self.thread_transcricao.transcricao_finalizada.connect(self.mostrarTranscricao)
         self.thread_transcricao.erro_ocorrido.connect(self.mostrarErro)
+        self.thread_transcricao.progresso_atualizado.connect(self.atualizarProgresso)
+        self.thread_transcricao.tempo_restante_atualizado.connect(self.atualizarTempoRestante)
+        self.thread_transcricao.segmentos_decodificados.connect(self.adicionarSegmentos)
+        self.thread_transcricao.transcricao_cancelada.connect(self.transcricaoCancelada)
+        self.thread_transcricao.transcricao_refinada.connect(self.exibirRefinamento)
         self.thread_transcricao.start()
 
+    def atualizarProgresso(self, valor):
+        """Atualiza a barra de progresso com a fração do áudio já decodificada."""
+        self.progressBar.setValue(valor)
 
+    def atualizarTempoRestante(self, segundos):
+        """Exibe na barra o tempo restante calculado a partir da velocidade real da transcrição."""
+        self.progressBar.setFormat(f"%p% — restam ~{formatar_tempo(segundos)}")
 
 
 
-    def incrementarProgresso(self):
-        """Atualiza a barra de progresso gradualmente até atingir 100%."""
-        if self.progresso_atual < 100:
-            incremento = (100 / self.tempo_estimado)  # Valor incremental baseado no tempo total
-            self.progresso_atual += incremento
-            self.progressBar.setValue(int(self.progresso_atual))
-        else:
-            self.timer_progresso.stop()  # 🔥 Para o timer automaticamente
-
+    def adicionarSegmentos(self, segmentos):
+        """Acrescenta ao final os segmentos recém-decodificados, sem redesenhar os anteriores."""
+        self.recebendo_segmentos = True
+        self.transcriptionView.adicionarSegmentos(segmentos)
 
+    def exibirRefinamento(self, segmentos):
+        """Exibe o rascunho já substituído pelos trechos refinados (cores definidas no visualizador)."""
+        self.recebendo_segmentos = True
+        self.transcriptionView.definirSegmentos(segmentos)
 
-    def mostrarTranscricao(self, texto):
+    def mostrarTranscricao(self, resultado):
         """Atualiza a interface com a transcrição finalizada."""
-        self.timer_progresso.stop()  # 🔥 Para a barra imediatamente
         self.progressBar.setValue(100)  # 🔥 Define como completa
+        self.progressBar.setFormat("%p%")
 
-        # 🔥 **Salvar tempo real de transcrição no estimador**
-        atualizar_tempo_real(self.whisperModel.currentText().lower(), 
-                            "GPU" if "GPU" in self.deviceSelector.currentText() else "CPU", 
-                            round(self.tempo_estimado, 2), 
-                            self.tempo_estimado)
-
+        # 🔥 **Exibir a transcrição final**
+        # (se os segmentos já chegaram trecho a trecho, estão completos e podem estar sendo revisados)
+        if not self.recebendo_segmentos:
+            self.transcriptionView.definirSegmentos(resultado["segmentos"])
+        self.recebendo_segmentos = False
 
-        # 🔥 **Resetar o estilo do texto e exibir a transcrição final**
-        self.transcriptionText.setStyleSheet("font-size: 14px")
-        self.transcriptionText.setPlainText(texto)
+        if resultado.get("modelo_solicitado", resultado["modelo"]) != resultado["modelo"]:
+            popup = Popup(f"Memória insuficiente para o modelo {resultado['modelo_solicitado']}: "
+                          f"transcrito com o {resultado['modelo']}.", "warning", parent=self)
+            popup.show()
+            return
 
         popup = Popup("Transcrição concluída com sucesso!", "success", parent=self)
         popup.show()
@@ -399,6 +547,106 @@ class TranscriptionApp(QWidget):
 
 
 
+    def addFilesToQueue(self):
+        """Seleciona vários arquivos e os adiciona à fila com as configurações atuais."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Adicionar Arquivos à Fila",
+            "",
+            "Arquivos de mídia (*.mp3 *.wav *.ogg *.mp4 *.mkv *.avi *.flv *.mov *.webm);;Todos os Arquivos (*)"
+        )
+        if not file_paths:
+            return
+
+        modelo_whisper, dispositivo, modo, precisao, motor = self.configuracaoAtual()
+        prioridade = self.queuePriority.currentIndex()  # 0 = normal, 1 = alta, 2 = urgente
+        for file_path in file_paths:
+            try:
+                duracao = calcular_duracao_audio(file_path)
+            except Exception as e:
+                print(f"⚠️ Não foi possível obter a duração de {file_path}: {e}")
+                duracao = None
+            adicionar_trabalho(file_path, modelo_whisper, dispositivo, modo, prioridade, duracao_audio=duracao,
+                               precisao=precisao, motor=motor, usar_vad=self.vadMode.isChecked())
+
+        self.atualizarListaFila()
+        popup = Popup(f"{len(file_paths)} arquivo(s) adicionado(s) à fila.", "success", parent=self)
+        popup.show()
+
+    def processQueue(self):
+        """Inicia o processamento dos trabalhos pendentes da fila."""
+        if self.transcricaoEmAndamento():
+            return
+
+        self.thread_fila = FilaTranscricaoThread(por_prioridade=self.queueByPriority.isChecked())
+        self.thread_fila.trabalho_iniciado.connect(self.iniciarTrabalhoFila)
+        self.thread_fila.trabalho_concluido.connect(lambda trabalho, texto: self.atualizarListaFila())
+        self.thread_fila.trabalho_falhou.connect(self.falharTrabalhoFila)
+        self.thread_fila.fila_finalizada.connect(self.finalizarFila)
+        self.thread_fila.progresso_atualizado.connect(self.atualizarProgresso)
+        self.thread_fila.tempo_restante_atualizado.connect(self.atualizarTempoRestante)
+        self.thread_fila.segmentos_decodificados.connect(self.adicionarSegmentos)
+        self.thread_fila.trabalho_cancelado.connect(lambda trabalho: self.atualizarListaFila())
+        self.thread_fila.start()
+
+    def clearFinishedJobs(self):
+        """Remove da fila os trabalhos concluídos ou com erro."""
+        limpar_finalizados()
+        self.atualizarListaFila()
+
+    def atualizarListaFila(self):
+        """Recarrega a lista de trabalhos exibida na interface."""
+        icones = {"pendente": "⏳", "em_andamento": "🔄", "concluido": "✅", "erro": "❌"}
+        self.queueList.clear()
+        total, minimo_total, maximo_total = 0, 0, 0
+        for trabalho in carregar_fila():
+            nome = os.path.basename(trabalho["arquivo"])
+            texto = (f"{icones.get(trabalho['status'], '')} {nome} — {trabalho['modelo']} / {trabalho['dispositivo']}"
+                     f" (prioridade {trabalho['prioridade']})")
+
+            # 🔥 Planejamento: estimativa de cada trabalho pendente e da fila inteira
+            if trabalho["status"] == "pendente" and trabalho.get("duracao_audio"):
+                estimativa = self.estimarTrabalho(trabalho["modelo"], trabalho["dispositivo"], trabalho["modo"],
+                                                  trabalho["duracao_audio"], trabalho.get("precisao", PRECISAO_PADRAO),
+                                                  trabalho.get("motor", MOTOR_PADRAO))
+                if estimativa is not None:
+                    texto += f" — ~{formatar_tempo(estimativa['total'])}"
+                    total += estimativa["total"]
+                    minimo_total += estimativa["intervalo"][0]
+                    maximo_total += estimativa["intervalo"][1]
+
+            self.queueList.addItem(texto)
+
+        titulo = "Fila de Transcrições"
+        if total:
+            titulo += f" — estimativa: {formatar_tempo(total)} ({formatar_tempo(minimo_total)} a {formatar_tempo(maximo_total)})"
+        self.queueGroup.setTitle(titulo)
+
+    def iniciarTrabalhoFila(self, trabalho):
+        """Prepara a interface para exibir o trabalho da fila que começou a ser transcrito."""
+        self.recebendo_segmentos = False
+        self.transcriptionView.mostrarMensagem(f"🎥 Transcrevendo {os.path.basename(trabalho['arquivo'])}\n Aguarde...",
+                                               destaque=True)
+        self.progressBar.setValue(0)
+        self.progressBar.setFormat("%p%")
+        self.atualizarListaFila()
+
+    def falharTrabalhoFila(self, trabalho, erro):
+        """Registra na interface a falha de um trabalho da fila, sem interromper os demais."""
+        print(f"❌ Falha em {trabalho['arquivo']}: {erro}")
+        self.atualizarListaFila()
+
+    def finalizarFila(self, resumo):
+        """Exibe o resumo agregado da fila processada."""
+        self.progressBar.setFormat("%p%")
+        self.atualizarListaFila()
+        mensagem = f"Fila finalizada: {resumo['concluidos']} concluído(s), {resumo['erros']} com erro."
+        if resumo["fator_tempo_real"] is not None:
+            mensagem += (f" {formatar_tempo(resumo['audio_total'])} de áudio em {formatar_tempo(resumo['tempo_total'])}"
+                         f" ({resumo['fator_tempo_real']:.2f}x o tempo real).")
+        popup = Popup(mensagem, "success" if not resumo["erros"] else "warning", parent=self)
+        popup.show()
+
     def mostrarErro(self, erro):
         """Exibe erro se houver falha na transcrição."""
         popup = Popup(erro, "error", parent=self)
@@ -406,8 +654,22 @@ class TranscriptionApp(QWidget):
 
 
 
+def relatar_inicializacao(encerrar=False):
+    """Mede o tempo até a janela aparecer; com --medir-inicializacao imprime em JSON e encerra."""
+    tempo_janela = time.perf_counter() - INICIO_PROCESSO
+    if encerrar:
+        print(json.dumps({"importacoes": round(TEMPO_IMPORTACOES, 3), "janela": round(tempo_janela, 3)}))
+        QApplication.instance().quit()
+        return
+
+    print(f"⚡ Janela exibida em {tempo_janela:.2f} segundos (importações: {TEMPO_IMPORTACOES:.2f} s)")
+    threading.Thread(target=pre_carregar_bibliotecas, daemon=True).start()
+
+
 if __name__ == "__main__":
+    medir_inicializacao = "--medir-inicializacao" in sys.argv
     app = QApplication(sys.argv)
     window = TranscriptionApp()
     window.show()
+    QTimer.singleShot(0, lambda: relatar_inicializacao(encerrar=medir_inicializacao))
     sys.exit(app.exec())
@@ -0,0 +1,26 @@
+import numpy as np
+
+TAXA_AMOSTRAGEM = 16000
+SEMENTE = 1234  # Mesma semente, mesmo áudio: execuções comparáveis entre máquinas e versões
+
+
+def gerar_fala_sintetica(duracao, semente=SEMENTE):
+    """Gera um sinal parecido com fala: sílabas com harmônicos e pausas entre frases, mais ruído de fundo."""
+    gerador = np.random.default_rng(semente)
+    total = int(duracao * TAXA_AMOSTRAGEM)
+    audio = np.zeros(total, dtype=np.float32)
+
+    posicao = 0
+    while posicao < total:
+        # Frase de 2 a 8 s com sílabas de ~4 Hz, seguida de uma pausa de 0,3 a 1,5 s
+        tamanho_frase = min(int(gerador.uniform(2, 8) * TAXA_AMOSTRAGEM), total - posicao)
+        t = np.arange(tamanho_frase) / TAXA_AMOSTRAGEM
+        f0 = gerador.uniform(100, 220) * (1 + 0.1 * np.sin(2 * np.pi * gerador.uniform(0.2, 0.6) * t))
+        fase = 2 * np.pi * np.cumsum(f0) / TAXA_AMOSTRAGEM
+        voz = sum(np.sin(fase * h) / h for h in range(1, 8))
+        silabas = np.clip(np.sin(2 * np.pi * gerador.uniform(3, 5) * t), 0, None) ** 2
+        audio[posicao:posicao + tamanho_frase] = 0.3 * voz * silabas
+        posicao += tamanho_frase + int(gerador.uniform(0.3, 1.5) * TAXA_AMOSTRAGEM)
+
+    audio += 0.01 * gerador.standard_normal(total).astype(np.float32)
+    return np.clip(audio, -1, 1)
@@ -0,0 +1,374 @@
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import platform
+import tempfile
+import difflib
+import itertools
+import subprocess
+import multiprocessing
+from estimador import MODELOS_WHISPER
+from metricas import percentil, pico_memoria_mb
+from memoria import POLITICA_RECUSAR
+from janelas import DURACAO_LEITURA
+from audio_sintetico import TAXA_AMOSTRAGEM, SEMENTE, gerar_fala_sintetica
+
+DURACOES_PADRAO = (30, 120, 600)
+CRESCIMENTO_MEMORIA_MB = 32  # No modo janelas, crescimento tolerado do pico de memória entre áudios de um bloco ou mais
+
+
+def gravar_wav(caminho, audio):
+    """Grava áudio float32 como WAV PCM 16 bits mono a 16 kHz."""
+    with wave.open(caminho, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(TAXA_AMOSTRAGEM)
+        f.writeframes((audio * 32767).astype("<i2").tobytes())
+
+
+def gerar_audio_ffmpeg(caminho, duracao):
+    """Gera o áudio pelo lavfi do FFmpeg: tom modulado em sílabas sobre ruído rosa, codificado em MP3."""
+    comando = [
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=180:sample_rate=44100:duration={duracao}",
+        "-f", "lavfi", "-i", f"anoisesrc=color=pink:amplitude=0.05:sample_rate=44100:duration={duracao}:seed={SEMENTE}",
+        "-filter_complex", "[0]tremolo=f=4:d=0.9[voz];[voz][1]amix=inputs=2",
+        "-ac", "2", caminho
+    ]
+    subprocess.run(comando, check=True)
+
+
+def preparar_entradas(duracoes, gerador, fixtures, pasta):
+    """Cria os áudios sintéticos de cada duração e acrescenta os arquivos locais de fixtures, se houver."""
+    entradas = []
+    for duracao in duracoes:
+        if gerador == "ffmpeg":
+            caminho = os.path.join(pasta, f"sintetico_{duracao}s.mp3")
+            gerar_audio_ffmpeg(caminho, duracao)
+        else:
+            caminho = os.path.join(pasta, f"sintetico_{duracao}s.wav")
+            gravar_wav(caminho, gerar_fala_sintetica(duracao))
+        entradas.append({"nome": os.path.basename(caminho), "caminho": caminho})
+
+    for caminho in fixtures or []:
+        arquivos = [os.path.join(caminho, nome) for nome in sorted(os.listdir(caminho))] if os.path.isdir(caminho) else [caminho]
+        entradas.extend({"nome": os.path.basename(arquivo), "caminho": arquivo} for arquivo in arquivos)
+    return entradas
+
+
+def verificar_modelo_local(modelo):
+    """Garante que o modelo está na loja local (convertendo-o, se preciso), para o benchmark nunca depender da rede."""
+    from modelos_locais import preparar_modelo_local
+    preparar_modelo_local(modelo)  # Fora das medições: a conversão é feita uma única vez
+
+
+def pico_memoria_total_mb():
+    """Pico de memória do processo e dos subprocessos já encerrados (pool do modo paralelo)."""
+    pico = pico_memoria_mb() or 0
+    try:
+        import resource
+        filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        pico = max(pico, filhos / (1024 * 1024) if sys.platform == "darwin" else filhos / 1024)
+    except ImportError:
+        pass
+    return round(pico, 1) or None
+
+
+def executar_configuracao(configuracao, entradas, repeticoes, streaming):
+    """Roda uma configuração (motor, modelo, modo, precisão, threads) sobre todas as entradas. Executa num processo isolado."""
+    if configuracao["modo"] == "paralelo":
+        os.environ["TRANSCRITOR_WORKERS"] = str(configuracao["threads"])  # No modo paralelo, threads = processos
+    else:
+        os.environ["TRANSCRITOR_THREADS"] = str(configuracao["threads"])  # Tem precedência sobre a calibração do host
+        os.environ["OMP_NUM_THREADS"] = str(configuracao["threads"])  # Lido pelo CTranslate2 ao iniciar
+
+    from nucleo_transcricao import transcrever_arquivo, calcular_duracao_audio
+
+    if configuracao["motor"] == "whisper":
+        verificar_modelo_local(configuracao["modelo"])
+
+    def transcrever(caminho):
+        inicio = time.perf_counter()
+        resultado = transcrever_arquivo(caminho, configuracao["modelo"], "CPU", configuracao["modo"],
+                                        streaming=streaming, usar_cache=False, precisao=configuracao["precisao"],
+                                        motor=configuracao["motor"], usar_vad=configuracao.get("vad", True),
+                                        politica_memoria=POLITICA_RECUSAR)  # Mede o modelo pedido ou falha, nunca outro
+        return time.perf_counter() - inicio, resultado
+
+    # A primeira execução inclui a carga do modelo; é medida à parte e descartada das estatísticas.
+    # No modo janelas, abaixo de um bloco de leitura o pico ainda cresce com o áudio: o aquecimento usa o menor
+    # áudio com um bloco inteiro, e a memória constante só é verificada se houver outro, mais longo, para comparar
+    duracoes = {entrada["caminho"]: calcular_duracao_audio(entrada["caminho"]) for entrada in entradas}
+    candidatas = [c for c, d in duracoes.items() if configuracao["modo"] != "janelas" or d >= DURACAO_LEITURA]
+    carga, _ = transcrever(min(candidatas or duracoes, key=duracoes.get))
+    verificavel = configuracao["modo"] != "janelas" or len({round(duracoes[c]) for c in candidatas}) >= 2
+    pico_aquecimento = pico_memoria_total_mb() if verificavel else None
+
+    execucoes, textos = [], {}
+    for entrada in entradas:
+        for repeticao in range(repeticoes):
+            latencia, resultado = transcrever(entrada["caminho"])
+            execucoes.append({
+                "entrada": entrada["nome"],
+                "repeticao": repeticao,
+                "audio_duracao": resultado["duracao"],
+                "latencia": round(latencia, 3),
+                "fator_tempo_real": round(latencia / resultado["duracao"], 4),
+                "caracteres": len(resultado["texto"]),
+                "pico_rss_mb": pico_memoria_total_mb(),  # O pico só cresce: mede o acumulado até esta execução
+            })
+            textos[entrada["nome"]] = resultado["texto"]
+
+    return {"primeira_execucao": round(carga, 3), "execucoes": execucoes, "textos": textos,
+            "pico_rss_mb": pico_memoria_total_mb(), "pico_aquecimento_mb": pico_aquecimento}
+
+
+def medir_carga(modelo, metodo):
+    """Mede a carga do modelo na CPU: "whisper" (whisper.load_model do checkpoint original) ou "loja" (modelos_locais).
+
+    Executa num processo isolado. O pico transitório é o crescimento do pico de RSS durante a carga.
+    """
+    import whisper  # Importado antes da medição (traz o Torch junto): custa o mesmo nos dois métodos
+    from modelos_locais import carregar_modelo_local, localizar_original
+
+    antes = pico_memoria_mb() or 0
+    inicio = time.perf_counter()
+    if metodo == "loja":
+        carregar_modelo_local(modelo, "cpu")
+    else:
+        whisper.load_model(localizar_original(modelo)[0], device="cpu")  # Pelo caminho: nunca baixa
+    tempo = time.perf_counter() - inicio
+    pico = pico_memoria_mb() or 0
+    return {"tempo": round(tempo, 3), "pico_rss_mb": round(pico, 1), "pico_transitorio_mb": round(pico - antes, 1)}
+
+
+def comparar_carga(modelo):
+    """Compara a carga pelo openai-whisper com a carga da loja local, cada uma num processo novo."""
+    medida = {"modelo": modelo}
+    resposta = executar_isolado(verificar_modelo_local, modelo)  # A conversão fica fora da medição
+    for metodo in ("whisper", "loja"):
+        if "erro" in resposta:
+            break
+        resposta = executar_isolado(medir_carga, modelo, metodo)
+        medida[metodo] = resposta.get("ok")
+    if "erro" in resposta:
+        print(f"❌ {resposta['erro']}", file=sys.stderr)
+        return {**medida, "erro": resposta["erro"]}
+
+    original, loja = medida["whisper"], medida["loja"]
+    medida["aceleracao"] = round(original["tempo"] / loja["tempo"], 2) if loja["tempo"] else None
+    medida["memoria_economizada_mb"] = round(original["pico_transitorio_mb"] - loja["pico_transitorio_mb"], 1)
+    print(f"📦 {modelo} — carga: whisper {original['tempo']:.2f}s / +{original['pico_transitorio_mb']:.0f} MB, "
+          f"loja local {loja['tempo']:.2f}s / +{loja['pico_transitorio_mb']:.0f} MB", file=sys.stderr)
+    return medida
+
+
+def _processo_isolado(conexao, funcao, *args):
+    """Ponto de entrada do processo filho: devolve o resultado (ou o erro) pelo pipe."""
+    try:
+        conexao.send({"ok": funcao(*args)})
+    except Exception as e:
+        conexao.send({"erro": str(e)})
+    finally:
+        conexao.close()
+
+
+def executar_isolado(funcao, *args):
+    """Executa a função num processo novo, para que carga de modelo, threads e pico de memória não se misturem."""
+    contexto = multiprocessing.get_context("spawn")
+    receptor, emissor = contexto.Pipe(duplex=False)
+    processo = contexto.Process(target=_processo_isolado, args=(emissor, funcao, *args))
+    processo.start()
+    emissor.close()
+    try:
+        resposta = receptor.recv()
+    except EOFError:
+        resposta = {"erro": f"processo encerrado com código {processo.exitcode}"}
+    processo.join()
+    return resposta
+
+
+def resumir(execucoes):
+    """Agrega as execuções de uma configuração: vazão, fator de tempo real e percentis de latência."""
+    latencias = [e["latencia"] for e in execucoes]
+    fatores = [e["fator_tempo_real"] for e in execucoes]
+    audio_total = sum(e["audio_duracao"] for e in execucoes)
+    return {
+        "vazao": round(audio_total / sum(latencias), 3),  # Segundos de áudio por segundo de relógio
+        "fator_tempo_real": {f"p{p}": round(percentil(fatores, p), 4) for p in (50, 90, 99)},
+        "latencia": {f"p{p}": round(percentil(latencias, p), 3) for p in (50, 90, 99)},
+    }
+
+
+def verificar_memoria(medida, modo):
+    """Mede quanto o pico de memória cresceu depois do aquecimento (feito com o menor áudio de um bloco de leitura).
+
+    Com memória constante, os áudios mais longos não devem elevar o pico além de CRESCIMENTO_MEMORIA_MB.
+    No modo janelas, sem duas durações diferentes de um bloco ou mais, retorna {"constante": "não verificado"}.
+    """
+    if medida.get("pico_aquecimento_mb") is None or medida.get("pico_rss_mb") is None:
+        return {"constante": "não verificado"} if modo == "janelas" else None
+    crescimento = round(medida["pico_rss_mb"] - medida["pico_aquecimento_mb"], 1)
+    maior = max(medida["execucoes"], key=lambda e: e["audio_duracao"])
+    return {
+        "crescimento_mb": crescimento,
+        "audio_mais_longo": maior["audio_duracao"],
+        "constante": crescimento <= CRESCIMENTO_MEMORIA_MB,
+    }
+
+
+def similaridade_texto(referencia, texto):
+    """Fração das palavras em comum, na mesma ordem, entre dois textos (1.0 = idênticos)."""
+    return difflib.SequenceMatcher(None, referencia.split(), texto.split(), autojunk=False).ratio()
+
+
+def comparar_precisoes(resultados):
+    """Para cada configuração int8, mede ganho de velocidade, memória e mudança no texto contra a mesma em fp32."""
+    chave = lambda r: (r.get("motor", "whisper"), r["modelo"], r["modo"], r["threads"])
+    referencias = {chave(r): r for r in resultados if r.get("precisao") == "fp32" and "resumo" in r}
+    for resultado in resultados:
+        referencia = referencias.get(chave(resultado))
+        if resultado.get("precisao") != "int8" or "resumo" not in resultado or referencia is None:
+            continue
+        similaridades = [similaridade_texto(referencia["textos"][nome], texto)
+                         for nome, texto in resultado["textos"].items() if nome in referencia["textos"]]
+        resultado["comparacao_fp32"] = {
+            "aceleracao": round(referencia["resumo"]["fator_tempo_real"]["p50"] / resultado["resumo"]["fator_tempo_real"]["p50"], 3),
+            "memoria_economizada_mb": round((referencia["pico_rss_mb"] or 0) - (resultado["pico_rss_mb"] or 0), 1),
+            "similaridade_texto": round(sum(similaridades) / len(similaridades), 4) if similaridades else None,
+        }
+        print(f"🔬 {resultado['motor']} / {resultado['modelo']} / {resultado['modo']} / {resultado['threads']} threads — int8 contra fp32: "
+              f"{resultado['comparacao_fp32']['aceleracao']:.2f}x mais rápido, "
+              f"{resultado['comparacao_fp32']['memoria_economizada_mb']:.0f} MB a menos, "
+              f"similaridade do texto {resultado['comparacao_fp32']['similaridade_texto']}", file=sys.stderr)
+
+
+def descrever_ambiente():
+    """Informações do host e das versões, gravadas junto com os resultados."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "sistema": platform.platform(),
+        "processador": platform.processor(),
+        "nucleos": os.cpu_count(),
+        "python": platform.python_version(),
+        "commit": commit,
+    }
+
+
+def comparar(anterior, atual):
+    """Imprime a variação do fator de tempo real (p50) entre duas execuções do benchmark."""
+    chave = lambda r: (r.get("motor", "whisper"), r["modelo"], r["modo"], r.get("precisao", "fp32"), r["threads"])
+    referencias = {chave(r): r for r in anterior["resultados"] if "resumo" in r}
+    for resultado in atual["resultados"]:
+        referencia = referencias.get(chave(resultado))
+        if referencia is None or "resumo" not in resultado:
+            continue
+        antes = referencia["resumo"]["fator_tempo_real"]["p50"]
+        depois = resultado["resumo"]["fator_tempo_real"]["p50"]
+        print(f"🔁 {' / '.join(str(c) for c in chave(resultado))} threads: "
+              f"{antes:.3f}x → {depois:.3f}x ({(depois / antes - 1) * 100:+.1f}%)")
+
+
+def criar_parser():
+    """Define os argumentos do benchmark."""
+    nucleos = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark offline do pipeline de transcrição (CPU).")
+    parser.add_argument("--modelos", nargs="+", default=["tiny", "base"],
+                        help="Modelos a medir (nomes do Whisper ou rápido/moderado/preciso)")
+    parser.add_argument("--modos", nargs="+", default=["padrao"], choices=["padrao", "paralelo", "janelas"],
+                        help="Modos de execução a medir")
+    parser.add_argument("--motores", nargs="+", default=["whisper"], choices=["whisper", "ctranslate2"],
+                        help="Motores de inferência a medir")
+    parser.add_argument("--precisoes", nargs="+", default=["fp32"], choices=["fp32", "int8"],
+                        help="Precisões do modelo: fp32 e/ou int8 quantizado (comparado contra o fp32)")
+    parser.add_argument("--threads", nargs="+", type=int, default=sorted({1, max(1, nucleos // 2), nucleos}),
+                        help="Threads do Torch (no modo paralelo, quantidade de processos)")
+    parser.add_argument("--duracoes", nargs="+", type=int, default=list(DURACOES_PADRAO),
+                        help="Durações (s) dos áudios sintéticos")
+    parser.add_argument("--gerador", default="numpy", choices=["numpy", "ffmpeg"],
+                        help="Geração do áudio: NumPy (WAV) ou lavfi do FFmpeg (MP3)")
+    parser.add_argument("--fixtures", nargs="*", help="Arquivos ou pastas locais incluídos além dos sintéticos")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por entrada (padrão: 3)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Decodifica direto para memória em vez de converter para WAV em disco")
+    parser.add_argument("--sem-vad", action="store_true",
+                        help="Decodifica os áudios inteiros, sem a pré-passagem que pula os silêncios")
+    parser.add_argument("--carga", action="store_true",
+                        help="Compara a carga dos modelos pelo openai-whisper e pela loja local (tempo e pico de memória)")
+    parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    return parser
+
+
+def main(argv=None):
+    """Executa todas as combinações e grava os resultados em JSON."""
+    args = criar_parser().parse_args(argv)
+    modelos = [MODELOS_WHISPER.get(m.lower(), m.lower()) for m in args.modelos]
+    pasta = tempfile.mkdtemp(prefix="benchmark_transcricao_")
+
+    # Histórico e métricas do benchmark ficam separados dos do usuário (herdados pelos processos filhos)
+    os.environ["TRANSCRITOR_HISTORICO"] = os.path.join(pasta, "historico.jsonl")
+    os.environ["TRANSCRITOR_METRICAS"] = os.path.join(pasta, "metricas.jsonl")
+    os.environ["HF_HUB_OFFLINE"] = "1"  # O CTranslate2 baixa modelos do Hugging Face; no benchmark, só o que já está em disco
+
+    try:
+        entradas = preparar_entradas(args.duracoes, args.gerador, args.fixtures, pasta)
+        relatorio = {"ambiente": descrever_ambiente(), "streaming": args.streaming,
+                     "repeticoes": args.repeticoes, "entradas": [e["nome"] for e in entradas], "resultados": []}
+
+        combinacoes = itertools.product(args.motores, modelos, args.modos, args.precisoes, args.threads)
+        for motor, modelo, modo, precisao, threads in combinacoes:
+            configuracao = {"motor": motor, "modelo": modelo, "modo": modo, "precisao": precisao, "threads": threads,
+                            "vad": not args.sem_vad}
+            print(f"⏱️ {motor} / {modelo} / {modo} / {precisao} / {threads} threads...", file=sys.stderr)
+            resposta = executar_isolado(executar_configuracao, configuracao, entradas, args.repeticoes, args.streaming)
+            if "erro" in resposta:
+                print(f"❌ {resposta['erro']}", file=sys.stderr)
+                relatorio["resultados"].append({**configuracao, "erro": resposta["erro"]})
+                continue
+
+            medida = resposta["ok"]
+            resumo = resumir(medida["execucoes"])
+            resumo["memoria"] = verificar_memoria(medida, modo)
+            relatorio["resultados"].append({**configuracao, **medida, "resumo": resumo})
+            print(f"   vazão {resumo['vazao']:.2f}x  RTF p50 {resumo['fator_tempo_real']['p50']:.3f}  "
+                  f"latência p90 {resumo['latencia']['p90']:.1f}s  pico {medida['pico_rss_mb']} MB", file=sys.stderr)
+            if resumo["memoria"] and resumo["memoria"]["constante"] == "não verificado":
+                print("   ⚠️ Memória constante não verificada: são necessárias ao menos duas durações diferentes de "
+                      f"um bloco de leitura ({DURACAO_LEITURA} s) ou mais", file=sys.stderr)
+            elif resumo["memoria"]:
+                print(f"   {'✅' if resumo['memoria']['constante'] else '⚠️'} pico de memória +{resumo['memoria']['crescimento_mb']} MB "
+                      f"do aquecimento ao áudio de {resumo['memoria']['audio_mais_longo']:.0f} s", file=sys.stderr)
+        comparar_precisoes(relatorio["resultados"])
+        if args.carga:
+            relatorio["carga"] = [comparar_carga(modelo) for modelo in modelos]
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=4, ensure_ascii=False)
+    print(f"💾 Resultados salvos em {args.saida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            comparar(json.load(f), relatorio)
+
+    # No modo janelas, memória crescendo com a duração do áudio é uma regressão
+    memoria_crescente = any(r["modo"] == "janelas" and "resumo" in r and r["resumo"]["memoria"]
+                            and r["resumo"]["memoria"]["constante"] is False for r in relatorio["resultados"])
+    erros = any("erro" in r for r in relatorio["resultados"] + relatorio.get("carga", []))
+    return 1 if memoria_crescente or erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
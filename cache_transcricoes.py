@@ -0,0 +1,118 @@
+import os
+import json
+import hashlib
+import threading
+from midia import identidade_arquivo
+
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_transcricoes")
+indice_file = os.path.join(cache_dir, "indice_arquivos.json")
+
+# 🔥 Tamanho máximo do cache em disco (MB); os resultados usados há mais tempo são removidos primeiro
+LIMITE_CACHE_MB = int(os.environ.get("TRANSCRITOR_CACHE_MB", "200"))
+VERSAO_CACHE = 1  # Incrementar quando a forma de transcrever mudar, invalidando resultados antigos
+
+_lock = threading.Lock()
+
+
+def calcular_impressao_audio(audio):
+    """Calcula uma impressão digital rápida (BLAKE2b) das amostras decodificadas do áudio."""
+    impressao = nova_impressao()
+    impressao.update(memoryview(audio).cast("B"))
+    return impressao.hexdigest()
+
+
+def nova_impressao():
+    """Hash incremental da impressão digital: o mesmo áudio lido em blocos gera a mesma impressão."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def carregar_indice():
+    """Carrega o índice que associa arquivos já decodificados à impressão do seu áudio."""
+    try:
+        with open(indice_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def impressao_conhecida(input_file):
+    """Retorna a impressão do áudio se este arquivo (inalterado) já foi decodificado antes, ou None."""
+    try:
+        return carregar_indice().get(identidade_arquivo(input_file))
+    except OSError:
+        return None
+
+
+def registrar_impressao(input_file, impressao):
+    """Memoriza a impressão do áudio deste arquivo, para as próximas execuções nem precisarem decodificá-lo."""
+    with _lock:
+        os.makedirs(cache_dir, exist_ok=True)
+        indice = carregar_indice()
+        indice[identidade_arquivo(input_file)] = impressao
+        temporario = indice_file + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(indice, f, indent=4, ensure_ascii=False)
+        os.replace(temporario, indice_file)
+
+
+def gerar_chave(impressao, modelo, dispositivo, modo, idioma="pt", precisao="fp32", motor="whisper", vad=False):
+    """Combina a impressão do áudio com o modelo, o motor e as opções de decodificação."""
+    opcoes = [VERSAO_CACHE, impressao, modelo, dispositivo, modo, idioma]
+    # Precisão e motor só entram na chave quando diferem do padrão, preservando os resultados já em cache
+    if precisao != "fp32":
+        opcoes.append(precisao)
+    if motor != "whisper":
+        opcoes.append(motor)
+    if vad:
+        opcoes.append("vad")
+    configuracao = json.dumps(opcoes)
+    return hashlib.blake2b(configuracao.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def caminho_resultado(chave):
+    """Caminho do arquivo de resultado de uma chave."""
+    return os.path.join(cache_dir, f"{chave}.json")
+
+
+def buscar_resultado(chave):
+    """Retorna o resultado em cache para a chave, ou None."""
+    caminho = caminho_resultado(chave)
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            resultado = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    os.utime(caminho)  # Marca como usado recentemente, para o despejo por antiguidade
+    return resultado
+
+
+def salvar_resultado(chave, resultado):
+    """Grava um resultado no cache e remove os mais antigos se o limite de tamanho for ultrapassado."""
+    with _lock:
+        os.makedirs(cache_dir, exist_ok=True)
+        caminho = caminho_resultado(chave)
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+        aplicar_limite()
+
+
+def aplicar_limite(limite_mb=LIMITE_CACHE_MB):
+    """Remove os resultados menos usados recentemente até o cache caber no limite."""
+    arquivos = []
+    for nome in os.listdir(cache_dir):
+        caminho = os.path.join(cache_dir, nome)
+        if nome.endswith(".json") and caminho != indice_file:
+            estado = os.stat(caminho)
+            arquivos.append((estado.st_mtime, estado.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in arquivos)
+    limite = limite_mb * 1024 * 1024
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite:
+            break
+        os.remove(caminho)
+        total -= tamanho
+        print(f"🗑️ Resultado removido do cache para respeitar o limite de {limite_mb} MB: {os.path.basename(caminho)}")
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from dispositivos import gerar_assinatura
+
+calibracao_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibracao_threads.json")
+MODELO_CALIBRACAO = "tiny"  # Modelo pequeno: a calibração leva segundos, não minutos
+TOKENS_DECODIFICADOS = 48  # Passos fixos do decodificador por medição (não depende do texto reconhecido)
+REPETICOES = 3  # Medições por configuração (vale a mediana), após um aquecimento
+
+_configuracao_aplicada = None  # Configuração já aplicada neste processo (o Torch só aceita o inter-op uma vez)
+
+
+def contar_nucleos():
+    """Retorna (núcleos físicos, núcleos lógicos disponíveis para o processo), considerando afinidade e cgroups."""
+    logicos = os.cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        logicos = len(os.sched_getaffinity(0))
+
+    fisicos = None
+    if sys.platform.startswith("linux"):
+        try:
+            nucleos, fisico, nucleo = set(), None, None
+            with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+                for linha in f:
+                    if linha.startswith("physical id"):
+                        fisico = linha.split(":", 1)[1].strip()
+                    elif linha.startswith("core id"):
+                        nucleo = linha.split(":", 1)[1].strip()
+                    elif not linha.strip() and nucleo is not None:
+                        nucleos.add((fisico, nucleo))
+                        fisico, nucleo = None, None
+            if nucleo is not None:
+                nucleos.add((fisico, nucleo))  # Último bloco sem linha em branco no final
+            fisicos = len(nucleos) or None
+        except OSError:
+            pass
+
+    if fisicos is None:
+        try:
+            import psutil
+            fisicos = psutil.cpu_count(logical=False)
+        except ImportError:
+            pass
+
+    return min(fisicos or logicos, logicos), logicos
+
+
+def candidatos():
+    """Configurações (threads, inter-op) a medir: metade e todos os núcleos físicos, todos os lógicos."""
+    fisicos, logicos = contar_nucleos()
+    threads = sorted({max(1, fisicos // 2), fisicos, logicos})
+    return [(t, interop) for t in threads for interop in (1, 2)]
+
+
+def medir_configuracao(threads, interop, modelo=MODELO_CALIBRACAO):
+    """Mede uma decodificação curta e fixa (encoder + passos do decoder) com a configuração informada."""
+    import torch
+    import whisper
+    from audio_sintetico import gerar_fala_sintetica
+    from modelos_locais import carregar_modelo_local
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(interop)
+
+    modelo_whisper = carregar_modelo_local(modelo, "cpu")
+    mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(gerar_fala_sintetica(30)), modelo_whisper.dims.n_mels)
+    tokens = torch.tensor([[50258] * TOKENS_DECODIFICADOS])  # Sequência fixa: o custo não depende do que foi reconhecido
+
+    def decodificar():
+        with torch.inference_mode():
+            caracteristicas = modelo_whisper.embed_audio(mel[None])
+            for passo in range(1, TOKENS_DECODIFICADOS + 1, 8):
+                modelo_whisper.logits(tokens[:, :passo], caracteristicas)
+
+    decodificar()  # Aquecimento
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        decodificar()
+        tempos.append(time.perf_counter() - inicio)
+    return sorted(tempos)[len(tempos) // 2]
+
+
+def _medir_isolado(conexao, threads, interop, modelo):
+    """Processo filho: o inter-op do Torch só pode ser definido uma vez por processo."""
+    try:
+        conexao.send({"tempo": medir_configuracao(threads, interop, modelo)})
+    except Exception as e:
+        conexao.send({"erro": str(e)})
+    finally:
+        conexao.close()
+
+
+def calibrar(modelo=MODELO_CALIBRACAO):
+    """Mede cada configuração candidata num processo novo, escolhe a mais rápida e a salva para este host."""
+    contexto = multiprocessing.get_context("spawn")
+    medicoes = []
+    for threads, interop in candidatos():
+        receptor, emissor = contexto.Pipe(duplex=False)
+        processo = contexto.Process(target=_medir_isolado, args=(emissor, threads, interop, modelo))
+        processo.start()
+        emissor.close()
+        try:
+            resposta = receptor.recv()
+        except EOFError:
+            resposta = {"erro": f"processo encerrado com código {processo.exitcode}"}
+        processo.join()
+
+        if "erro" in resposta:
+            print(f"⚠️ {threads} threads / inter-op {interop}: {resposta['erro']}")
+            continue
+        print(f"⏱️ {threads} threads / inter-op {interop}: {resposta['tempo']:.3f} s")
+        medicoes.append({"threads": threads, "interop": interop, "tempo": round(resposta["tempo"], 4)})
+
+    if not medicoes:
+        raise RuntimeError("Nenhuma configuração de threads pôde ser medida.")
+
+    melhor = min(medicoes, key=lambda m: m["tempo"])
+    configuracao = {
+        "threads": melhor["threads"],
+        "interop": melhor["interop"],
+        "modelo": modelo,
+        "medicoes": medicoes,
+        "calibrado_em": time.time(),
+        "assinatura": gerar_assinatura(),
+    }
+    salvar_calibracao(configuracao)
+    print(f"✅ Configuração escolhida: {melhor['threads']} threads, inter-op {melhor['interop']}")
+    return configuracao
+
+
+def carregar_calibracoes():
+    """Lê as calibrações salvas, indexadas pelo nome do host."""
+    try:
+        with open(calibracao_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def salvar_calibracao(configuracao):
+    """Grava a calibração deste host de forma atômica, preservando as dos outros hosts."""
+    calibracoes = carregar_calibracoes()
+    calibracoes[configuracao["assinatura"]["host"]] = configuracao
+    temporario = calibracao_file + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(calibracoes, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, calibracao_file)
+
+
+def calibracao_do_host():
+    """Retorna a calibração deste host, ou None se não existir ou se o hardware/sistema mudou."""
+    assinatura = gerar_assinatura()
+    configuracao = carregar_calibracoes().get(assinatura["host"])
+    if configuracao is None:
+        return None
+    salva = configuracao.get("assinatura", {})
+    if any(salva.get(campo) != assinatura[campo] for campo in ("sistema", "nucleos")):
+        return None
+    return configuracao
+
+
+def aplicar_configuracao_threads():
+    """Aplica ao Torch a configuração calibrada deste host (ou, sem calibração, uma por núcleos físicos).
+
+    TRANSCRITOR_THREADS, se definida, tem precedência sobre a calibração (usada pelo benchmark).
+
+    Deve ser chamada antes de carregar o modelo; chamadas seguintes no mesmo processo não fazem nada.
+    """
+    global _configuracao_aplicada
+    if _configuracao_aplicada is not None:
+        return _configuracao_aplicada
+
+    import torch
+
+    configuracao = calibracao_do_host()
+    if os.environ.get("TRANSCRITOR_THREADS"):
+        threads, interop, origem = int(os.environ["TRANSCRITOR_THREADS"]), None, "ambiente"
+    elif configuracao is not None:
+        threads, interop, origem = configuracao["threads"], configuracao["interop"], "calibracao"
+    else:
+        threads, interop, origem = contar_nucleos()[0], None, "nucleos_fisicos"  # Ignora o hyper-threading
+
+    torch.set_num_threads(threads)
+    if interop is not None:
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError as e:
+            print(f"⚠️ Não foi possível definir as threads inter-op: {e}")
+
+    _configuracao_aplicada = {"threads": torch.get_num_threads(), "interop": torch.get_num_interop_threads(),
+                              "origem": origem}
+    print(f"🧵 Torch configurado com {_configuracao_aplicada['threads']} threads "
+          f"(inter-op {_configuracao_aplicada['interop']}, origem: {origem})")
+    return _configuracao_aplicada
+
+
+def configuracao_aplicada():
+    """Configuração de threads em uso neste processo, ou None se ainda não foi aplicada."""
+    return _configuracao_aplicada
+
+
+def main(argv=None):
+    """Recalibra as threads deste host (ou apenas mostra a calibração atual)."""
+    parser = argparse.ArgumentParser(description="Calibra as threads do Torch para este host.")
+    parser.add_argument("--modelo", default=MODELO_CALIBRACAO, help="Modelo usado nas medições (padrão: tiny)")
+    parser.add_argument("--mostrar", action="store_true", help="Apenas mostra a calibração salva")
+    args = parser.parse_args(argv)
+
+    if args.mostrar:
+        configuracao = calibracao_do_host()
+        print(json.dumps(configuracao, indent=4, ensure_ascii=False) if configuracao else "Host ainda não calibrado.")
+        return 0
+
+    calibrar(args.modelo)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
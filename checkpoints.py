@@ -0,0 +1,79 @@
+import os
+import json
+import time
+import hashlib
+from midia import identidade_arquivo
+
+checkpoints_dir = os.environ.get(
+    "TRANSCRITOR_CHECKPOINTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints")
+)
+INTERVALO_CHECKPOINT = 30  # Segundos entre gravações do progresso durante a decodificação
+VERSAO_CHECKPOINT = 1  # Incrementar quando o formato mudar, descartando checkpoints antigos
+
+
+class TranscricaoCancelada(Exception):
+    """Transcrição interrompida a pedido do usuário.
+
+    posicao traz os segundos do áudio original salvos no checkpoint, de onde a próxima execução retoma
+    (0 se nada foi salvo, como no modo paralelo ou antes do primeiro trecho decodificado).
+    """
+
+    def __init__(self, posicao=0.0):
+        super().__init__()
+        self.posicao = posicao
+
+
+def caminho_checkpoint(input_file, opcoes):
+    """Checkpoint padrão de um arquivo: em checkpoints/, identificado pelo arquivo e pelas opções da transcrição."""
+    chave = json.dumps([os.path.abspath(input_file), sorted(opcoes.items())])
+    nome = hashlib.blake2b(chave.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(checkpoints_dir, f"{nome}.json")
+
+
+class Checkpoint:
+    """Progresso de uma transcrição em andamento: segmentos já concluídos e a posição no áudio original.
+
+    Só é retomado se o arquivo (tamanho e data de modificação) e as opções forem os mesmos.
+    """
+
+    def __init__(self, caminho, input_file, opcoes):
+        self.caminho = caminho
+        self.identidade = identidade_arquivo(input_file)
+        self.opcoes = opcoes
+        self.posicao = 0.0  # Segundos do áudio original já transcritos
+        self.segmentos = []
+        self.ultima_gravacao = time.time()
+
+        dados = self._ler()
+        if (dados and dados.get("versao") == VERSAO_CHECKPOINT and dados.get("arquivo") == self.identidade
+                and dados.get("opcoes") == opcoes):
+            self.posicao = dados["posicao"]
+            self.segmentos = dados["segmentos"]
+
+    def _ler(self):
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def vencido(self):
+        """Indica se já passou o intervalo desde a última gravação."""
+        return time.time() - self.ultima_gravacao >= INTERVALO_CHECKPOINT
+
+    def salvar(self, posicao, segmentos):
+        """Grava o progresso de forma atômica (uma queda no meio da gravação não corrompe o anterior)."""
+        self.posicao, self.segmentos = posicao, segmentos
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": VERSAO_CHECKPOINT, "arquivo": self.identidade, "opcoes": self.opcoes,
+                       "posicao": posicao, "segmentos": segmentos, "salvo_em": time.time()}, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+        self.ultima_gravacao = time.time()
+        print(f"💾 Checkpoint salvo: {posicao:.0f} s transcritos")
+
+    def remover(self):
+        """Apaga o checkpoint de uma transcrição concluída."""
+        if os.path.exists(self.caminho):
+            os.remove(self.caminho)
@@ -0,0 +1,100 @@
+import os
+import sys
+import signal
+import argparse
+import threading
+import contextlib
+from estimador import MODELOS_WHISPER
+from memoria import POLITICAS_MEMORIA, POLITICA_PADRAO
+from saida import FORMATOS, gerar_saida
+
+
+def criar_parser():
+    """Define os argumentos aceitos pela linha de comando."""
+    parser = argparse.ArgumentParser(description="Transcreve arquivos de áudio/vídeo de oitivas sem interface gráfica.")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos de áudio ou vídeo a transcrever")
+    parser.add_argument("--modelo", default="preciso",
+                        help="rápido, moderado, preciso ou um nome de modelo Whisper (padrão: preciso)")
+    parser.add_argument("--dispositivo", default="cpu", choices=["cpu", "gpu", "cuda"],
+                        help="Dispositivo de execução (padrão: cpu)")
+    parser.add_argument("--modo", default="padrao", choices=["padrao", "paralelo", "janelas"],
+                        help="Passagem única, blocos em paralelo na CPU ou janelas com memória constante (padrão: padrao)")
+    parser.add_argument("--motor", default="whisper", choices=["whisper", "ctranslate2"],
+                        help="Motor de inferência: openai-whisper (PyTorch) ou faster-whisper (CTranslate2) (padrão: whisper)")
+    parser.add_argument("--sem-vad", action="store_true",
+                        help="Decodifica o áudio inteiro, sem pular os silêncios")
+    parser.add_argument("--politica-memoria", default=POLITICA_PADRAO, choices=POLITICAS_MEMORIA,
+                        help="Sem memória livre para o modelo: recusar, aguardar ou usar um modelo menor (padrão: %(default)s)")
+    parser.add_argument("--int8", action="store_true",
+                        help="Usa o modelo com as camadas lineares quantizadas para int8 (somente CPU)")
+    parser.add_argument("--formato", default="txt", choices=FORMATOS, help="Formato de saída (padrão: txt)")
+    parser.add_argument("--saida", help="Pasta onde gravar os resultados (padrão: imprime no stdout)")
+    parser.add_argument("--sem-streaming", action="store_true",
+                        help="Converte para WAV em disco em vez de decodificar direto para memória")
+    parser.add_argument("--sem-cache", action="store_true",
+                        help="Ignora o cache de transcrições e sempre decodifica o áudio")
+    return parser
+
+
+def main(argv=None):
+    """Transcreve os arquivos informados e grava ou imprime os resultados. Retorna o código de saída."""
+    args = criar_parser().parse_args(argv)
+
+    # 🔥 Importação tardia: Whisper e Torch só são carregados quando realmente vão ser usados
+    from nucleo_transcricao import transcrever_arquivo
+    from checkpoints import TranscricaoCancelada
+
+    modelo = MODELOS_WHISPER.get(args.modelo.lower(), args.modelo.lower())
+    dispositivo = "GPU" if args.dispositivo in ("gpu", "cuda") else "CPU"
+    if args.saida:
+        os.makedirs(args.saida, exist_ok=True)
+
+    # Primeiro Ctrl+C: para após o trecho atual, salvando o checkpoint (se o modo gravar um); o segundo encerra na hora
+    interrompido = threading.Event()
+
+    def interromper(sinal, quadro):
+        if interrompido.is_set():
+            raise KeyboardInterrupt
+        interrompido.set()
+        print("⏹️ Interrompendo após o trecho atual (Ctrl+C de novo para sair imediatamente)...", file=sys.stderr)
+
+    signal.signal(signal.SIGINT, interromper)
+
+    falhas = 0
+    for arquivo in args.arquivos:
+        try:
+            # Mensagens de andamento vão para o stderr, deixando o stdout só com o resultado
+            with contextlib.redirect_stdout(sys.stderr):
+                resultado = transcrever_arquivo(
+                    arquivo, modelo, dispositivo, args.modo, streaming=not args.sem_streaming,
+                    usar_cache=not args.sem_cache, precisao="int8" if args.int8 else "fp32",
+                    motor=args.motor, usar_vad=not args.sem_vad, deve_parar=interrompido.is_set,
+                    politica_memoria=args.politica_memoria
+                )
+        except TranscricaoCancelada as cancelamento:
+            if cancelamento.posicao:
+                print(f"⏹️ '{arquivo}' interrompido após {cancelamento.posicao:.0f} s; execute o mesmo comando para "
+                      "retomar do checkpoint.", file=sys.stderr)
+            else:
+                print(f"⏹️ '{arquivo}' interrompido antes de concluir algum trecho; nada a retomar.", file=sys.stderr)
+            return 130
+        except Exception as e:
+            print(f"❌ Erro ao transcrever '{arquivo}': {e}", file=sys.stderr)
+            falhas += 1
+            continue
+
+        conteudo = gerar_saida(resultado, args.formato)
+        if args.saida:
+            nome_base = os.path.splitext(os.path.basename(arquivo))[0]
+            caminho = os.path.join(args.saida, f"{nome_base}.{args.formato}")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write(conteudo)
+            print(f"💾 Resultado salvo em {caminho}", file=sys.stderr)
+        else:
+            sys.stdout.write(conteudo)
+
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+cache_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dispositivos_cache.json")
+VALIDADE_CACHE = 7 * 24 * 3600  # Redetecta o hardware pelo menos uma vez por semana (segundos)
+ARQUIVO_DRIVER_NVIDIA = "/proc/driver/nvidia/version"
+
+
+def gerar_assinatura():
+    """Gera uma assinatura do host: se ela mudar (hardware, sistema ou driver), o cache é invalidado."""
+    driver_nvidia = None
+    if os.path.exists(ARQUIVO_DRIVER_NVIDIA):
+        driver_nvidia = os.path.getmtime(ARQUIVO_DRIVER_NVIDIA)
+
+    return {
+        "host": platform.node(),
+        "sistema": platform.platform(),
+        "nucleos": os.cpu_count(),
+        "driver_nvidia": driver_nvidia,
+    }
+
+
+def detectar_cpu():
+    """Obtém o nome do processador de forma multiplataforma."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+                for linha in f:
+                    if linha.startswith("model name"):
+                        return linha.split(":", 1)[1].strip()
+        except OSError as e:
+            print(f"Erro ao ler /proc/cpuinfo: {e}")
+
+    elif sys.platform == "win32":
+        try:
+            import wmi  # Só existe no Windows
+            for cpu in wmi.WMI().Win32_Processor():
+                return cpu.Name.strip()
+        except Exception as e:
+            print(f"Erro ao detectar CPU via WMI: {e}")
+
+    elif sys.platform == "darwin":
+        try:
+            resultado = subprocess.run(["sysctl", "-n", "machdep.cpu.brand_string"], capture_output=True, text=True)
+            if resultado.returncode == 0 and resultado.stdout.strip():
+                return resultado.stdout.strip()
+        except OSError as e:
+            print(f"Erro ao detectar CPU via sysctl: {e}")
+
+    return platform.processor() or "Processador desconhecido"
+
+
+def detectar_gpus():
+    """Lista as GPUs NVIDIA via NVML, recorrendo ao nvidia-smi se a biblioteca não estiver disponível."""
+    try:
+        from py3nvml.py3nvml import nvmlInit, nvmlDeviceGetHandleByIndex, nvmlDeviceGetName, nvmlDeviceGetCount, nvmlShutdown
+    except ImportError:
+        nvmlInit = None
+
+    if nvmlInit is not None:
+        try:
+            nvmlInit()
+            try:
+                return [nvmlDeviceGetName(nvmlDeviceGetHandleByIndex(i)) for i in range(nvmlDeviceGetCount())]
+            finally:
+                nvmlShutdown()
+        except Exception as e:
+            print(f"Erro ao detectar GPUs via NVML: {e}")
+            return []
+
+    try:
+        resultado = subprocess.run(["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"],
+                                   capture_output=True, text=True)
+        if resultado.returncode == 0:
+            return [linha.strip() for linha in resultado.stdout.splitlines() if linha.strip()]
+    except OSError:
+        pass  # Sem driver NVIDIA instalado
+
+    return []
+
+
+def carregar_cache():
+    """Retorna os dispositivos em cache se ainda forem válidos para este host, ou None."""
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if cache.get("assinatura") != gerar_assinatura():
+        return None
+    if time.time() - cache.get("detectado_em", 0) > VALIDADE_CACHE:
+        return None
+    return cache.get("dispositivos")
+
+
+def salvar_cache(dispositivos):
+    """Salva os dispositivos detectados junto com a assinatura do host."""
+    cache = {"assinatura": gerar_assinatura(), "detectado_em": time.time(), "dispositivos": dispositivos}
+    try:
+        with open(cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=4, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️ Não foi possível salvar o cache de dispositivos: {e}")
+
+
+def get_devices(forcar_deteccao=False):
+    """Retorna a lista de dispositivos ("CPU: ..." e "GPU: ..."), usando o cache em disco quando válido."""
+    if not forcar_deteccao:
+        dispositivos = carregar_cache()
+        if dispositivos:
+            return dispositivos
+
+    dispositivos = [f"CPU: {detectar_cpu()}"]
+    dispositivos += [f"GPU: {nome}" for nome in detectar_gpus()]
+    salvar_cache(dispositivos)
+    return dispositivos
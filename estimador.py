@@ -1,8 +1,15 @@
-import os
-import json
-import statistics
+import math
+import platform
+from historico import historico
 
-data_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "transcript_data.json")
+REGISTROS_CONSIDERADOS = 10  # Quantidade de transcrições mais recentes usadas no fator médio
+MINIMO_PONTOS_HOST = 3  # Abaixo disso, a regressão usa o histórico de todos os hosts
+ETAPAS = ("sondagem", "conversao", "vad", "carregamento", "decodificacao", "formatacao")
+MARGEM_SEM_DISPERSAO = 0.15  # Margem do intervalo quando não há pontos suficientes para medir a dispersão
+
+# Quantis t de Student bilaterais de 95% por graus de liberdade (acima de 30, aproxima pela normal)
+QUANTIS_T_95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31, 9: 2.26,
+                10: 2.23, 12: 2.18, 15: 2.13, 20: 2.09, 25: 2.06, 30: 2.04}
 
 # 🔥 Mapeamento inteligente entre os modelos personalizados e os suportados pelo Whisper
 MODELOS_WHISPER = {
@@ -13,79 +20,29 @@ MODELOS_WHISPER = {
 
 MODELOS_REVERSO = {v: k for k, v in MODELOS_WHISPER.items()}
 
-def carregar_dados():
-    """Carrega os dados do JSON ou retorna um dicionário vazio se o arquivo não existir."""
-    if not os.path.exists(data_file):
-        salvar_dados({})  # Cria o arquivo vazio se não existir
-    
-    try:
-        with open(data_file, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {}
-
-def salvar_dados(data):
-    """Salva os dados no JSON."""
-    with open(data_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def registrar_transcricao(modelo, dispositivo, duracao_audio):
-    """Registra uma nova transcrição no JSON, aguardando o tempo real depois."""
-    data = carregar_dados()
+def registrar_transcricao(modelo, dispositivo, duracao_audio, tempo_real, etapas=None, memoria=None):
+    """Registra uma transcrição concluída no histórico, com o tempo real (e o tempo de cada etapa e a memória
+    amostrada, se informados). Só é chamado depois do sucesso: cancelamentos e erros não deixam registros. Retorna o id do trabalho."""
     modelo = MODELOS_REVERSO.get(modelo, modelo)  # Converte para nome personalizado
-    
-    if modelo not in data:
-        data[modelo] = {"GPU": [], "CPU": []}
-    
-    data[modelo][dispositivo].append({
-        "audio_duracao": round(duracao_audio, 2),  # 🔥 Arredondando para evitar problemas de precisão
-        "tempo_real": None  # Ainda não sabemos o tempo real
-    })
-    
-    # Limita a 10 registros mais recentes por modelo e dispositivo
-    data[modelo][dispositivo] = data[modelo][dispositivo][-10:]
-    
-    salvar_dados(data)
+    campos = {"tempo_real": tempo_real}
+    if etapas:
+        campos["etapas"] = {etapa: round(tempo, 3) for etapa, tempo in etapas.items()}
+    if memoria:
+        campos["memoria"] = memoria
+    trabalho_id = historico.registrar(
+        modelo, dispositivo,
+        audio_duracao=round(duracao_audio, 2),  # 🔥 Arredondando para evitar problemas de precisão
+        host=platform.node(), **campos
+    )
+    print(f"💾 Tempo real salvo no histórico: {tempo_real} segundos (trabalho {trabalho_id[:8]})")
+    return trabalho_id
 
-def atualizar_tempo_real(modelo, dispositivo, duracao_audio, tempo_real):
-    """Atualiza o tempo real de uma transcrição no JSON."""
-    data = carregar_dados()
-    modelo = MODELOS_REVERSO.get(modelo, modelo)  # Converte para nome personalizado
-    
-    print(f"🔍 Tentando atualizar tempo real: modelo={modelo}, dispositivo={dispositivo}, duracao_audio={duracao_audio}, tempo_real={tempo_real}")
-    
-    atualizado = False  # Flag para saber se algum valor foi atualizado
-
-    if modelo in data and dispositivo in data[modelo]:
-        for item in data[modelo][dispositivo]:
-            print(f"🧐 Comparando: JSON_duracao={item['audio_duracao']} VS Novo_duracao={round(duracao_audio, 2)}")
-            
-            # 🔥 Comparação aproximada para evitar erro de precisão
-            if abs(item["audio_duracao"] - round(duracao_audio, 2)) < 0.1 and item["tempo_real"] is None:
-                print(f"✅ Correspondência encontrada! Atualizando tempo_real para {tempo_real} segundos.")
-                item["tempo_real"] = tempo_real
-                atualizado = True
-                break
-        else:
-            print("⚠️ Nenhuma correspondência exata foi encontrada. O tempo real não foi salvo.")
-    else:
-        print(f"⚠️ Modelo ({modelo}) ou dispositivo ({dispositivo}) não encontrado no JSON.")
-    
-    # 🔥 Se foi atualizado, salvar os dados e imprimir o JSON atualizado
-    if atualizado:
-        print(f"📝 JSON atualizado antes de salvar: {json.dumps(data, indent=4, ensure_ascii=False)}")
-        salvar_dados(data)
-        print("💾 JSON salvo com sucesso!")
-
-def estimar_tempo(modelo, dispositivo, duracao_audio):
-    """Estima o tempo de transcrição com base nos registros anteriores, arredondando e adicionando 15% de margem."""
-    data = carregar_dados()
+def calcular_fator_medio(modelo, dispositivo):
+    """Calcula a razão média tempo_real / audio_duracao do histórico, ou None se não houver dados."""
     modelo = MODELOS_REVERSO.get(modelo, modelo)  # Converte para nome personalizado
     
-    if modelo not in data or dispositivo not in data[modelo]:
-        return None  # Sem dados suficientes
-    
-    tempos_anteriores = [item["tempo_real"] / item["audio_duracao"] for item in data[modelo][dispositivo] if item["tempo_real"]]
+    concluidos = [item for item in historico.registros(modelo, dispositivo) if item.get("tempo_real")]
+    tempos_anteriores = [item["tempo_real"] / item["audio_duracao"] for item in concluidos[-REGISTROS_CONSIDERADOS:]]
     
     if not tempos_anteriores:
         return None  # Nenhuma transcrição completa ainda
@@ -97,10 +54,123 @@ def estimar_tempo(modelo, dispositivo, duracao_audio):
     
     # 🔥 Média ponderada para dar mais peso aos registros mais recentes
     pesos = [i+1 for i in range(len(tempos_anteriores))]
-    fator_medio = sum(t * p for t, p in zip(tempos_anteriores, pesos)) / sum(pesos)
+    return sum(t * p for t, p in zip(tempos_anteriores, pesos)) / sum(pesos)
+
+def quantil_t_95(graus_liberdade):
+    """Quantil t de Student de 95% (bilateral) para os graus de liberdade informados."""
+    for limite in sorted(QUANTIS_T_95):
+        if graus_liberdade <= limite:
+            return QUANTIS_T_95[limite]
+    return 1.96
+
+def ajustar_reta(pontos):
+    """Ajusta tempo = intercepto + inclinacao * duracao por mínimos quadrados.
+
+    Com menos de 3 pontos (ou durações iguais) usa a razão média, sem intercepto. Retorna um
+    dicionário com os coeficientes e o necessário para o intervalo de predição, ou None sem pontos.
+    """
+    n = len(pontos)
+    if n == 0:
+        return None
+
+    soma_x = sum(x for x, _ in pontos)
+    soma_y = sum(y for _, y in pontos)
+    media_x, media_y = soma_x / n, soma_y / n
+    sxx = sum((x - media_x) ** 2 for x, _ in pontos)
+
+    if n < 3 or sxx < 1e-9:
+        intercepto, inclinacao = 0.0, (soma_y / soma_x if soma_x > 0 else 0.0)
+    else:
+        inclinacao = sum((x - media_x) * (y - media_y) for x, y in pontos) / sxx
+        intercepto = media_y - inclinacao * media_x
+        if inclinacao < 0:  # O tempo não diminui com a duração: a etapa é um custo fixo
+            intercepto, inclinacao = media_y, 0.0
+        elif intercepto < 0:  # Custo fixo negativo não faz sentido: reta pela origem
+            intercepto, inclinacao = 0.0, sum(x * y for x, y in pontos) / sum(x * x for x, _ in pontos)
+
+    desvio = None
+    if n > 2:
+        residuos = sum((y - intercepto - inclinacao * x) ** 2 for x, y in pontos)
+        desvio = math.sqrt(residuos / (n - 2))
+
+    return {"intercepto": intercepto, "inclinacao": inclinacao, "desvio": desvio,
+            "n": n, "media_x": media_x, "sxx": sxx}
+
+def prever(reta, duracao_audio):
+    """Retorna o tempo previsto e o erro padrão da predição (None se não houver dispersão medida)."""
+    previsto = reta["intercepto"] + reta["inclinacao"] * duracao_audio
+    if reta["desvio"] is None:
+        return previsto, None
+
+    alavanca = (duracao_audio - reta["media_x"]) ** 2 / reta["sxx"] if reta["sxx"] > 0 else 0
+    return previsto, reta["desvio"] * math.sqrt(1 + 1 / reta["n"] + alavanca)
+
+def registros_para_regressao(modelo, dispositivo, host):
+    """Seleciona os registros concluídos do host atual, ou de todos os hosts se ele tiver poucos dados."""
+    modelo = MODELOS_REVERSO.get(modelo, modelo)  # Converte para nome personalizado
+    concluidos = [item for item in historico.registros(modelo, dispositivo) if item.get("tempo_real")]
+    do_host = [item for item in concluidos if item.get("host") == host]
+    return do_host if len(do_host) >= MINIMO_PONTOS_HOST else concluidos
+
+def estimar_etapas(modelo, dispositivo, duracao_audio, host=None, modelo_carregado=False):
+    """Estima o tempo de cada etapa e o total, com intervalo de 95%, por regressão sobre todo o histórico.
+
+    Cada etapa (sondagem, conversão, carga do modelo e decodificação) tem seu próprio custo fixo e
+    custo por segundo de áudio, ajustados por (modelo, dispositivo, host). Registros antigos, sem
+    tempos por etapa, só entram na regressão do tempo total. Retorna None sem histórico.
+    """
+    registros = registros_para_regressao(modelo, dispositivo, host or platform.node())
+    if not registros:
+        return None
+
+    etapas, variancia, sem_dispersao = {}, 0.0, False
+    com_etapas = [item for item in registros if item.get("etapas")]
+
+    if com_etapas:
+        for etapa in ETAPAS:
+            if etapa == "carregamento" and modelo_carregado:
+                continue  # Modelo já está em memória
+            pontos = [(item["audio_duracao"], item["etapas"][etapa]) for item in com_etapas if etapa in item["etapas"]]
+            reta = ajustar_reta(pontos)
+            if reta is None:
+                continue
+            previsto, erro = prever(reta, duracao_audio)
+            etapas[etapa] = previsto
+            if erro is None:
+                sem_dispersao = True
+            else:
+                variancia += erro ** 2
+        graus_liberdade = len(com_etapas) - 2
+    else:
+        reta = ajustar_reta([(item["audio_duracao"], item["tempo_real"]) for item in registros])
+        previsto, erro = prever(reta, duracao_audio)
+        etapas["total"] = previsto
+        sem_dispersao = erro is None
+        variancia = (erro or 0) ** 2
+        graus_liberdade = len(registros) - 2
+
+    total = sum(etapas.values())
+    if sem_dispersao or graus_liberdade < 1:
+        margem = total * MARGEM_SEM_DISPERSAO
+    else:
+        margem = quantil_t_95(graus_liberdade) * math.sqrt(variancia)
+
+    return {"etapas": etapas, "total": total, "intervalo": (max(total - margem, 0.0), total + margem)}
+
+def estimar_tempo(modelo, dispositivo, duracao_audio, modelo_carregado=False):
+    """Estima o tempo total de transcrição (segundos, arredondado) a partir da regressão do histórico."""
+    estimativa = estimar_etapas(modelo, dispositivo, duracao_audio, modelo_carregado=modelo_carregado)
+    
+    if estimativa is None:
+        return None
+    
+    return round(estimativa["total"])
+
+def calcular_aceleracao(modelo, dispositivo_base, duracao_audio, tempo_real):
+    """Compara o tempo real com o histórico de referência (ex.: CPU em passagem única)."""
+    fator_medio = calcular_fator_medio(modelo, dispositivo_base)
     
-    # Calcula o tempo estimado, arredonda e adiciona 15% de margem
-    tempo_estimado = fator_medio * duracao_audio
-    tempo_com_margem = round(tempo_estimado * 1.15)
+    if fator_medio is None or tempo_real <= 0:
+        return None
     
-    return tempo_com_margem
+    return (fator_medio * duracao_audio) / tempo_real
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import uuid
+import threading
+from nucleo_transcricao import transcrever_arquivo, preparar_audio, MODO_PADRAO, MODO_JANELAS, PRECISAO_PADRAO, MOTOR_PADRAO
+from checkpoints import TranscricaoCancelada
+from pipeline import EtapaPipeline, UtilizacaoEtapas
+import cache_transcricoes
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+fila_file = os.path.join(base_dir, "fila_transcricao.json")
+resultados_dir = os.path.join(base_dir, "resultados")
+
+# Situações possíveis de um trabalho na fila
+PENDENTE = "pendente"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+_lock = threading.Lock()  # Protege leituras e escritas do arquivo da fila
+
+
+def carregar_fila():
+    """Carrega os trabalhos da fila do JSON ou retorna uma lista vazia se o arquivo não existir."""
+    if not os.path.exists(fila_file):
+        return []
+
+    try:
+        with open(fila_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return []
+
+
+def salvar_fila(fila):
+    """Salva a fila no JSON de forma atômica (grava em arquivo temporário e substitui)."""
+    temporario = fila_file + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(fila, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, fila_file)
+
+
+def adicionar_trabalho(arquivo, modelo, dispositivo, modo=MODO_PADRAO, prioridade=0, duracao_audio=None,
+                       precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO, usar_vad=True):
+    """Adiciona um arquivo à fila. Prioridades maiores são executadas antes."""
+    trabalho = {
+        "id": uuid.uuid4().hex,
+        "arquivo": arquivo,
+        "modelo": modelo,
+        "dispositivo": dispositivo,
+        "modo": modo,
+        "precisao": precisao,
+        "motor": motor,
+        "vad": usar_vad,
+        "prioridade": prioridade,
+        "status": PENDENTE,
+        "criado_em": time.time(),
+        "inicio": None,
+        "fim": None,
+        "duracao_audio": duracao_audio,  # Conhecida já na inclusão, para estimar o tempo da fila
+        "tempo_real": None,
+        "resultado": None,
+        "erro": None,
+    }
+
+    with _lock:
+        fila = carregar_fila()
+        fila.append(trabalho)
+        salvar_fila(fila)
+
+    return trabalho
+
+
+def atualizar_trabalho(trabalho_id, **campos):
+    """Atualiza os campos de um trabalho e devolve o trabalho atualizado (ou None se não existir)."""
+    with _lock:
+        fila = carregar_fila()
+        for trabalho in fila:
+            if trabalho["id"] == trabalho_id:
+                trabalho.update(campos)
+                salvar_fila(fila)
+                return trabalho
+    return None
+
+
+def proximo_trabalho(por_prioridade=True, ignorar=()):
+    """Retorna o próximo trabalho pendente, por prioridade ou por ordem de chegada (fora os ids em ignorar)."""
+    pendentes = [t for t in carregar_fila() if t["status"] == PENDENTE and t["id"] not in ignorar]
+    if not pendentes:
+        return None
+
+    if por_prioridade:
+        return min(pendentes, key=lambda t: (-t["prioridade"], t["criado_em"]))
+    return min(pendentes, key=lambda t: t["criado_em"])
+
+
+def recuperar_interrompidos():
+    """Devolve à fila os trabalhos que ficaram "em andamento" após uma queda do programa."""
+    with _lock:
+        fila = carregar_fila()
+        interrompidos = [t for t in fila if t["status"] == EM_ANDAMENTO]
+        for trabalho in interrompidos:
+            trabalho["status"] = PENDENTE
+        if interrompidos:
+            salvar_fila(fila)
+    return len(interrompidos)
+
+
+def limpar_finalizados():
+    """Remove da fila os trabalhos concluídos ou com erro."""
+    with _lock:
+        fila = [t for t in carregar_fila() if t["status"] not in (CONCLUIDO, ERRO)]
+        salvar_fila(fila)
+    return fila
+
+
+def caminho_checkpoint_trabalho(trabalho, pasta=resultados_dir):
+    """Checkpoint do trabalho, gravado junto dos resultados da fila."""
+    nome_base = os.path.splitext(os.path.basename(trabalho["arquivo"]))[0]
+    return os.path.join(pasta, f"{nome_base}_{trabalho['id'][:8]}.checkpoint.json")
+
+
+def salvar_resultado(trabalho, texto, pasta=resultados_dir):
+    """Grava o texto transcrito em disco e retorna o caminho do arquivo."""
+    os.makedirs(pasta, exist_ok=True)
+    nome_base = os.path.splitext(os.path.basename(trabalho["arquivo"]))[0]
+    caminho = os.path.join(pasta, f"{nome_base}_{trabalho['id'][:8]}.txt")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto)
+    return caminho
+
+
+def processar_fila(por_prioridade=True, ao_iniciar=None, ao_concluir=None, ao_falhar=None,
+                   ao_progredir=None, deve_parar=None, deve_cancelar=None, ao_cancelar=None,
+                   ao_segmentos=None):
+    """Executa os trabalhos pendentes um a um, até esvaziar a fila (ou deve_parar() retornar True).
+
+    Se deve_cancelar() retornar True, o trabalho atual é interrompido e volta a ficar pendente:
+    o checkpoint gravado junto dele permite retomá-lo de onde parou.
+
+    Os modelos ficam em cache no gerenciador de modelos, então trabalhos com o mesmo modelo e
+    dispositivo reaproveitam o modelo já carregado. Enquanto um trabalho está no modelo, o áudio do
+    próximo é sondado e decodificado numa etapa de E/S à parte (um arquivo à frente, no máximo).
+    Retorna um resumo agregado da execução, com a utilização de cada etapa.
+    """
+    recuperar_interrompidos()
+    inicio_fila = time.time()
+    resumo = {"concluidos": 0, "erros": 0, "audio_total": 0.0, "tempo_total": 0.0, "fator_tempo_real": None}
+
+    utilizacao = UtilizacaoEtapas()
+    preparacao = EtapaPipeline("preparacao", preparar_audio, utilizacao)
+    preparando = None  # Id do trabalho cujo áudio está na etapa de preparação
+
+    def preparar_seguinte(atual):
+        """Envia à etapa de E/S o trabalho que deve vir depois do atual."""
+        nonlocal preparando
+        seguinte = proximo_trabalho(por_prioridade, ignorar={atual["id"]})
+        # No modo janelas o áudio é lido em blocos durante a decodificação; áudio já conhecido sai do cache
+        if (seguinte and seguinte["modo"] != MODO_JANELAS
+                and not cache_transcricoes.impressao_conhecida(seguinte["arquivo"])):
+            preparacao.enviar(seguinte["id"], seguinte["arquivo"])
+            preparando = seguinte["id"]
+
+    def receber_preparado(trabalho):
+        """Áudio do trabalho vindo da etapa de E/S, ou None para o núcleo prepará-lo durante a transcrição."""
+        nonlocal preparando
+        if preparando is None:
+            return None
+        chave, preparado, erro = preparacao.receber()
+        preparando = None
+        if chave != trabalho["id"]:
+            return None  # A fila mudou (ex.: trabalho mais prioritário incluído): o áudio preparado é descartado
+        if erro:
+            print(f"⚠️ Falha ao preparar {os.path.basename(trabalho['arquivo'])} antecipadamente: {erro}")
+            return None  # O núcleo tenta de novo e relata o erro como falha do trabalho
+        return preparado
+
+    try:
+        while not (deve_parar and deve_parar()):
+            trabalho = proximo_trabalho(por_prioridade)
+            if trabalho is None:
+                break
+
+            trabalho = atualizar_trabalho(trabalho["id"], status=EM_ANDAMENTO, inicio=time.time())
+            if ao_iniciar:
+                ao_iniciar(trabalho)
+
+            preparado = receber_preparado(trabalho)
+            preparar_seguinte(trabalho)
+            continuar = processar_trabalho(trabalho, preparado, resumo, utilizacao, ao_concluir, ao_falhar, ao_progredir,
+                                           ao_segmentos, deve_cancelar, ao_cancelar)
+            preparado = None  # Solta o áudio antes de receber o do próximo trabalho
+            if not continuar:
+                break
+    finally:
+        preparacao.encerrar()
+
+    resumo["tempo_total"] = time.time() - inicio_fila
+    if resumo["audio_total"] > 0:
+        resumo["fator_tempo_real"] = resumo["tempo_total"] / resumo["audio_total"]
+    resumo["etapas"] = utilizacao.resumo()
+
+    print(f"📦 Fila finalizada: {resumo['concluidos']} concluídos, {resumo['erros']} com erro, "
+          f"{resumo['audio_total']:.0f} s de áudio em {resumo['tempo_total']:.0f} s")
+    for nome, etapa in resumo["etapas"].items():
+        print(f"   Etapa {nome}: {etapa['itens']} arquivo(s), ocupada {etapa['ocupado']:.0f} s "
+              f"({etapa['utilizacao'] or 0:.0%} do tempo da fila)")
+    return resumo
+
+
+def processar_trabalho(trabalho, preparado, resumo, utilizacao, ao_concluir=None, ao_falhar=None, ao_progredir=None,
+                       ao_segmentos=None, deve_cancelar=None, ao_cancelar=None):
+    """Transcreve um trabalho da fila (etapa de transcrição) e atualiza sua situação e o resumo.
+
+    Retorna False se o trabalho foi cancelado, indicando que a fila deve parar.
+    """
+    try:
+        with utilizacao.etapa("transcricao"):
+            resultado = transcrever_arquivo(
+                trabalho["arquivo"], trabalho["modelo"], trabalho["dispositivo"], trabalho["modo"],
+                ao_progredir=ao_progredir, ao_segmentos=ao_segmentos,
+                # Trabalhos antigos não têm os campos de precisão e motor
+                precisao=trabalho.get("precisao", PRECISAO_PADRAO), motor=trabalho.get("motor", MOTOR_PADRAO),
+                usar_vad=trabalho.get("vad", True), deve_parar=deve_cancelar,
+                arquivo_checkpoint=caminho_checkpoint_trabalho(trabalho), audio_preparado=preparado
+            )
+        caminho = salvar_resultado(trabalho, resultado["texto"])
+        trabalho = atualizar_trabalho(
+            trabalho["id"], status=CONCLUIDO, fim=time.time(), resultado=caminho, modelo_usado=resultado["modelo"],
+            duracao_audio=resultado["duracao"], tempo_real=resultado["tempo_real"]
+        )
+        resumo["concluidos"] += 1
+        resumo["audio_total"] += resultado["duracao"]
+        if ao_concluir:
+            ao_concluir(trabalho, resultado["texto"])
+
+    except TranscricaoCancelada:
+        trabalho = atualizar_trabalho(trabalho["id"], status=PENDENTE, inicio=None)
+        if ao_cancelar:
+            ao_cancelar(trabalho)
+        return False
+
+    except Exception as e:
+        trabalho = atualizar_trabalho(trabalho["id"], status=ERRO, fim=time.time(), erro=str(e))
+        resumo["erros"] += 1
+        if ao_falhar:
+            ao_falhar(trabalho, str(e))
+
+    return True
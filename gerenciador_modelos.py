@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from quantizacao import PRECISAO_PADRAO
+from motores import MOTOR_PADRAO, obter_motor
+
+# 🔥 Orçamento de memória (em MB) para os modelos mantidos carregados no processo
+ORCAMENTO_PADRAO_MB = int(os.environ.get("TRANSCRITOR_ORCAMENTO_MODELOS_MB", "8192"))
+
+# Tamanho aproximado (MB, fp32) usado no orçamento quando o motor não expõe os pesos
+TAMANHO_SEM_MEDIDA_MB = {"tiny": 150, "base": 290, "small": 970, "medium": 3060, "large": 6170}
+
+
+def tamanho_modelo_mb(modelo_whisper):
+    """Calcula a memória ocupada pelos pesos e buffers do modelo, em MB (None se o motor não expõe os pesos)."""
+    if not hasattr(modelo_whisper, "parameters"):
+        return None  # Modelos do CTranslate2 ficam fora do PyTorch
+    total = sum(p.numel() * p.element_size() for p in modelo_whisper.parameters())
+    total += sum(b.numel() * b.element_size() for b in modelo_whisper.buffers())
+    for camada in modelo_whisper.modules():
+        if hasattr(camada, "_weight_bias"):  # Camadas quantizadas guardam os pesos int8 fora de parameters()
+            peso, vies = camada._weight_bias()
+            total += peso.numel() * peso.element_size() + (vies.numel() * vies.element_size() if vies is not None else 0)
+    return total / (1024 * 1024)
+
+
+class GerenciadorModelos:
+    """Mantém os modelos carregados entre transcrições, com despejo LRU por orçamento de memória."""
+
+    def __init__(self, orcamento_mb=ORCAMENTO_PADRAO_MB):
+        self.orcamento_mb = orcamento_mb
+        self._modelos = OrderedDict()  # (modelo, dispositivo, precisao, motor) -> (modelo_carregado, tamanho_mb)
+        self._lock = threading.RLock()  # Protege _modelos; nunca fica preso durante uma carga
+        self._lock_carga = threading.Lock()  # Uma carga por vez, para o orçamento valer também durante a carga
+
+    def obter(self, modelo, dispositivo, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO):
+        """Retorna o modelo pedido, carregando-o pelo motor de inferência apenas se ainda não estiver em memória.
+
+        Com precisao="int8" (somente CPU), carrega a versão quantizada do modelo. O espaço é liberado antes
+        da carga, pelo tamanho estimado, e ajustado depois pelo tamanho medido.
+        """
+        chave = (modelo, dispositivo, precisao, motor)
+
+        with self._lock_carga:
+            with self._lock:
+                if chave in self._modelos:
+                    self._modelos.move_to_end(chave)  # Marca como usado mais recentemente
+                    print(f"♻️ Reutilizando modelo em memória: {modelo} ({dispositivo}, {precisao}, {motor})")
+                    return self._modelos[chave][0]
+                self._liberar_espaco(TAMANHO_SEM_MEDIDA_MB.get(modelo, 0))  # Pico: só o que cabe no orçamento
+
+            print(f"📥 Carregando modelo: {modelo} ({dispositivo}, {precisao}, {motor})...")
+            inicio = time.time()
+            modelo_whisper = obter_motor(motor).carregar(modelo, dispositivo, precisao)
+            tamanho_mb = tamanho_modelo_mb(modelo_whisper)
+            if tamanho_mb is None:
+                tamanho_mb = TAMANHO_SEM_MEDIDA_MB.get(modelo, 0)
+            print(f"✅ Modelo carregado em {time.time() - inicio:.2f} segundos ({tamanho_mb:.0f} MB)")
+
+            with self._lock:
+                self._liberar_espaco(tamanho_mb)  # A estimativa pode ter ficado abaixo do tamanho medido
+                self._modelos[chave] = (modelo_whisper, tamanho_mb)
+            return modelo_whisper
+
+    def contem(self, modelo, dispositivo, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO):
+        """Indica se o modelo já está carregado (e portanto não terá custo de carga)."""
+        with self._lock:
+            return (modelo, dispositivo, precisao, motor) in self._modelos
+
+    def memoria_utilizada_mb(self, dispositivo=None):
+        """Soma a memória estimada dos modelos carregados (só os do dispositivo, se informado)."""
+        with self._lock:
+            return sum(tamanho for chave, (_, tamanho) in self._modelos.items()
+                       if dispositivo is None or chave[1] == dispositivo)
+
+    def definir_orcamento(self, orcamento_mb):
+        """Altera o orçamento de memória, despejando modelos se necessário."""
+        with self._lock:
+            self.orcamento_mb = orcamento_mb
+            self._liberar_espaco(0)
+
+    def descarregar(self, modelo=None, dispositivo=None, precisao=None, motor=None):
+        """Remove da memória os modelos que correspondem ao filtro (ou todos, sem filtro)."""
+        filtro = (modelo, dispositivo, precisao, motor)
+        with self._lock:
+            for chave in list(self._modelos):
+                if all(valor is None or valor == parte for valor, parte in zip(filtro, chave)):
+                    self._remover(chave)
+
+    def _liberar_espaco(self, novo_mb):
+        """Despeja os modelos menos usados até que o novo modelo caiba no orçamento."""
+        while self._modelos and self.memoria_utilizada_mb() + novo_mb > self.orcamento_mb:
+            chave = next(iter(self._modelos))
+            print(f"🗑️ Despejando modelo {chave[0]} ({chave[1]}) para respeitar o orçamento de {self.orcamento_mb} MB")
+            self._remover(chave)
+
+    def _remover(self, chave):
+        """Descarta um modelo e devolve a memória ao sistema."""
+        modelo_whisper, _ = self._modelos.pop(chave)
+        del modelo_whisper
+        obter_motor(chave[3]).descarregar(chave[1])
+
+
+# 🔥 Instância única compartilhada por todas as threads de transcrição do processo
+gerenciador_modelos = GerenciadorModelos()
+
+
+def obter_modelo(modelo, dispositivo, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO):
+    """Atalho para obter um modelo pelo gerenciador global."""
+    return gerenciador_modelos.obter(modelo, dispositivo, precisao, motor)
@@ -0,0 +1,199 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+historico_file = os.environ.get("TRANSCRITOR_HISTORICO", os.path.join(base_dir, "historico_transcricoes.jsonl"))
+legado_file = os.path.join(base_dir, "transcript_data.json")  # Formato antigo, importado uma única vez
+
+# 🔥 Compacta o log quando houver mais que este número de eventos por trabalho registrado
+# (as atualizações acrescentam eventos a trabalhos já registrados; o custo amortizado é constante)
+FATOR_COMPACTACAO = 1.5
+
+
+@contextmanager
+def trava_arquivo(caminho):
+    """Trava exclusiva entre processos, usando um arquivo .lock ao lado do histórico."""
+    with open(caminho + ".lock", "a+b") as trava:
+        if sys.platform == "win32":
+            import msvcrt
+            trava.seek(0)
+            msvcrt.locking(trava.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                trava.seek(0)
+                msvcrt.locking(trava.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(trava.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+
+
+class HistoricoTranscricoes:
+    """Histórico de transcrições em log só de acréscimo (JSON lines), indexado em memória por trabalho.
+
+    Cada linha é um evento {"id": ..., campos...}: o primeiro evento de um id cria o registro e os
+    seguintes atualizam seus campos. Escritas acrescentam uma única linha sob trava entre processos,
+    então execuções simultâneas não sobrescrevem umas às outras. A leitura só processa as linhas novas
+    desde a última sincronização.
+    """
+
+    def __init__(self, caminho=historico_file, legado=legado_file):
+        self.caminho = caminho
+        self.legado = legado
+        self._lock = threading.Lock()
+        self._registros = {}  # id -> registro
+        self._por_chave = {}  # (modelo, dispositivo) -> ids em ordem de registro
+        self._eventos = 0
+        self._posicao = 0  # Bytes do log já processados
+        self._inode = None  # Detecta quando outro processo compactou (substituiu) o arquivo
+
+    def _reiniciar_indice(self):
+        """Esvazia o índice em memória, para reconstruí-lo do log."""
+        self._registros.clear()
+        self._por_chave.clear()
+        self._eventos = 0
+        self._posicao = 0
+
+    def _aplicar(self, evento):
+        """Aplica um evento do log ao índice em memória."""
+        self._eventos += 1
+        registro = self._registros.get(evento["id"])
+        if registro is None:
+            registro = dict(evento)
+            self._registros[evento["id"]] = registro
+            self._por_chave.setdefault((registro.get("modelo"), registro.get("dispositivo")), []).append(evento["id"])
+        else:
+            registro.update(evento)
+
+    def _sincronizar(self):
+        """Lê apenas as linhas acrescentadas ao log desde a última leitura."""
+        if not os.path.exists(self.caminho):
+            return
+
+        estado = os.stat(self.caminho)
+        if estado.st_ino != self._inode or estado.st_size < self._posicao:
+            self._reiniciar_indice()
+            self._inode = estado.st_ino
+
+        if estado.st_size == self._posicao:
+            return
+
+        with open(self.caminho, "rb") as f:
+            f.seek(self._posicao)
+            dados = f.read()
+
+        fim = dados.rfind(b"\n") + 1  # Ignora uma linha ainda incompleta no final
+        for linha in dados[:fim].splitlines():
+            if linha.strip():
+                try:
+                    self._aplicar(json.loads(linha))
+                except (json.JSONDecodeError, KeyError):
+                    print(f"⚠️ Linha inválida ignorada no histórico: {linha[:80]!r}")
+        self._posicao += fim
+
+    def _anexar(self, evento):
+        """Acrescenta um evento ao log de forma atômica e o aplica ao índice."""
+        linha = (json.dumps(evento, ensure_ascii=False) + "\n").encode("utf-8")
+        self._garantir_arquivo()
+        with self._lock, trava_arquivo(self.caminho):
+            self._sincronizar()
+            with open(self.caminho, "ab") as f:
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+            self._sincronizar()
+            precisa_compactar = self._eventos > FATOR_COMPACTACAO * max(len(self._registros), 1) + 100
+
+        if precisa_compactar:
+            self.compactar()
+
+    def _garantir_arquivo(self):
+        """Cria o log na primeira execução, importando o histórico do formato antigo se existir."""
+        if os.path.exists(self.caminho):
+            return
+
+        with self._lock, trava_arquivo(self.caminho):
+            if not os.path.exists(self.caminho):  # Outro processo pode ter criado enquanto esperávamos
+                self._migrar_legado()
+
+    def _migrar_legado(self):
+        """Importa o transcript_data.json antigo (modelo -> dispositivo -> registros) para o novo log."""
+        if not self.legado or not os.path.exists(self.legado):
+            self._gravar_atomico([])
+            return
+
+        try:
+            with open(self.legado, "r", encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            dados = {}
+
+        linhas = []
+        for modelo, dispositivos in dados.items():
+            for dispositivo, itens in dispositivos.items():
+                for item in itens:
+                    evento = {"id": uuid.uuid4().hex, "modelo": modelo, "dispositivo": dispositivo, **item}
+                    linhas.append(json.dumps(evento, ensure_ascii=False))
+
+        self._gravar_atomico(linhas)
+        print(f"📦 {len(linhas)} registros importados de {os.path.basename(self.legado)} para o histórico")
+
+    def _gravar_atomico(self, linhas):
+        """Substitui o log inteiro de forma atômica (arquivo temporário + os.replace)."""
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write("".join(linha + "\n" for linha in linhas))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, self.caminho)
+
+    def registrar(self, modelo, dispositivo, **campos):
+        """Registra um novo trabalho e retorna seu id."""
+        trabalho_id = uuid.uuid4().hex
+        self._anexar({"id": trabalho_id, "modelo": modelo, "dispositivo": dispositivo,
+                      "registrado_em": time.time(), **campos})
+        return trabalho_id
+
+    def atualizar(self, trabalho_id, **campos):
+        """Atualiza campos de um trabalho já registrado."""
+        self._anexar({"id": trabalho_id, **campos})
+
+    def obter(self, trabalho_id):
+        """Retorna o registro de um trabalho, ou None."""
+        self._garantir_arquivo()
+        with self._lock:
+            self._sincronizar()
+            return self._registros.get(trabalho_id)
+
+    def registros(self, modelo, dispositivo):
+        """Retorna os registros de um modelo e dispositivo, do mais antigo ao mais recente."""
+        self._garantir_arquivo()
+        with self._lock:
+            self._sincronizar()
+            return [self._registros[i] for i in self._por_chave.get((modelo, dispositivo), [])]
+
+    def compactar(self):
+        """Reescreve o log com uma única linha por trabalho, descartando os eventos já consolidados
+        e os trabalhos que nunca receberam o tempo real (interrompidos em versões anteriores)."""
+        with self._lock, trava_arquivo(self.caminho):
+            self._sincronizar()
+            linhas = [json.dumps(registro, ensure_ascii=False) for registro in self._registros.values()
+                      if registro.get("tempo_real") is not None]
+            self._gravar_atomico(linhas)
+            self._reiniciar_indice()
+            self._inode = None
+            self._sincronizar()
+        print(f"🗜️ Histórico compactado: {len(linhas)} trabalhos")
+
+
+# 🔥 Instância única usada pelo estimador
+historico = HistoricoTranscricoes()
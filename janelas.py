@@ -0,0 +1,120 @@
+import os
+import wave
+import threading
+import subprocess
+import numpy as np
+from midia import argumentos_entrada_ffmpeg
+from transcricao_paralela import calcular_pontos_corte
+from vad import detectar_fala, compactar_audio
+
+TAXA_AMOSTRAGEM = 16000
+DURACAO_LEITURA = 300  # Segundos decodificados por vez: o pico de memória depende disto, não da duração da gravação
+
+
+def ler_blocos_pcm(input_file, amostras_por_bloco, inicio=0):
+    """Decodifica o áudio com FFmpeg em blocos de tamanho fixo (float32, 16 kHz, mono), à medida que são consumidos.
+
+    O último bloco pode ser menor. Nunca mantém mais de um bloco decodificado em memória.
+    Com inicio (segundos), o FFmpeg começa direto nessa posição, sem decodificar o trecho anterior.
+    """
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f"Erro: O arquivo '{input_file}' não foi encontrado.")
+
+    comando = [
+        "ffmpeg", "-nostdin", *(["-ss", f"{inicio:.3f}"] if inicio else []), *argumentos_entrada_ffmpeg(input_file),
+        "-f", "s16le", "-ac", "1",
+        "-ar", str(TAXA_AMOSTRAGEM), "-c:a", "pcm_s16le", "-loglevel", "error", "-"
+    ]
+
+    try:
+        processo = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao iniciar o FFmpeg: {e}")
+
+    # Lê o stderr em paralelo para o FFmpeg nunca bloquear com o pipe cheio
+    erros = []
+    leitor_erros = threading.Thread(target=lambda: erros.append(processo.stderr.read()), daemon=True)
+    leitor_erros.start()
+
+    try:
+        while True:
+            bloco = processo.stdout.read(amostras_por_bloco * 2)  # Lê até completar o bloco (ou até o fim)
+            bloco = bloco[:len(bloco) - (len(bloco) % 2)]  # Amostras s16le têm 2 bytes
+            if not bloco:
+                break
+            yield np.frombuffer(bloco, dtype=np.int16).astype(np.float32) / 32768.0
+    finally:
+        processo.stdout.close()
+        if processo.poll() is None:
+            processo.kill()  # Consumidor parou antes do fim (erro ou cancelamento)
+        processo.wait()
+        leitor_erros.join()
+
+    if processo.returncode != 0:
+        mensagem = erros[0].decode("utf-8", errors="replace") if erros else ""
+        raise RuntimeError(f"Erro ao decodificar áudio: {mensagem}")
+
+
+def ler_blocos_wav(arquivo_wav, amostras_por_bloco, inicio=0):
+    """Lê um WAV PCM 16 bits mono a 16 kHz (gerado por converter_para_wav) em blocos de tamanho fixo, a partir de inicio (s)."""
+    with wave.open(arquivo_wav, "rb") as f:
+        f.setpos(min(int(inicio * TAXA_AMOSTRAGEM), f.getnframes()))
+        while True:
+            quadros = f.readframes(amostras_por_bloco)
+            if not quadros:
+                break
+            yield np.frombuffer(quadros, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def agrupar_em_janelas(blocos, duracao_janela, busca_silencio):
+    """Reagrupa blocos contínuos nas janelas do decodificador, cortadas no trecho mais silencioso perto de cada limite.
+
+    Gera tuplas (inicio, audio_janela), com o início em amostras. A última janela de cada bloco só é
+    entregue quando chega o bloco seguinte, para que nenhum corte caia no meio de uma palavra.
+    """
+    pendente = np.empty(0, dtype=np.float32)
+    inicio = 0
+    for bloco in blocos:
+        pendente = np.concatenate((pendente, bloco))
+        cortes = calcular_pontos_corte(pendente, duracao_janela, busca_silencio)
+        for corte, proximo in zip(cortes, cortes[1:-1]):
+            yield inicio + corte, pendente[corte:proximo]
+        inicio += cortes[-2]
+        pendente = pendente[cortes[-2]:].copy()  # Solta o bloco já entregue
+
+    if len(pendente):
+        yield inicio, pendente
+
+
+class CompactadorVAD:
+    """Aplica o VAD a cada bloco lido, deixando passar só as regiões com fala.
+
+    O mapa de tempos (como o de compactar_audio) e as regiões na linha do tempo original
+    são completados à medida que os blocos passam.
+    """
+
+    def __init__(self):
+        self.mapa = []
+        self.regioes = []
+        self.origem = 0  # Amostras já lidas do áudio original
+        self.compactado = 0  # Amostras já entregues ao decodificador
+
+    def filtrar(self, blocos):
+        """Gera os blocos compactados (sem os silêncios), pulando os que não têm fala."""
+        for bloco in blocos:
+            regioes = detectar_fala(bloco)
+            bloco_compactado, mapa_bloco = compactar_audio(bloco, regioes)
+            self.mapa.extend((self.compactado / TAXA_AMOSTRAGEM + compactado, self.origem / TAXA_AMOSTRAGEM + original)
+                             for compactado, original in mapa_bloco)
+            self.regioes.extend((self.origem + inicio, self.origem + fim) for inicio, fim in regioes)
+            self.origem += len(bloco)
+            self.compactado += len(bloco_compactado)
+            if len(bloco_compactado):
+                yield bloco_compactado
+
+
+def acumular_impressao(blocos, impressao):
+    """Repassa os blocos, acrescentando cada um ao hash incremental da impressão digital do áudio."""
+    for bloco in blocos:
+        impressao.update(memoryview(bloco).cast("B"))
+        yield bloco
@@ -0,0 +1,257 @@
+import os
+import sys
+import time
+import threading
+from quantizacao import PRECISAO_INT8
+from checkpoints import TranscricaoCancelada
+
+# Políticas quando a memória livre não comporta o modelo escolhido
+POLITICA_RECUSAR = "recusar"  # Não inicia a transcrição
+POLITICA_AGUARDAR = "aguardar"  # Espera a memória ser liberada (até ESPERA_MAXIMA_MEMORIA)
+POLITICA_REBAIXAR = "rebaixar"  # Usa o maior modelo menor que caiba (large -> medium -> small...)
+POLITICAS_MEMORIA = (POLITICA_RECUSAR, POLITICA_AGUARDAR, POLITICA_REBAIXAR)
+POLITICA_PADRAO = os.environ.get("TRANSCRITOR_POLITICA_MEMORIA", POLITICA_REBAIXAR)
+
+MARGEM_MEMORIA_MB = int(os.environ.get("TRANSCRITOR_MARGEM_MEMORIA_MB", "512"))  # Folga deixada para o sistema
+ESPERA_MAXIMA_MEMORIA = 600  # Segundos aguardando memória antes de desistir
+INTERVALO_ESPERA = 5  # Segundos entre verificações enquanto aguarda
+INTERVALO_AMOSTRAGEM = 0.5  # Segundos entre amostras de RSS/VRAM durante a transcrição
+
+ORDEM_MODELOS = ("tiny", "base", "small", "medium", "large")
+
+# Pico aproximado (MB) durante a inferência: pesos + ativações + runtime, por (motor, dispositivo) e modelo.
+# Na GPU, é a VRAM ocupada; na CPU, a RAM do processo.
+PEGADA_MODELOS_MB = {
+    ("whisper", "cpu"): {"tiny": 500, "base": 800, "small": 2000, "medium": 4800, "large": 8700},
+    ("whisper", "cuda"): {"tiny": 1000, "base": 1000, "small": 2000, "medium": 5000, "large": 10000},
+    ("ctranslate2", "cpu"): {"tiny": 300, "base": 500, "small": 1100, "medium": 2600, "large": 5000},
+    ("ctranslate2", "cuda"): {"tiny": 600, "base": 800, "small": 1500, "medium": 2800, "large": 4800},
+}
+FATOR_INT8 = 0.5  # Pesos int8 ocupam um quarto; as ativações continuam em fp32
+
+
+class MemoriaInsuficiente(Exception):
+    """A memória livre não comporta o modelo pedido, conforme a política de admissão."""
+
+
+def pegada_modelo_mb(modelo, dispositivo, precisao, motor, processos=1):
+    """Memória estimada para transcrever com o modelo (processos > 1 no modo paralelo: um modelo por processo)."""
+    pegadas = PEGADA_MODELOS_MB.get((motor, dispositivo), PEGADA_MODELOS_MB[("whisper", dispositivo)])
+    pegada = pegadas.get(modelo, pegadas["large"])
+    if precisao == PRECISAO_INT8:
+        pegada *= FATOR_INT8
+    return pegada * processos
+
+
+def memoria_disponivel_mb():
+    """Retorna a RAM disponível no sistema (MB), ou None se não for possível medir."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/meminfo", "r", encoding="utf-8") as f:
+                for linha in f:
+                    if linha.startswith("MemAvailable:"):
+                        return int(linha.split()[1]) / 1024  # Em KB
+        except (OSError, ValueError):
+            pass
+
+    elif sys.platform == "win32":
+        try:
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+            estado = MEMORYSTATUSEX()
+            estado.dwLength = ctypes.sizeof(estado)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(estado)):
+                return estado.ullAvailPhys / (1024 * 1024)
+        except Exception:
+            pass
+
+    return None
+
+
+def vram_disponivel_mb():
+    """Retorna a VRAM livre na primeira GPU (MB), incluindo o que o PyTorch reservou e não está usando, ou None."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            livre, _ = torch.cuda.mem_get_info()
+            reservada_ociosa = torch.cuda.memory_reserved() - torch.cuda.memory_allocated()
+            return (livre + reservada_ociosa) / (1024 * 1024)
+    except Exception:
+        pass  # Sem PyTorch (ex.: só o CTranslate2 instalado): tenta o NVML
+
+    try:
+        from py3nvml.py3nvml import nvmlInit, nvmlDeviceGetHandleByIndex, nvmlDeviceGetMemoryInfo, nvmlShutdown
+        nvmlInit()
+        try:
+            return nvmlDeviceGetMemoryInfo(nvmlDeviceGetHandleByIndex(0)).free / (1024 * 1024)
+        finally:
+            nvmlShutdown()
+    except Exception:
+        return None
+
+
+def memoria_residente_mb():
+    """Retorna a memória residente atual (RSS) do processo e de seus filhos (MB), ou None se não for possível medir."""
+    try:
+        import psutil
+        processo = psutil.Process()
+        total = processo.memory_info().rss
+        for filho in processo.children(recursive=True):  # Processos do modo paralelo
+            try:
+                total += filho.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None  # Sem psutil e fora do Linux
+
+
+def vram_em_uso_mb():
+    """Retorna a VRAM alocada pelo PyTorch neste processo (MB), ou None sem GPU ou sem PyTorch carregado."""
+    torch = sys.modules.get("torch")  # Não importa o PyTorch só para medir
+    try:
+        if torch is not None and torch.cuda.is_available() and torch.cuda.is_initialized():
+            return torch.cuda.memory_allocated() / (1024 * 1024)
+    except Exception:
+        pass
+    return None
+
+
+def admitir_modelo(modelo, dispositivo, precisao, motor, processos=1, politica=None, deve_parar=None,
+                   gerenciador=None):
+    """Verifica, antes de carregar, se a memória livre comporta o modelo, aplicando a política se não comportar.
+
+    dispositivo é "cpu" ou "cuda". Modelos já carregados no gerenciador não são verificados, e os demais
+    modelos em cache no mesmo dispositivo contam como memória recuperável (o gerenciador os despeja).
+    Retorna o modelo a usar (o pedido ou, com a política "rebaixar", um menor) e levanta MemoriaInsuficiente
+    se nenhum couber. Sem como medir a memória, admite o modelo pedido.
+    """
+    politica = politica or POLITICA_PADRAO
+    if politica not in POLITICAS_MEMORIA:
+        raise ValueError(f"Política de memória desconhecida: {politica}")
+    if gerenciador is not None and gerenciador.contem(modelo, dispositivo, precisao, motor):
+        return modelo
+
+    def livre_mb():
+        livre = vram_disponivel_mb() if dispositivo == "cuda" else memoria_disponivel_mb()
+        if livre is None:
+            return None
+        if gerenciador is not None:
+            livre += gerenciador.memoria_utilizada_mb(dispositivo)
+        return livre - MARGEM_MEMORIA_MB
+
+    def cabe(candidato, livre):
+        return livre is None or pegada_modelo_mb(candidato, dispositivo, precisao, motor, processos) <= livre
+
+    def admitir(candidato, livre):
+        """Se o candidato só cabe sem os modelos em cache no dispositivo, despeja-os antes da carga."""
+        em_cache = gerenciador.memoria_utilizada_mb(dispositivo) if gerenciador is not None else 0
+        if livre is not None and em_cache and not cabe(candidato, livre - em_cache):
+            print(f"🗑️ Despejando os modelos em cache ({em_cache:.0f} MB) para abrir espaço para o {candidato}")
+            gerenciador.descarregar(dispositivo=dispositivo)
+        return candidato
+
+    livre = livre_mb()
+    if cabe(modelo, livre):
+        return admitir(modelo, livre)
+
+    necessario = pegada_modelo_mb(modelo, dispositivo, precisao, motor, processos)
+    memoria = "VRAM" if dispositivo == "cuda" else "RAM"
+    print(f"⚠️ {memoria} insuficiente para o modelo {modelo}: ~{necessario:.0f} MB necessários, "
+          f"{max(livre, 0):.0f} MB livres (já descontada a margem de {MARGEM_MEMORIA_MB} MB)")
+
+    if politica == POLITICA_AGUARDAR:
+        limite = time.time() + ESPERA_MAXIMA_MEMORIA
+        print(f"⏳ Aguardando {memoria} ser liberada (até {ESPERA_MAXIMA_MEMORIA} s)...")
+        while time.time() < limite:
+            if deve_parar and deve_parar():
+                raise TranscricaoCancelada()
+            time.sleep(INTERVALO_ESPERA)
+            if cabe(modelo, livre := livre_mb()):
+                print(f"✅ {memoria} liberada; iniciando com o modelo {modelo}")
+                return admitir(modelo, livre)
+
+    elif politica == POLITICA_REBAIXAR and modelo in ORDEM_MODELOS:
+        for menor in reversed(ORDEM_MODELOS[:ORDEM_MODELOS.index(modelo)]):
+            if cabe(menor, livre):
+                print(f"⬇️ Usando o modelo {menor} no lugar de {modelo} por falta de {memoria}")
+                return admitir(menor, livre)
+
+    raise MemoriaInsuficiente(
+        f"{memoria} insuficiente para o modelo {modelo}: ~{necessario:.0f} MB necessários, "
+        f"{max(livre_mb() or 0, 0):.0f} MB livres. Feche outros programas ou escolha um modelo menor."
+    )
+
+
+class AmostradorMemoria:
+    """Amostra a RSS (e a VRAM, se houver GPU em uso) numa thread em segundo plano enquanto estiver ativo.
+
+    Uso: with AmostradorMemoria() as amostrador: ... (ou iniciar()/parar()); depois, amostrador.resumo().
+    """
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.rss = []
+        self.vram = []
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _amostrar(self):
+        for lista, medir in ((self.rss, memoria_residente_mb), (self.vram, vram_em_uso_mb)):
+            valor = medir()
+            if valor is not None:
+                lista.append(valor)
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            self._amostrar()
+
+    def iniciar(self):
+        """Começa a amostragem em segundo plano."""
+        self._amostrar()
+        self._thread = threading.Thread(target=self._executar, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        """Encerra a amostragem (chamadas repetidas não têm efeito)."""
+        if self._thread is None or self._parar.is_set():
+            return
+        self._parar.set()
+        self._thread.join()
+        self._amostrar()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *erro):
+        self.parar()
+        return False
+
+    def resumo(self):
+        """Pico e média das amostras, em MB (campos de VRAM só quando houve GPU em uso)."""
+        resumo = {}
+        for nome, amostras in (("rss", self.rss), ("vram", self.vram)):
+            if amostras:
+                resumo[f"{nome}_pico_mb"] = round(max(amostras), 1)
+                resumo[f"{nome}_medio_mb"] = round(sum(amostras) / len(amostras), 1)
+        return resumo or None
@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from contextlib import contextmanager
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+metricas_file = os.environ.get("TRANSCRITOR_METRICAS", os.path.join(base_dir, "metricas_transcricao.jsonl"))
+PERCENTIS = (50, 90, 95, 99)
+
+
+def pico_memoria_mb():
+    """Retorna o pico de memória residente (RSS) do processo em MB, ou None se não for possível medir."""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024  # macOS em bytes, Linux em KB
+    except ImportError:
+        pass  # Windows não tem o módulo resource
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        contadores = PROCESS_MEMORY_COUNTERS()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return contadores.PeakWorkingSetSize / (1024 * 1024)
+    except Exception:
+        pass
+
+    return None
+
+
+class PerfilExecucao:
+    """Mede o tempo de parede e de CPU de cada etapa de uma transcrição.
+
+    O tempo de CPU é o do processo inteiro (todas as threads), que é o que o decodificador consome.
+    """
+
+    def __init__(self):
+        self.etapas = {}  # nome -> {"parede": s, "cpu": s}
+        self.inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        """Cronometra o bloco como a etapa informada (somando, se a etapa se repetir)."""
+        inicio_parede, inicio_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            medida = self.etapas.setdefault(nome, {"parede": 0.0, "cpu": 0.0})
+            medida["parede"] += time.perf_counter() - inicio_parede
+            medida["cpu"] += time.process_time() - inicio_cpu
+
+    def incorporar(self, etapas):
+        """Soma etapas medidas em outro perfil (por exemplo, a preparação do áudio feita antes, em outra thread)."""
+        for nome, medida in etapas.items():
+            atual = self.etapas.setdefault(nome, {"parede": 0.0, "cpu": 0.0})
+            atual["parede"] += medida["parede"]
+            atual["cpu"] += medida["cpu"]
+
+    def tempos_parede(self):
+        """Retorna apenas o tempo de parede de cada etapa."""
+        return {nome: medida["parede"] for nome, medida in self.etapas.items()}
+
+    def gerar_registro(self, **campos):
+        """Monta o registro estruturado da execução."""
+        tempo_total = time.perf_counter() - self.inicio
+        duracao = campos.get("audio_duracao")
+        return {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            **campos,
+            "etapas": {nome: {k: round(v, 3) for k, v in medida.items()} for nome, medida in self.etapas.items()},
+            "tempo_total": round(tempo_total, 3),
+            "fator_tempo_real": round(tempo_total / duracao, 4) if duracao else None,
+            "pico_rss_mb": round(pico_memoria_mb() or 0, 1) or None,
+        }
+
+
+def registrar_metricas(registro, caminho=None):
+    """Acrescenta um registro (uma linha JSON) ao arquivo de métricas."""
+    try:
+        with open(caminho or metricas_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar as métricas: {e}")
+
+
+def carregar_metricas(caminho=None):
+    """Lê todos os registros do arquivo de métricas, ignorando linhas inválidas."""
+    registros = []
+    try:
+        with open(caminho or metricas_file, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registros.append(json.loads(linha))
+                except json.JSONDecodeError:
+                    continue
+    except OSError:
+        pass
+    return registros
+
+
+def percentil(valores, p):
+    """Percentil por interpolação linear entre os vizinhos mais próximos."""
+    ordenados = sorted(valores)
+    posicao = (len(ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def agregar_metricas(registros):
+    """Agrupa por (modelo, dispositivo) e calcula percentis do fator de tempo real e medianas por etapa."""
+    grupos = {}
+    for registro in registros:
+        if registro.get("cache") or not registro.get("fator_tempo_real"):
+            continue  # Respostas do cache não medem desempenho
+        grupos.setdefault((registro.get("modelo"), registro.get("dispositivo")), []).append(registro)
+
+    relatorio = []
+    for (modelo, dispositivo), itens in sorted(grupos.items(), key=lambda g: (str(g[0][0]), str(g[0][1]))):
+        fatores = [item["fator_tempo_real"] for item in itens]
+        etapas = {}
+        for item in itens:
+            for nome, medida in item.get("etapas", {}).items():
+                etapas.setdefault(nome, []).append(medida["parede"])
+        picos = [item["pico_rss_mb"] for item in itens if item.get("pico_rss_mb")]
+
+        relatorio.append({
+            "modelo": modelo,
+            "dispositivo": dispositivo,
+            "execucoes": len(itens),
+            "fator_tempo_real": {f"p{p}": round(percentil(fatores, p), 3) for p in PERCENTIS},
+            "etapas_mediana": {nome: round(percentil(tempos, 50), 3) for nome, tempos in etapas.items()},
+            "pico_rss_mb_max": max(picos) if picos else None,
+        })
+    return relatorio
+
+
+def main(argv=None):
+    """Imprime o relatório agregado do arquivo de métricas."""
+    parser = argparse.ArgumentParser(description="Relatório de desempenho das transcrições por modelo e dispositivo.")
+    parser.add_argument("--arquivo", default=metricas_file, help="Arquivo de métricas (JSON lines)")
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório em JSON")
+    args = parser.parse_args(argv)
+
+    relatorio = agregar_metricas(carregar_metricas(args.arquivo))
+    if args.json:
+        print(json.dumps(relatorio, indent=4, ensure_ascii=False))
+        return 0
+
+    if not relatorio:
+        print("Nenhuma métrica registrada.")
+        return 0
+
+    for grupo in relatorio:
+        fatores = "  ".join(f"{nome}={valor:.2f}x" for nome, valor in grupo["fator_tempo_real"].items())
+        print(f"📊 {grupo['modelo']} / {grupo['dispositivo']} — {grupo['execucoes']} execuções")
+        print(f"   Fator de tempo real: {fatores}")
+        etapas = "  ".join(f"{nome}={tempo:.1f}s" for nome, tempo in grupo["etapas_mediana"].items())
+        print(f"   Mediana por etapa: {etapas}")
+        if grupo["pico_rss_mb_max"]:
+            print(f"   Pico de memória: {grupo['pico_rss_mb_max']:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
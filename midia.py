@@ -0,0 +1,99 @@
+import os
+import json
+import threading
+import subprocess
+from collections import OrderedDict
+
+MAXIMO_EM_CACHE = 256  # Quantidade de arquivos cujas informações ficam memorizadas no processo
+
+_cache = OrderedDict()  # identidade do arquivo -> informações da mídia
+_lock = threading.Lock()
+
+
+def identidade_arquivo(input_file):
+    """Identifica o arquivo pelo caminho, tamanho e data de modificação."""
+    estado = os.stat(input_file)
+    return f"{os.path.abspath(input_file)}|{estado.st_size}|{estado.st_mtime_ns}"
+
+
+def escolher_stream_audio(streams):
+    """Escolhe a faixa de áudio a transcrever: a marcada como padrão ou, na falta dela, a primeira."""
+    for stream in streams:
+        if stream["padrao"]:
+            return stream
+    return streams[0]
+
+
+def sondar_midia(input_file):
+    """Executa o FFprobe uma única vez e extrai duração, faixas de áudio, canais, taxa e codec."""
+    comando = [
+        "ffprobe", "-v", "error", "-show_format", "-show_streams",
+        "-of", "json", "-i", input_file
+    ]
+
+    try:
+        resultado = subprocess.run(comando, capture_output=True, text=True)
+    except Exception as e:
+        raise RuntimeError(f"Erro ao analisar a mídia: {e}")
+
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Erro ao analisar a mídia: {resultado.stderr}")
+
+    dados = json.loads(resultado.stdout or "{}")
+    streams_audio = [
+        {
+            "indice": stream["index"],
+            "codec": stream.get("codec_name"),
+            "canais": stream.get("channels"),
+            "taxa_amostragem": int(stream.get("sample_rate", 0)),
+            "duracao": float(stream["duration"]) if "duration" in stream else None,
+            "padrao": bool(stream.get("disposition", {}).get("default")),
+        }
+        for stream in dados.get("streams", []) if stream.get("codec_type") == "audio"
+    ]
+
+    if not streams_audio:
+        raise RuntimeError(f"Erro: O arquivo '{input_file}' não possui faixa de áudio.")
+
+    stream_audio = escolher_stream_audio(streams_audio)
+    duracao = dados.get("format", {}).get("duration") or stream_audio["duracao"]
+    if duracao is None:
+        raise RuntimeError(f"Erro ao calcular duração do áudio: duração desconhecida em '{input_file}'.")
+
+    return {
+        "duracao": float(duracao),
+        "formato": dados.get("format", {}).get("format_name"),
+        "tem_video": any(s.get("codec_type") == "video" for s in dados.get("streams", [])),
+        "streams_audio": streams_audio,
+        "stream_audio": stream_audio,
+    }
+
+
+def obter_info_midia(input_file):
+    """Retorna as informações da mídia, sondando o arquivo só na primeira vez (cache por caminho, tamanho e data)."""
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f"Erro: O arquivo '{input_file}' não foi encontrado.")
+
+    chave = identidade_arquivo(input_file)
+    with _lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    info = sondar_midia(input_file)
+
+    with _lock:
+        _cache[chave] = info
+        while len(_cache) > MAXIMO_EM_CACHE:
+            _cache.popitem(last=False)
+    return info
+
+
+def argumentos_entrada_ffmpeg(input_file):
+    """Monta os argumentos de entrada do FFmpeg a partir da sondagem: faixa de áudio certa e sem decodificar vídeo."""
+    info = obter_info_midia(input_file)
+    return [
+        "-i", input_file,
+        "-map", f"0:{info['stream_audio']['indice']}",
+        "-vn", "-sn", "-dn",  # Ignora vídeo, legendas e dados
+    ]
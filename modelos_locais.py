@@ -0,0 +1,285 @@
+import os
+import re
+import json
+import time
+import hashlib
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+modelos_dir = os.environ.get("TRANSCRITOR_MODELOS", os.path.join(base_dir, "modelos"))
+VERIFICAR_SEMPRE = os.environ.get("TRANSCRITOR_VERIFICAR_MODELOS") == "sempre"  # Refaz o SHA-256 a cada carga
+VERSAO_LOJA = 1  # Incrementar quando o formato dos arquivos convertidos mudar
+TAMANHO_LEITURA_HASH = 8 * 1024 * 1024
+
+
+def calcular_sha256(caminho):
+    """SHA-256 do arquivo, lido em blocos (os modelos têm vários GB)."""
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        while bloco := f.read(TAMANHO_LEITURA_HASH):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def pasta_download_whisper():
+    """Pasta onde o openai-whisper guarda os modelos baixados (~/.cache/whisper)."""
+    return os.path.join(os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "whisper")
+
+
+def nome_modelo(modelo):
+    """Nome usado na loja: o do modelo Whisper ou o do arquivo, se for um caminho."""
+    return os.path.splitext(os.path.basename(modelo))[0]
+
+
+def caminhos_loja(modelo):
+    """Arquivo convertido e manifesto (JSON com o checksum) do modelo na loja."""
+    base = os.path.join(modelos_dir, f"{nome_modelo(modelo)}-v{VERSAO_LOJA}")
+    return base + ".pt", base + ".json"
+
+
+def tabela_whisper(nome):
+    """Tabela interna do openai-whisper (_MODELS ou _ALIGNMENT_HEADS), ou None se esta versão não a tiver.
+
+    Elas não fazem parte da API pública: a loja só as usa para localizar e conferir os checkpoints oficiais.
+    """
+    import whisper
+
+    tabela = getattr(whisper, nome, None)
+    return tabela if isinstance(tabela, dict) else None
+
+
+def sha256_oficial(modelo):
+    """SHA-256 do checkpoint oficial de um modelo do Whisper (faz parte da URL), ou None se for um arquivo próprio ou desconhecido."""
+    if os.path.isfile(modelo):
+        return None
+    url = (tabela_whisper("_MODELS") or {}).get(modelo)
+    sha256 = url.split("/")[-2] if isinstance(url, str) and url.count("/") >= 2 else ""
+    return sha256 if re.fullmatch(r"[0-9a-f]{64}", sha256) else None
+
+
+def localizar_original(modelo):
+    """Encontra o checkpoint original do Whisper em disco, sem nunca baixar nada.
+
+    Procura na loja e em ~/.cache/whisper. Retorna (caminho, sha256 esperado ou None se for um arquivo próprio).
+    """
+    if os.path.isfile(modelo):
+        return modelo, None
+
+    modelos = tabela_whisper("_MODELS")
+    if modelos is None:
+        raise RuntimeError(f"Esta versão do openai-whisper não expõe a lista de modelos oficiais (whisper._MODELS), "
+                           f"usada para localizar '{modelo}'. Informe o caminho do arquivo .pt do modelo.")
+    url = modelos.get(modelo)
+    if url is None:
+        raise RuntimeError(f"Modelo desconhecido: {modelo}. Opções: {', '.join(modelos)}")
+
+    nome_arquivo = os.path.basename(url)
+    for pasta in (modelos_dir, pasta_download_whisper()):
+        caminho = os.path.join(pasta, nome_arquivo)
+        if os.path.exists(caminho):
+            return caminho, sha256_oficial(modelo)
+    raise RuntimeError(f"Modelo '{modelo}' não encontrado. Copie {nome_arquivo} para {modelos_dir} "
+                       f"(instalação offline: nenhum download é feito).")
+
+
+def cabecas_alinhamento(modelo, checkpoint):
+    """Cabeças de alinhamento (usadas nos timestamps por palavra): as do checkpoint, se houver, ou as da tabela do Whisper.
+
+    Retorna None quando nenhuma das duas as informa; o modelo usa então a metade superior do decodificador.
+    """
+    cabecas = checkpoint.get("alignment_heads") or (tabela_whisper("_ALIGNMENT_HEADS") or {}).get(modelo)
+    if cabecas is None:
+        print(f"⚠️ Cabeças de alinhamento de {nome_modelo(modelo)} desconhecidas; "
+              f"usando a metade superior do decodificador (timestamps por palavra menos precisos).")
+        return None
+    return cabecas.decode("ascii") if isinstance(cabecas, bytes) else cabecas
+
+
+def carregar_checkpoint(caminho):
+    """Lê um checkpoint do Torch com os tensores mapeados em memória, copiando-os se não for possível.
+
+    O Torch anterior à 2.1 não aceita mmap (TypeError) e arquivos no formato antigo do Torch não podem
+    ser mapeados (RuntimeError).
+    """
+    import torch
+
+    try:
+        return torch.load(caminho, map_location="cpu", weights_only=True, mmap=True)
+    except (TypeError, RuntimeError) as e:
+        print(f"⚠️ Pesos de {os.path.basename(caminho)} copiados para a memória (mapeamento indisponível: {e})")
+        return torch.load(caminho, map_location="cpu", weights_only=True)
+
+
+def descrever_origem(caminho):
+    """Tamanho e data do checkpoint de origem, para notar quando um arquivo próprio muda."""
+    estado = os.stat(caminho)
+    return {"caminho": os.path.abspath(caminho), "tamanho": estado.st_size, "modificado": estado.st_mtime}
+
+
+def ler_manifesto(caminho_manifesto):
+    try:
+        with open(caminho_manifesto, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def gravar_manifesto(caminho_manifesto, manifesto):
+    """Grava o manifesto de forma atômica."""
+    temporario = f"{caminho_manifesto}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, indent=4, ensure_ascii=False)
+    os.replace(temporario, caminho_manifesto)
+
+
+def converter_modelo(modelo):
+    """Converte o checkpoint do Whisper, uma única vez, para o formato da loja.
+
+    Os pesos são gravados já em fp32 (o tipo em que o Whisper os usa) e contíguos, no formato zip do
+    Torch, que pode ser mapeado em memória. O original é conferido pelo SHA-256 oficial antes da conversão.
+    """
+    import torch
+
+    original, sha256_esperado = localizar_original(modelo)
+    print(f"⚙️ Convertendo o modelo {nome_modelo(modelo)} para a loja local (feito uma única vez)...")
+    inicio = time.time()
+    sha256_original = calcular_sha256(original)
+    if sha256_esperado and sha256_original != sha256_esperado:
+        raise RuntimeError(f"Checksum inválido em {original}: o arquivo está corrompido. Substitua-o pelo original.")
+
+    checkpoint = carregar_checkpoint(original)
+    cabecas = cabecas_alinhamento(modelo, checkpoint)
+    pesos = {nome: (tensor.float() if tensor.is_floating_point() else tensor).contiguous()
+             for nome, tensor in checkpoint["model_state_dict"].items()}
+
+    caminho, caminho_manifesto = caminhos_loja(modelo)
+    os.makedirs(modelos_dir, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"  # Vários processos podem converter ao mesmo tempo
+    torch.save({"dims": checkpoint["dims"], "model_state_dict": pesos}, temporario)
+    del checkpoint, pesos
+    os.replace(temporario, caminho)
+
+    estado = os.stat(caminho)
+    gravar_manifesto(caminho_manifesto, {
+        "versao": VERSAO_LOJA,
+        "modelo": nome_modelo(modelo),
+        "sha256": calcular_sha256(caminho),
+        "sha256_original": sha256_original,
+        "origem": descrever_origem(original),
+        "alignment_heads": cabecas,
+        "verificado": {"tamanho": estado.st_size, "modificado": estado.st_mtime},
+    })
+    print(f"✅ Modelo convertido em {time.time() - inicio:.2f} segundos e salvo em {caminho}")
+
+
+def origem_confere(modelo, manifesto):
+    """Indica se o arquivo convertido ainda corresponde ao checkpoint de origem.
+
+    Para os modelos do Whisper, compara o SHA-256 oficial atual (o nome pode passar a apontar para outro
+    checkpoint); para arquivos próprios, o conteúdo, conferido só quando o tamanho ou a data mudam.
+    """
+    if not os.path.isfile(modelo):
+        return sha256_oficial(modelo) in (None, manifesto.get("sha256_original"))
+
+    origem = descrever_origem(modelo)
+    if manifesto.get("origem") == origem:
+        return True
+    if calcular_sha256(modelo) != manifesto.get("sha256_original"):
+        return False
+    manifesto["origem"] = origem  # Mesmo conteúdo com outro caminho ou data
+    return True
+
+
+def verificar_modelo(modelo):
+    """Confere o arquivo convertido pela origem e pelo checksum do manifesto. Retorna o manifesto, ou None se for preciso converter.
+
+    O SHA-256 só é recalculado quando o tamanho ou a data do arquivo mudam desde a última verificação
+    (ou sempre, com TRANSCRITOR_VERIFICAR_MODELOS=sempre), para não ler vários GB a cada carga.
+    """
+    caminho, caminho_manifesto = caminhos_loja(modelo)
+    manifesto = ler_manifesto(caminho_manifesto)
+    if not manifesto or manifesto.get("versao") != VERSAO_LOJA or not os.path.exists(caminho):
+        return None
+    origem = manifesto.get("origem")
+    if not origem_confere(modelo, manifesto):
+        print(f"⚠️ O checkpoint de origem de {nome_modelo(modelo)} mudou; o modelo será convertido novamente.")
+        return None
+    if manifesto.get("origem") != origem:
+        gravar_manifesto(caminho_manifesto, manifesto)
+
+    estado = os.stat(caminho)
+    verificado = {"tamanho": estado.st_size, "modificado": estado.st_mtime}
+    if manifesto.get("verificado") == verificado and not VERIFICAR_SEMPRE:
+        return manifesto
+
+    print(f"🔐 Verificando o checksum de {os.path.basename(caminho)}...")
+    if calcular_sha256(caminho) != manifesto["sha256"]:
+        print(f"⚠️ Checksum inválido em {caminho}; o modelo será convertido novamente.")
+        return None
+    manifesto["verificado"] = verificado
+    gravar_manifesto(caminho_manifesto, manifesto)
+    return manifesto
+
+
+def preparar_modelo_local(modelo):
+    """Garante que o modelo está convertido e íntegro na loja (antes de iniciar processos que vão carregá-lo)."""
+    manifesto = verificar_modelo(modelo)
+    if manifesto is None:
+        converter_modelo(modelo)
+        manifesto = verificar_modelo(modelo)
+    return manifesto
+
+
+def montar_modelo(dimensoes, pesos, manifesto):
+    """Monta o Whisper com os pesos informados, sem alocar nem inicializar os parâmetros de antemão.
+
+    A estrutura é criada no dispositivo "meta" e recebe os tensores do checkpoint por atribuição. Os buffers
+    que não fazem parte do checkpoint (máscara causal e cabeças de alinhamento) são recriados na CPU.
+    """
+    import torch
+    from whisper.model import Whisper
+
+    with torch.device("meta"):
+        modelo_whisper = Whisper(dimensoes)
+    modelo_whisper.load_state_dict(pesos, assign=True)
+
+    n_ctx = dimensoes.n_text_ctx
+    modelo_whisper.decoder.register_buffer("mask", torch.empty(n_ctx, n_ctx).fill_(-float("inf")).triu_(1),
+                                           persistent=False)
+    if manifesto.get("alignment_heads"):
+        modelo_whisper.set_alignment_heads(manifesto["alignment_heads"].encode("ascii"))
+    else:
+        cabecas = torch.zeros(dimensoes.n_text_layer, dimensoes.n_text_head, dtype=torch.bool)
+        cabecas[dimensoes.n_text_layer // 2:] = True
+        modelo_whisper.register_buffer("alignment_heads", cabecas.to_sparse(), persistent=False)
+
+    restantes = [nome for nome, tensor in (*modelo_whisper.named_parameters(), *modelo_whisper.named_buffers())
+                 if tensor.is_meta]
+    if restantes:
+        raise RuntimeError(f"tensores sem valor após a carga: {', '.join(restantes[:3])}")
+    return modelo_whisper
+
+
+def carregar_modelo_local(modelo, dispositivo="cpu"):
+    """Carrega o modelo Whisper da loja local, mapeando os pesos do arquivo em memória (sem cópia na CPU).
+
+    Substitui whisper.load_model: não inicializa pesos aleatórios que seriam sobrescritos, não lê o arquivo
+    inteiro para a memória e nunca acessa a rede.
+    """
+    from whisper.model import Whisper, ModelDimensions
+
+    manifesto = preparar_modelo_local(modelo)
+    caminho, _ = caminhos_loja(modelo)
+    checkpoint = carregar_checkpoint(caminho)
+    dimensoes = ModelDimensions(**checkpoint["dims"])
+
+    try:
+        modelo_whisper = montar_modelo(dimensoes, checkpoint["model_state_dict"], manifesto)
+    except Exception as e:
+        # Versão do Torch ou do Whisper sem suporte à montagem em "meta": carga convencional, com cópia dos pesos
+        print(f"⚠️ Carga sem cópia indisponível ({e}); copiando os pesos para a memória.")
+        modelo_whisper = Whisper(dimensoes)
+        modelo_whisper.load_state_dict(checkpoint["model_state_dict"])
+        if manifesto.get("alignment_heads"):
+            modelo_whisper.set_alignment_heads(manifesto["alignment_heads"].encode("ascii"))
+
+    return modelo_whisper.to(dispositivo)
@@ -0,0 +1,302 @@
+import os
+import gc
+import sys
+import queue
+import types
+import threading
+import importlib.util
+from contextlib import contextmanager
+from quantizacao import PRECISAO_PADRAO, PRECISAO_INT8, carregar_modelo_quantizado, preparar_modelo_quantizado
+from calibracao import aplicar_configuracao_threads
+from modelos_locais import modelos_dir, carregar_modelo_local, preparar_modelo_local
+
+TAXA_AMOSTRAGEM = 16000
+JANELA_DECODIFICACAO = 26  # Modo janelas: duração alvo (s) de cada janela entregue ao decodificador
+BUSCA_SILENCIO_JANELA = 4  # Modo janelas: tolerância (s) para cortar a janela num silêncio (janelas de 22 a 30 s)
+CONTEXTO_MAXIMO = 200  # Caracteres do texto anterior repassados como prompt (janela seguinte ou retomada)
+
+MOTOR_WHISPER = "whisper"  # openai-whisper sobre PyTorch
+MOTOR_CTRANSLATE2 = "ctranslate2"  # faster-whisper sobre CTranslate2, otimizado para CPU
+MOTOR_PADRAO = MOTOR_WHISPER
+
+
+class MotorTranscricao:
+    """Interface de um motor de inferência: carregar, transcrever em fluxo e descarregar o modelo.
+
+    Os modelos recebem os mesmos nomes do Whisper (small, medium, large), já mapeados por MODELOS_WHISPER.
+    """
+
+    nome = None
+    modulo = None  # Pacote Python exigido pelo motor
+
+    def disponivel(self):
+        """Indica se o pacote do motor está instalado (sem importá-lo)."""
+        return importlib.util.find_spec(self.modulo) is not None
+
+    def cuda_disponivel(self):
+        """Indica se o motor consegue usar a GPU neste host."""
+        return False
+
+    def preparar(self, modelo, precisao=PRECISAO_PADRAO):
+        """Prepara em disco o que for compartilhado entre processos antes de carregá-los (opcional)."""
+
+    def carregar(self, modelo, dispositivo, precisao=PRECISAO_PADRAO, threads=None):
+        """Carrega o modelo no dispositivo ("cpu" ou "cuda") e o retorna."""
+        raise NotImplementedError
+
+    def transcrever(self, modelo_carregado, audio, idioma="pt", contexto=None):
+        """Transcreve um trecho de áudio e retorna {"text": ..., "segments": [{"start", "end", "text"}]}."""
+        raise NotImplementedError
+
+    def transcrever_fluxo(self, modelo_carregado, audio, idioma="pt", contexto=None, ao_avancar=None):
+        """Transcreve o áudio inteiro numa única passagem do modelo, entregando os segmentos quando ficam prontos.
+
+        Gera tuplas (posicao, segmentos), com a posição (s) até onde o áudio já foi decodificado: todos os
+        segmentos até ela já foram entregues, então é nela que um checkpoint pode ser gravado.
+        ao_avancar(posicao), se informado, é chamado quando o decodificador avança sem entregar segmentos
+        (pode levantar uma exceção para interromper a passagem). contexto, se informado, é o texto que
+        antecede o áudio (ao retomar uma transcrição).
+        """
+        resultado = self.transcrever(modelo_carregado, audio, idioma, contexto)
+        yield len(audio) / TAXA_AMOSTRAGEM, resultado["segments"]
+
+    def transcrever_janelas(self, modelo_carregado, janelas, idioma="pt", contexto=None):
+        """Transcreve janelas já cortadas, recebidas como tuplas (inicio_amostra, audio_janela), uma de cada vez.
+
+        Usado pelo modo janelas. Gera tuplas (fim_janela, segmentos) com os tempos já na linha do tempo
+        do arquivo original, repassando o final do texto de cada janela como prompt da seguinte.
+        """
+        contexto = (contexto or "")[-CONTEXTO_MAXIMO:]
+
+        for inicio, audio_janela in janelas:
+            resultado = self.transcrever(modelo_carregado, audio_janela, idioma, contexto or None)
+            deslocamento = inicio / TAXA_AMOSTRAGEM
+            fim_janela = (inicio + len(audio_janela)) / TAXA_AMOSTRAGEM
+            segmentos = [
+                {"start": s["start"] + deslocamento, "end": min(s["end"] + deslocamento, fim_janela), "text": s["text"]}
+                for s in resultado["segments"]
+            ]
+
+            texto = resultado["text"].strip()
+            if texto:
+                contexto = f"{contexto} {texto}".strip()[-CONTEXTO_MAXIMO:]
+
+            yield fim_janela, segmentos
+
+    def descarregar(self, dispositivo):
+        """Devolve ao sistema a memória de um modelo que acabou de ser descartado."""
+        gc.collect()
+
+
+class PassagemInterrompida(Exception):
+    """Encerra um transcribe em curso numa thread auxiliar cujo consumidor já parou."""
+
+
+_progresso_whisper = threading.local()  # ao_atualizar da passagem em curso em cada thread
+_lock_progresso = threading.Lock()
+_barra_instalada = {"usos": 0, "original": None}  # Passagens em curso e o tqdm original do whisper.transcribe
+
+
+def _criar_barra_progresso(base):
+    """Barra do tqdm (oculta, como a original) que repassa o avanço ao ao_atualizar da thread atual.
+
+    Junto com o avanço vai a lista de segmentos que o transcribe está montando (a variável all_segments
+    de quem atualiza a barra), ou None se ela não puder ser lida.
+    """
+
+    class BarraProgresso(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.quadros = 0  # Uma barra desativada não soma o próprio n
+
+        def update(self, n=1):
+            self.quadros += n
+            ao_atualizar = getattr(_progresso_whisper, "ao_atualizar", None)
+            if ao_atualizar:
+                segmentos = sys._getframe(1).f_locals.get("all_segments")
+                ao_atualizar(self.quadros, segmentos if isinstance(segmentos, list) else None)
+            return super().update(n)
+
+    return BarraProgresso
+
+
+@contextmanager
+def progresso_whisper(ao_atualizar):
+    """Durante o bloco, a barra do whisper.transcribe chama ao_atualizar(quadros, segmentos) na thread atual.
+
+    O transcribe só informa o avanço pela barra do tqdm, ao fim de cada trecho de 30 s decodificado. A troca vale
+    apenas enquanto houver uma passagem em curso (outras threads continuam com uma barra comum) e o tqdm
+    original é restaurado ao fim da última. Se o whisper deixar de usar essa barra, avisa e segue sem progresso.
+    """
+    import whisper.transcribe as modulo
+
+    with _lock_progresso:
+        original = getattr(modulo, "tqdm", None)
+        if not _barra_instalada["usos"] and isinstance(getattr(original, "tqdm", None), type):
+            _barra_instalada["original"] = original
+            modulo.tqdm = types.SimpleNamespace(tqdm=_criar_barra_progresso(original.tqdm))
+        instalada = _barra_instalada["original"] is not None
+        if instalada:
+            _barra_instalada["usos"] += 1
+    if not instalada:
+        print("⚠️ Esta versão do whisper não expõe a barra de progresso: o avanço e o cancelamento "
+              "só serão percebidos ao fim da passagem")
+
+    _progresso_whisper.ao_atualizar = ao_atualizar
+    try:
+        yield
+    finally:
+        _progresso_whisper.ao_atualizar = None
+        if instalada:
+            with _lock_progresso:
+                _barra_instalada["usos"] -= 1
+                if not _barra_instalada["usos"]:
+                    modulo.tqdm, _barra_instalada["original"] = _barra_instalada["original"], None
+
+
+class MotorWhisper(MotorTranscricao):
+    """Implementação de referência: openai-whisper (PyTorch), com a opção de camadas lineares em int8."""
+
+    nome = MOTOR_WHISPER
+    modulo = "whisper"
+
+    def cuda_disponivel(self):
+        import torch
+        return torch.cuda.is_available()
+
+    def preparar(self, modelo, precisao=PRECISAO_PADRAO):
+        # Converte uma vez, em vez de em cada processo
+        if precisao == PRECISAO_INT8:
+            preparar_modelo_quantizado(modelo)
+        else:
+            preparar_modelo_local(modelo)
+
+    def carregar(self, modelo, dispositivo, precisao=PRECISAO_PADRAO, threads=None):
+        import torch  # 🔥 Importação tardia: só é necessária ao carregar o primeiro modelo
+
+        if threads:
+            torch.set_num_threads(threads)
+            torch.set_num_interop_threads(1)
+        else:
+            aplicar_configuracao_threads()  # Calibração deste host, antes de carregar o modelo
+        if precisao == PRECISAO_INT8:
+            return carregar_modelo_quantizado(modelo)
+        return carregar_modelo_local(modelo, dispositivo)  # Pesos mapeados da loja local, sem acesso à rede
+
+    def transcrever(self, modelo_carregado, audio, idioma="pt", contexto=None):
+        resultado = modelo_carregado.transcribe(
+            audio, language=idioma, initial_prompt=contexto, fp16=modelo_carregado.device.type == "cuda"
+        )
+        segmentos = [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in resultado["segments"]]
+        return {"text": resultado["text"], "segments": segmentos}
+
+    def transcrever_fluxo(self, modelo_carregado, audio, idioma="pt", contexto=None, ao_avancar=None):
+        # Uma única chamada ao transcribe, numa thread auxiliar: ao fim de cada trecho de 30 s, a barra de progresso
+        # interna entrega a posição e os segmentos novos, repassados daqui assim que ficam prontos
+        from whisper.audio import HOP_LENGTH, SAMPLE_RATE
+
+        eventos = queue.Queue()
+        interromper = threading.Event()
+        entregues = 0  # Segmentos do transcribe já repassados
+        avisado = False
+
+        def ao_atualizar(quadros, segmentos):
+            nonlocal entregues, avisado
+            if interromper.is_set():
+                raise PassagemInterrompida()
+            novos = None
+            if segmentos is not None:
+                novos = [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in segmentos[entregues:]]
+                entregues = len(segmentos)
+            elif not avisado:
+                print("⚠️ Esta versão do whisper não expõe os segmentos durante a passagem: o texto só aparece no final")
+                avisado = True
+            eventos.put(("trecho", quadros * HOP_LENGTH / SAMPLE_RATE, novos))
+
+        def executar():
+            try:
+                with progresso_whisper(ao_atualizar):
+                    eventos.put(("fim", self.transcrever(modelo_carregado, audio, idioma, contexto)))
+            except BaseException as e:
+                eventos.put(("erro", e))
+
+        trabalhador = threading.Thread(target=executar, name="transcribe", daemon=True)
+        trabalhador.start()
+        try:
+            while True:
+                tipo, *dados = eventos.get()
+                if tipo == "erro":
+                    raise dados[0]
+                if tipo == "fim":
+                    yield len(audio) / TAXA_AMOSTRAGEM, dados[0]["segments"][entregues:]
+                    return
+                posicao, novos = dados
+                if novos is not None:
+                    yield posicao, novos
+                elif ao_avancar:
+                    ao_avancar(posicao)
+        finally:
+            interromper.set()  # Quem consome parou (cancelamento ou erro): o transcribe para no próximo trecho
+            trabalhador.join()
+
+    def descarregar(self, dispositivo):
+        import torch
+
+        super().descarregar(dispositivo)
+        if dispositivo == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+class MotorCTranslate2(MotorTranscricao):
+    """faster-whisper: os mesmos pesos do Whisper convertidos para o CTranslate2, com kernels otimizados para CPU."""
+
+    nome = MOTOR_CTRANSLATE2
+    modulo = "faster_whisper"
+
+    def cuda_disponivel(self):
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+
+    def carregar(self, modelo, dispositivo, precisao=PRECISAO_PADRAO, threads=None):
+        from faster_whisper import WhisperModel
+
+        if precisao == PRECISAO_INT8:
+            tipo = "int8"
+        else:
+            tipo = "float16" if dispositivo == "cuda" else "float32"
+        # Só arquivos locais: o modelo convertido na loja (TRANSCRITOR_MODELOS) ou o já baixado antes, nunca pela rede
+        local = os.path.join(modelos_dir, f"faster-whisper-{modelo}")
+        return WhisperModel(local if os.path.isdir(local) else modelo, device=dispositivo, compute_type=tipo,
+                            cpu_threads=threads or 0, local_files_only=True)
+
+    def transcrever(self, modelo_carregado, audio, idioma="pt", contexto=None):
+        segmentos = [
+            {"start": s.start, "end": s.end, "text": s.text}
+            for s in modelo_carregado.transcribe(audio, language=idioma, initial_prompt=contexto, beam_size=1)[0]
+        ]
+        return {"text": "".join(s["text"] for s in segmentos), "segments": segmentos}
+
+    def transcrever_fluxo(self, modelo_carregado, audio, idioma="pt", contexto=None, ao_avancar=None):
+        # O CTranslate2 já decodifica de forma preguiçosa: cada segmento sai assim que fica pronto,
+        # com o contexto do áudio inteiro, sem precisar cortar janelas
+        segmentos, _ = modelo_carregado.transcribe(audio, language=idioma, initial_prompt=contexto, beam_size=1)
+        for s in segmentos:
+            yield s.end, [{"start": s.start, "end": s.end, "text": s.text}]
+
+
+MOTORES = {motor.nome: motor for motor in (MotorWhisper(), MotorCTranslate2())}
+
+
+def obter_motor(nome=MOTOR_PADRAO):
+    """Retorna o motor pelo nome, avisando se o pacote necessário não estiver instalado."""
+    motor = MOTORES.get(nome)
+    if motor is None:
+        raise ValueError(f"Motor de inferência desconhecido: {nome}. Opções: {', '.join(MOTORES)}")
+    if not motor.disponivel():
+        raise RuntimeError(f"O motor '{nome}' exige o pacote '{motor.modulo}', que não está instalado.")
+    return motor
+
+
+def motores_disponiveis():
+    """Nomes dos motores cujos pacotes estão instalados."""
+    return [nome for nome, motor in MOTORES.items() if motor.disponivel()]
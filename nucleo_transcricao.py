@@ -0,0 +1,540 @@
+import os
+import subprocess
+import warnings
+import random
+import time
+import itertools
+import threading
+import numpy as np
+from estimador import registrar_transcricao, calcular_aceleracao
+from gerenciador_modelos import obter_modelo, gerenciador_modelos
+from transcricao_paralela import transcrever_paralelo, calcular_workers
+import cache_transcricoes
+from midia import obter_info_midia, argumentos_entrada_ffmpeg
+from metricas import PerfilExecucao, registrar_metricas
+from quantizacao import PRECISAO_PADRAO, PRECISAO_INT8
+from motores import MOTOR_PADRAO, JANELA_DECODIFICACAO, BUSCA_SILENCIO_JANELA, CONTEXTO_MAXIMO, obter_motor
+from calibracao import configuracao_aplicada
+from vad import detectar_fala, compactar_audio, mapear_tempo, resumir_vad
+from checkpoints import Checkpoint, TranscricaoCancelada, caminho_checkpoint
+from memoria import admitir_modelo, AmostradorMemoria
+from janelas import DURACAO_LEITURA, ler_blocos_pcm, ler_blocos_wav, agrupar_em_janelas, acumular_impressao, CompactadorVAD
+
+# Suprimir warnings desnecessários
+warnings.filterwarnings("ignore", category=UserWarning, module="whisper.transcribe")
+warnings.filterwarnings("ignore", category=FutureWarning, module="whisper")
+
+TAXA_AMOSTRAGEM = 16000  # Taxa esperada pelo Whisper (Hz)
+TAMANHO_BLOCO_PCM = 1024 * 1024  # Bytes lidos do stdout do FFmpeg por vez
+
+# Modos de execução da transcrição
+MODO_PADRAO = "padrao"  # Uma única passagem do modelo sobre o áudio inteiro (só as regiões com fala, com o VAD)
+MODO_PARALELO = "paralelo"  # Blocos cortados em silêncios, transcritos num pool de processos (CPU)
+MODO_JANELAS = "janelas"  # Áudio lido e decodificado em blocos: memória constante, para gravações de várias horas
+
+def chave_historico(dispositivo, modo=MODO_PADRAO, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO):
+    """Define sob qual dispositivo o histórico de tempos é registrado (modo paralelo, int8 e outros motores têm históricos próprios)."""
+    chave = "CPU-paralelo" if modo == MODO_PARALELO and dispositivo == "CPU" else dispositivo
+    if motor != MOTOR_PADRAO:
+        chave = f"{chave}-{motor}"
+    return f"{chave}-int8" if precisao == PRECISAO_INT8 else chave
+
+def formatar_texto(texto):
+    """Adiciona '|' entre as frases detectadas."""
+    return " | ".join(texto.strip().split('. '))
+
+def criar_diretorio_temp():
+    """Garante que o diretório temp_converter exista."""
+    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp_converter")
+    os.makedirs(temp_dir, exist_ok=True)
+    return temp_dir
+
+def gerar_nome_temporario():
+    """Gera um nome de arquivo temporário único."""
+    return f"temp_audio{random.randint(100000, 999999)}.wav"
+
+def converter_para_wav(input_file, output_dir):
+    """Converte qualquer arquivo de áudio/vídeo para WAV usando FFmpeg."""
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f"Erro: O arquivo '{input_file}' não foi encontrado.")
+
+    output_file = os.path.join(output_dir, gerar_nome_temporario())
+    
+    try:
+        comando = [
+            "ffmpeg", *argumentos_entrada_ffmpeg(input_file), "-ar", "16000", "-ac", "1",
+            "-c:a", "pcm_s16le", output_file, "-y", "-loglevel", "error"
+        ]
+        resultado = subprocess.run(comando, capture_output=True, text=True)
+
+        if resultado.returncode != 0:
+            raise RuntimeError(f"Erro ao converter para WAV: {resultado.stderr}")
+
+        return output_file
+    except Exception as e:
+        raise RuntimeError(f"Erro ao converter para WAV: {e}")
+
+def converter_para_pcm(input_file, duracao=None):
+    """Decodifica o áudio com FFmpeg direto para memória (float32, 16 kHz, mono), sem arquivo temporário."""
+    # 🔥 Buffer pré-alocado pela duração conhecida (com 1 s de folga), crescendo só se necessário
+    capacidade = int((duracao or 60) * TAXA_AMOSTRAGEM) + TAXA_AMOSTRAGEM
+    audio = np.empty(capacidade, dtype=np.float32)
+    preenchido = 0
+
+    for amostras in ler_blocos_pcm(input_file, TAMANHO_BLOCO_PCM // 2):
+        if preenchido + len(amostras) > capacidade:
+            capacidade = max(capacidade * 2, preenchido + len(amostras))
+            audio = np.resize(audio, capacidade)
+
+        audio[preenchido:preenchido + len(amostras)] = amostras
+        preenchido += len(amostras)
+
+    return audio[:preenchido]
+
+def calcular_duracao_audio(input_file):
+    """Obtém a duração do arquivo de áudio (a sondagem com FFprobe é feita uma única vez por arquivo)."""
+    return obter_info_midia(input_file)["duracao"]
+
+def calcular_progresso(posicao, duracao, inicio_decodificacao):
+    """Calcula o percentual já decodificado e o tempo restante pelo fator de tempo real atual."""
+    fracao = min(posicao / duracao, 1.0)
+    fator_tempo_real = (time.time() - inicio_decodificacao) / posicao
+    # 100% só quando o texto final for entregue
+    return min(int(fracao * 100), 99), int(fator_tempo_real * max(duracao - posicao, 0))
+
+def carregar_audio(input_file, duracao, streaming=True):
+    """Obtém o áudio decodificado; usa o WAV em disco como alternativa se o streaming falhar.
+
+    Retorna a tupla (audio, arquivo_wav), onde arquivo_wav é o temporário a remover (ou None).
+    """
+    if streaming:
+        try:
+            audio = converter_para_pcm(input_file, duracao)
+            print(f"🌊 Áudio decodificado em memória ({audio.nbytes / (1024 * 1024):.1f} MB)")
+            return audio, None
+        except Exception as e:
+            print(f"⚠️ Falha na decodificação em memória ({e}). Usando conversão em disco.")
+
+    arquivo_wav = converter_para_wav(input_file, criar_diretorio_temp())
+    return arquivo_wav, arquivo_wav
+
+def carregar_blocos_audio(input_file, streaming=True, inicio=0):
+    """Como carregar_audio, mas entrega o áudio em blocos de DURACAO_LEITURA segundos, lidos sob demanda.
+
+    Retorna a tupla (blocos, arquivo_wav), onde arquivo_wav é o temporário a remover (ou None).
+    Com inicio (segundos), a leitura começa nessa posição.
+    """
+    amostras_por_bloco = DURACAO_LEITURA * TAXA_AMOSTRAGEM
+    if streaming:
+        blocos = ler_blocos_pcm(input_file, amostras_por_bloco, inicio)
+        try:
+            primeiro = next(blocos, None)  # Falhas do FFmpeg aparecem já no primeiro bloco
+            print(f"🌊 Áudio decodificado em blocos de {DURACAO_LEITURA} s")
+            return itertools.chain([primeiro] if primeiro is not None else [], blocos), None
+        except Exception as e:
+            print(f"⚠️ Falha na decodificação em memória ({e}). Usando conversão em disco.")
+
+    arquivo_wav = converter_para_wav(input_file, criar_diretorio_temp())
+    return ler_blocos_wav(arquivo_wav, amostras_por_bloco, inicio), arquivo_wav
+
+def preparar_audio(input_file, streaming=True):
+    """Etapa de E/S da transcrição: sonda a mídia e decodifica o áudio inteiro para memória.
+
+    Permite preparar o próximo arquivo da fila enquanto o atual está no modelo. O retorno é
+    repassado a transcrever_arquivo(audio_preparado=...), com o tempo de cada etapa já medido.
+    """
+    perfil = PerfilExecucao()
+    arquivo_wav = None
+    try:
+        with perfil.etapa("sondagem"):
+            duracao = calcular_duracao_audio(input_file)
+        with perfil.etapa("conversao"):
+            audio, arquivo_wav = carregar_audio(input_file, duracao, streaming)
+            if isinstance(audio, str):
+                audio = converter_para_pcm(audio, duracao)
+    finally:
+        if arquivo_wav and os.path.exists(arquivo_wav):
+            os.remove(arquivo_wav)
+    return {"arquivo": input_file, "duracao": duracao, "audio": audio, "etapas": perfil.etapas}
+
+class CargaAntecipada:
+    """Admissão e carga do modelo numa thread, para a carga correr junto com a conversão do áudio.
+
+    admitido() aguarda só a admissão (ver memoria.admitir_modelo) e retorna o modelo a usar, levantando os
+    erros dela. Se o cache de transcrições responder antes, descartar() evita a carga ou, se ela já começou,
+    tira o modelo da memória ao terminar. Uma falha na carga só é relatada: ela é refeita (e o erro
+    levantado) quando o modelo for de fato pedido.
+    """
+
+    def __init__(self, modelo, dispositivo_torch, precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO, politica=None,
+                 deve_parar=None):
+        self.modelo = modelo  # Substituído pelo modelo admitido (menor, se a memória não comportar o pedido)
+        self.dispositivo_torch = dispositivo_torch
+        self.precisao = precisao
+        self.motor = motor
+        self.reaproveitado = False  # O modelo admitido já estava em memória
+        self.erro = None
+        self._descartada = False
+        self._carregou = False
+        self._lock = threading.Lock()
+        self._admissao = threading.Event()
+        parar = lambda: self._descartada or bool(deve_parar and deve_parar())
+        self._thread = threading.Thread(target=self._executar, args=(politica, parar), name="carga-modelo", daemon=True)
+        self._thread.start()
+
+    def _executar(self, politica, parar):
+        try:
+            self.modelo = admitir_modelo(self.modelo, self.dispositivo_torch, self.precisao, self.motor,
+                                         politica=politica, deve_parar=parar, gerenciador=gerenciador_modelos)
+            self.reaproveitado = gerenciador_modelos.contem(self.modelo, self.dispositivo_torch, self.precisao, self.motor)
+        except Exception as e:
+            self.erro = e
+            return
+        finally:
+            self._admissao.set()
+
+        if self.reaproveitado or self._descartada:
+            return
+        try:
+            obter_modelo(self.modelo, self.dispositivo_torch, self.precisao, self.motor)
+        except Exception as e:
+            print(f"⚠️ Falha ao carregar o modelo em segundo plano: {e}")
+            return
+        with self._lock:
+            self._carregou = True
+            if self._descartada:
+                self._liberar()
+
+    def _liberar(self):
+        gerenciador_modelos.descarregar(self.modelo, self.dispositivo_torch, self.precisao, self.motor)
+
+    def admitido(self):
+        """Aguarda a admissão e retorna o modelo a usar (levanta MemoriaInsuficiente ou TranscricaoCancelada)."""
+        self._admissao.wait()
+        if self.erro:
+            raise self.erro
+        return self.modelo
+
+    def aguardar(self):
+        """Aguarda o fim da carga."""
+        self._thread.join()
+
+    def descartar(self):
+        """Dispensa o modelo: a carga não começa ou, se já terminou, o modelo sai da memória."""
+        with self._lock:
+            self._descartada = True
+            if self._carregou:
+                self._liberar()
+
+def buscar_em_cache(chave, inicio_transcricao, modelo_solicitado=None):
+    """Retorna o resultado em cache da chave (marcado com "cache": True), ou None."""
+    resultado = cache_transcricoes.buscar_resultado(chave)
+    if resultado is None:
+        return None
+
+    print(f"⚡ Resultado encontrado no cache de transcrições ({time.time() - inicio_transcricao:.2f} segundos)")
+    return {**resultado, "tempo_real": time.time() - inicio_transcricao, "cache": True,
+            "modelo_solicitado": modelo_solicitado or resultado.get("modelo")}
+
+def transcrever_arquivo(input_file, modelo="base", dispositivo="CPU", modo=MODO_PADRAO, streaming=True,
+                        ao_progredir=None, usar_cache=True, precisao=PRECISAO_PADRAO,
+                        motor=MOTOR_PADRAO, usar_vad=True, deve_parar=None, arquivo_checkpoint=None, ao_segmentos=None,
+                        politica_memoria=None, audio_preparado=None):
+    """Executa o pipeline completo de um arquivo: duração, decodificação, modelo e transcrição.
+
+    ao_progredir(percentual, segundos_restantes), se informado, é chamado à medida que o áudio é decodificado.
+    O tempo real é registrado no histórico. ao_segmentos(segmentos), se informado, recebe os segmentos à medida
+    que ficam prontos, já na linha do tempo original.
+    Com usar_cache, um áudio já transcrito com as mesmas opções é devolvido sem decodificar nada.
+    Com precisao="int8" (somente CPU), usa o modelo com as camadas lineares quantizadas.
+    motor escolhe o motor de inferência (ver motores.py), por exemplo "whisper" ou "ctranslate2".
+    Com usar_vad, só as regiões com fala são decodificadas; os tempos voltam à linha do tempo original.
+    No modo "janelas", o áudio nunca fica inteiro em memória: é lido e decodificado em blocos.
+    Se deve_parar() retornar True, a transcrição para entre duas janelas e levanta TranscricaoCancelada.
+    O progresso é salvo periodicamente em arquivo_checkpoint (ou em checkpoints/) e retomado na próxima execução.
+    Antes de carregar o modelo, a memória livre é verificada conforme politica_memoria (ver memoria.py): sem
+    memória para o modelo pedido, a transcrição é recusada, aguarda ou usa um modelo menor. A admissão e a
+    carga do modelo correm em segundo plano durante a conversão e são descartadas se o cache responder;
+    audio_preparado (de preparar_audio) dispensa a sondagem e a conversão, exceto no modo "janelas".
+    Retorna um dicionário com o texto formatado, os segmentos, a duração e o tempo real gasto.
+    """
+    dispositivo = "GPU" if dispositivo in ("cuda", "GPU") else "CPU"
+    arquivo_wav = None
+    checkpoint, amostrador, carga = None, None, None
+    inicio_transcricao = time.time()
+
+    def reportar_progresso(posicao):
+        if ao_progredir and duracao_decodificada > 0 and posicao > 0:
+            ao_progredir(*calcular_progresso(posicao, duracao_decodificada, inicio_decodificacao))
+
+    try:
+        motor_inferencia = obter_motor(motor)  # Falha cedo se o pacote do motor não estiver instalado
+
+        if dispositivo == "GPU" and not motor_inferencia.cuda_disponivel():
+            print("⚠️ CUDA não está disponível. Usando CPU.")
+            dispositivo = "CPU"
+
+        if modo == MODO_PARALELO and dispositivo != "CPU":
+            print("⚠️ O modo paralelo é exclusivo para CPU. Usando passagem única.")
+            modo = MODO_PADRAO
+
+        if precisao == PRECISAO_INT8 and dispositivo != "CPU":
+            print("⚠️ A quantização int8 é exclusiva para CPU. Usando o modelo fp32.")
+            precisao = PRECISAO_PADRAO
+
+        # 🔥 Arquivo já decodificado antes: a impressão do áudio é conhecida e o cache pode responder sem FFmpeg
+        impressao = cache_transcricoes.impressao_conhecida(input_file) if usar_cache else None
+        if impressao:
+            chave_cache = cache_transcricoes.gerar_chave(impressao, modelo, dispositivo, modo, precisao=precisao, motor=motor,
+                                                         vad=usar_vad)
+            resultado = buscar_em_cache(chave_cache, inicio_transcricao)
+            if resultado:
+                return resultado
+
+        # 🔥 Admissão: o modelo só é carregado se couber na memória livre (RAM ou VRAM). Fora do modo paralelo, a
+        # admissão e a carga correm em segundo plano junto com a conversão (no paralelo, cada processo carrega o seu);
+        # com o áudio já preparado não há conversão a sobrepor, e elas esperam pela consulta ao cache
+        modelo_solicitado = modelo
+        dispositivo_torch = "cuda" if dispositivo == "GPU" else "cpu"
+        amostrador = AmostradorMemoria().iniciar()  # RSS (e VRAM) durante a conversão, a carga e a decodificação
+        if modo == MODO_JANELAS or (modo != MODO_PARALELO and not audio_preparado):
+            carga = CargaAntecipada(modelo, dispositivo_torch, precisao, motor, politica_memoria, deve_parar)
+
+        def abrir_checkpoint():
+            """Checkpoint das opções finais (depois da admissão): retoma de onde uma execução interrompida parou."""
+            if modo == MODO_PARALELO:
+                return None, 0.0, []
+            opcoes = {"modelo": modelo, "dispositivo": dispositivo, "modo": modo, "precisao": precisao,
+                      "motor": motor, "vad": usar_vad}
+            aberto = Checkpoint(arquivo_checkpoint or caminho_checkpoint(input_file, opcoes), input_file, opcoes)
+            if aberto.posicao:
+                print(f"⏯️ Retomando do checkpoint: {aberto.posicao:.0f} s já transcritos")
+            return aberto, aberto.posicao, aberto.segmentos
+
+        perfil = PerfilExecucao()  # Tempo de parede e de CPU de cada etapa
+        if modo == MODO_JANELAS:
+            audio_preparado = None  # As janelas leem o áudio em blocos durante a decodificação
+        if audio_preparado:
+            perfil.incorporar(audio_preparado["etapas"])  # Sondagem e conversão feitas antes, na etapa de E/S
+        with perfil.etapa("sondagem"):
+            duracao = audio_preparado["duracao"] if audio_preparado else calcular_duracao_audio(input_file)
+        print(f"🎵 Duração do áudio: {duracao:.2f} segundos")
+
+        chave_cache, impressao_blocos = None, None
+        mapa_vad, relatorio_vad, compactador = None, None, None
+        converter_posicao = lambda tempo: tempo  # Posição decodificada -> linha do tempo usada no progresso
+        if modo == MODO_JANELAS:
+            # Sem consulta ao cache antes da decodificação: a posição do checkpoint depende só da admissão
+            modelo = carga.admitido()
+            checkpoint, retomar_de, segmentos_anteriores = abrir_checkpoint()
+            duracao_processada = max(duracao - retomar_de, 0.0)
+
+            # 🔥 Os blocos são lidos só durante a decodificação; impressão e VAD são calculados de passagem
+            audio = None
+            with perfil.etapa("conversao"):
+                blocos, arquivo_wav = carregar_blocos_audio(input_file, streaming, inicio=retomar_de)
+            if usar_cache and not retomar_de:  # A impressão só vale para o áudio inteiro
+                impressao_blocos = cache_transcricoes.nova_impressao()
+                blocos = acumular_impressao(blocos, impressao_blocos)
+            if usar_vad:
+                compactador = CompactadorVAD()
+                blocos = compactador.filtrar(blocos)
+                converter_posicao = lambda tempo: mapear_tempo(tempo, compactador.mapa, fim=True)
+            duracao_decodificada = duracao_processada
+        else:
+            with perfil.etapa("conversao"):
+                if audio_preparado:
+                    audio = audio_preparado["audio"]
+                else:
+                    audio, arquivo_wav = carregar_audio(input_file, duracao, streaming)
+                if isinstance(audio, str):
+                    audio = converter_para_pcm(audio, duracao)  # Os motores e o corte em silêncios trabalham sobre as amostras
+                if usar_cache:
+                    impressao = cache_transcricoes.calcular_impressao_audio(audio)
+                    cache_transcricoes.registrar_impressao(input_file, impressao)
+                    chave_cache = cache_transcricoes.gerar_chave(impressao, modelo, dispositivo, modo, precisao=precisao,
+                                                                 motor=motor, vad=usar_vad)
+            if chave_cache and (resultado := buscar_em_cache(chave_cache, inicio_transcricao, modelo_solicitado)):
+                if carga:
+                    carga.descartar()  # Mesmo áudio com outro nome ou local: dispensa a admissão e o modelo
+                return resultado
+
+            if modo == MODO_PARALELO:
+                modelo = admitir_modelo(modelo, dispositivo_torch, precisao, motor, processos=calcular_workers()[0],
+                                        politica=politica_memoria, deve_parar=deve_parar, gerenciador=gerenciador_modelos)
+            else:
+                carga = carga or CargaAntecipada(modelo, dispositivo_torch, precisao, motor, politica_memoria, deve_parar)
+                modelo = carga.admitido()
+            if chave_cache and modelo != modelo_solicitado:  # Modelo rebaixado: o resultado é guardado sob o modelo usado
+                chave_cache = cache_transcricoes.gerar_chave(impressao, modelo, dispositivo, modo, precisao=precisao,
+                                                             motor=motor, vad=usar_vad)
+            checkpoint, retomar_de, segmentos_anteriores = abrir_checkpoint()
+            duracao_processada = max(duracao - retomar_de, 0.0)
+            if retomar_de:
+                audio = audio[int(retomar_de * TAXA_AMOSTRAGEM):]  # O que já foi transcrito não volta ao modelo
+
+            # 🔥 Pré-passagem de VAD: silêncios longos não chegam ao modelo (nem geram texto alucinado)
+            if usar_vad:
+                with perfil.etapa("vad"):
+                    regioes = detectar_fala(audio)
+                    relatorio_vad = resumir_vad(len(audio) / TAXA_AMOSTRAGEM, regioes)
+                    audio, mapa_vad = compactar_audio(audio, regioes)
+            duracao_decodificada = len(audio) / TAXA_AMOSTRAGEM
+
+        def para_original(tempo, fim=False):
+            """Converte um tempo do áudio decodificado para o arquivo original (desfaz o VAD e a retomada)."""
+            return retomar_de + mapear_tempo(tempo, compactador.mapa if compactador else mapa_vad, fim)
+
+        def segmentos_originais(segmentos):
+            return [{**s, "start": para_original(s["start"]), "end": para_original(s["end"], fim=True)} for s in segmentos]
+
+        if deve_parar and deve_parar():
+            raise TranscricaoCancelada()
+
+        if audio is not None and len(audio) == 0:
+            print("🔇 Nenhuma fala detectada no áudio.")
+            transcricao = {"text": "", "segments": []}
+            tempo_primeiro_texto = None
+        elif modo == MODO_PARALELO:
+            print("🔍 Iniciando transcrição paralela...")
+            inicio_decodificacao = time.time()
+            with perfil.etapa("decodificacao"):
+                transcricao = transcrever_paralelo(audio, modelo, idioma="pt", ao_concluir=reportar_progresso,
+                                                   precisao=precisao, motor=motor, deve_parar=deve_parar)
+            if transcricao is None:
+                raise TranscricaoCancelada()
+            tempo_primeiro_texto = time.time() - inicio_transcricao  # O texto só aparece com todos os blocos prontos
+            if ao_segmentos:
+                ao_segmentos(segmentos_originais(transcricao["segments"]))
+        else:
+            if carga.reaproveitado:
+                modelo_whisper = obter_modelo(modelo, dispositivo_torch, precisao, motor)  # Já estava em memória: sem custo de carga
+            else:
+                with perfil.etapa("carregamento"):  # Só a parte da carga que não coincidiu com a conversão
+                    carga.aguardar()
+                    modelo_whisper = obter_modelo(modelo, dispositivo_torch, precisao, motor)
+
+            print("🔍 Iniciando transcrição...")
+            inicio_decodificacao = time.time()
+            segmentos = []
+            tempo_primeiro_texto = None  # Quanto o operador esperou até ver o primeiro trecho
+            texto_anterior = "".join(s["text"] for s in segmentos_anteriores)
+            if ao_segmentos and segmentos_anteriores:
+                ao_segmentos(segmentos_anteriores)
+            if modo == MODO_JANELAS:
+                janelas = agrupar_em_janelas(blocos, JANELA_DECODIFICACAO, BUSCA_SILENCIO_JANELA)
+                fluxo = motor_inferencia.transcrever_janelas(modelo_whisper, janelas, idioma="pt", contexto=texto_anterior)
+            else:
+                def avancar(posicao):
+                    """Avanço dentro da passagem única: atualiza o progresso e atende ao cancelamento."""
+                    reportar_progresso(posicao)
+                    if deve_parar and deve_parar():
+                        raise TranscricaoCancelada()
+
+                fluxo = motor_inferencia.transcrever_fluxo(modelo_whisper, audio, idioma="pt",
+                                                           contexto=texto_anterior[-CONTEXTO_MAXIMO:] or None,
+                                                           ao_avancar=avancar)
+            with perfil.etapa("decodificacao"):
+                for fim_janela, segmentos_janela in fluxo:
+                    segmentos.extend(segmentos_janela)
+                    if tempo_primeiro_texto is None and segmentos_janela:
+                        tempo_primeiro_texto = time.time() - inicio_transcricao
+                    if ao_segmentos and segmentos_janela:
+                        ao_segmentos(segmentos_originais(segmentos_janela))
+                    reportar_progresso(converter_posicao(max([fim_janela] + [s["end"] for s in segmentos_janela])))
+
+                    cancelado = bool(deve_parar and deve_parar())
+                    if cancelado or checkpoint.vencido():
+                        checkpoint.salvar(para_original(fim_janela, fim=True),
+                                          segmentos_anteriores + segmentos_originais(segmentos))
+                    if cancelado:
+                        raise TranscricaoCancelada()
+            transcricao = {"text": "".join(s["text"] for s in segmentos), "segments": segmentos}
+
+        if compactador:
+            relatorio_vad = resumir_vad(duracao_processada, compactador.regioes)
+        if relatorio_vad:
+            print(f"🔇 VAD: {relatorio_vad['duracao_ignorada']:.0f} s de silêncio ignorados "
+                  f"({relatorio_vad['percentual_ignorado']:.1f}%), {relatorio_vad['regioes']} regiões de fala")
+        segmentos_finais = segmentos_anteriores + segmentos_originais(transcricao["segments"])
+        transcricao = {"text": "".join(s["text"] for s in segmentos_finais), "segments": segmentos_finais}
+
+        if impressao_blocos:
+            impressao = impressao_blocos.hexdigest()
+            cache_transcricoes.registrar_impressao(input_file, impressao)
+            chave_cache = cache_transcricoes.gerar_chave(impressao, modelo, dispositivo, modo, precisao=precisao,
+                                                         motor=motor, vad=usar_vad)
+
+        # 🔥 Modificação para adicionar '|' entre frases detectadas
+        with perfil.etapa("formatacao"):
+            texto_formatado = formatar_texto(transcricao["text"])
+
+        if modo == MODO_PARALELO:
+            threads = dict(zip(("workers", "threads_por_worker"), calcular_workers()))
+        else:
+            threads = configuracao_aplicada()
+
+        amostrador.parar()
+        memoria = amostrador.resumo()
+        tempo_real = time.time() - inicio_transcricao
+        trabalho_id = registrar_transcricao(modelo, chave_historico(dispositivo, modo, precisao, motor), duracao_processada,
+                                            int(tempo_real), perfil.tempos_parede(), memoria=memoria)
+        registrar_metricas(perfil.gerar_registro(
+            trabalho_id=trabalho_id, arquivo=os.path.basename(input_file), modelo=modelo,
+            dispositivo=chave_historico(dispositivo, modo, precisao, motor), modo=modo, motor=motor,
+            audio_duracao=duracao_processada, threads=threads, vad=relatorio_vad, retomado_de=retomar_de, memoria=memoria,
+            modelo_solicitado=modelo_solicitado,
+            tempo_primeiro_texto=round(tempo_primeiro_texto, 3) if tempo_primeiro_texto is not None else None
+        ))
+        print(f"⏳ Tempo real da transcrição: {tempo_real:.2f} segundos")
+
+        if modo == MODO_PARALELO:
+            aceleracao = calcular_aceleracao(modelo, "CPU", duracao_processada, tempo_real)
+            if aceleracao is not None:
+                print(f"🚀 Aceleração sobre o histórico de passagem única na CPU: {aceleracao:.2f}x")
+
+        if precisao == PRECISAO_INT8:
+            aceleracao = calcular_aceleracao(modelo, chave_historico(dispositivo, modo, motor=motor), duracao_processada,
+                                             tempo_real)
+            if aceleracao is not None:
+                print(f"🚀 Aceleração do int8 sobre o histórico fp32: {aceleracao:.2f}x")
+
+        resultado = {
+            "texto": texto_formatado,
+            "segmentos": transcricao["segments"],
+            "duracao": duracao,
+            "tempo_real": tempo_real,
+            "modelo": modelo,
+            "dispositivo": dispositivo,
+            "modo": modo,
+            "precisao": precisao,
+            "motor": motor,
+            "vad": relatorio_vad,
+            "memoria": memoria,
+            "modelo_solicitado": modelo_solicitado,  # Difere de "modelo" se faltou memória e o modelo foi rebaixado
+        }
+        if chave_cache:
+            cache_transcricoes.salvar_resultado(chave_cache, resultado)
+        if checkpoint:
+            checkpoint.remover()
+        return resultado
+
+    except TranscricaoCancelada as cancelamento:
+        # Solta as referências ao modelo e aos leitores de áudio (encerra o FFmpeg) e tira o modelo da memória já
+        modelo_whisper = fluxo = blocos = janelas = None
+        if carga:
+            carga.descartar()  # Se a carga ainda estiver em curso, o modelo sai da memória quando ela terminar
+        gerenciador_modelos.descarregar(modelo, "cuda" if dispositivo == "GPU" else "cpu", precisao, motor)
+        cancelamento.posicao = checkpoint.posicao if checkpoint else 0.0
+        if cancelamento.posicao:
+            print(f"⏹️ Transcrição cancelada; o progresso ficou salvo em {checkpoint.caminho}")
+        else:
+            print("⏹️ Transcrição cancelada; nenhum trecho foi concluído para retomar.")
+        raise
+
+    finally:
+        if amostrador:
+            amostrador.parar()
+        if arquivo_wav and os.path.exists(arquivo_wav):
+            os.remove(arquivo_wav)
+            print(f"🗑️ Arquivo temporário removido: {arquivo_wav}")
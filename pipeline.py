@@ -0,0 +1,75 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+CAPACIDADE_FILA = 1  # Itens prontos à frente da etapa seguinte (cada áudio preparado ocupa ~230 MB por hora)
+_FIM = object()  # Sinaliza à thread da etapa que não virão mais itens
+
+
+class UtilizacaoEtapas:
+    """Soma o tempo em que cada etapa do pipeline esteve ocupada, para medir a utilização ao final."""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.ocupado = {}  # nome -> segundos trabalhando
+        self.itens = {}  # nome -> itens processados
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def etapa(self, nome):
+        """Cronometra o bloco como trabalho da etapa informada."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.ocupado[nome] = self.ocupado.get(nome, 0.0) + time.perf_counter() - inicio
+                self.itens[nome] = self.itens.get(nome, 0) + 1
+
+    def resumo(self):
+        """Tempo ocupado e utilização (fração do tempo total) de cada etapa."""
+        total = time.perf_counter() - self.inicio
+        return {nome: {"itens": self.itens[nome], "ocupado": round(ocupado, 3),
+                       "utilizacao": round(ocupado / total, 3) if total > 0 else None}
+                for nome, ocupado in self.ocupado.items()}
+
+
+class EtapaPipeline:
+    """Etapa executada numa thread própria: aplica a função a cada item recebido e entrega o resultado.
+
+    As filas de entrada e saída são limitadas, então a etapa não se adianta mais que CAPACIDADE_FILA
+    itens em relação à seguinte. Erros da função são entregues junto do item, sem encerrar a etapa.
+    """
+
+    def __init__(self, nome, funcao, utilizacao=None, capacidade=CAPACIDADE_FILA):
+        self.nome = nome
+        self.funcao = funcao
+        self.utilizacao = utilizacao or UtilizacaoEtapas()
+        self.entrada = queue.Queue(maxsize=capacidade)
+        self.saida = queue.Queue(maxsize=capacidade)
+        self._thread = threading.Thread(target=self._executar, name=f"pipeline-{nome}", daemon=True)
+        self._thread.start()
+
+    def _executar(self):
+        while (item := self.entrada.get()) is not _FIM:
+            chave, argumentos = item
+            resultado, erro = None, None
+            with self.utilizacao.etapa(self.nome):
+                try:
+                    resultado = self.funcao(*argumentos)
+                except Exception as e:
+                    erro = e
+            self.saida.put((chave, resultado, erro))
+
+    def enviar(self, chave, *argumentos):
+        """Entrega um item à etapa (bloqueia se a fila de entrada estiver cheia)."""
+        self.entrada.put((chave, argumentos))
+
+    def receber(self):
+        """Aguarda o próximo resultado: tupla (chave, resultado, erro)."""
+        return self.saida.get()
+
+    def encerrar(self):
+        """Pede o fim da thread depois do item atual, sem esperar por ele."""
+        self.entrada.put(_FIM)
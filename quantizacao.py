@@ -0,0 +1,99 @@
+import os
+import time
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+quantizados_dir = os.environ.get("TRANSCRITOR_MODELOS_QUANTIZADOS", os.path.join(base_dir, "modelos_quantizados"))
+
+PRECISAO_PADRAO = "fp32"
+PRECISAO_INT8 = "int8"  # Camadas lineares quantizadas dinamicamente para int8 (somente CPU)
+VERSAO_QUANTIZACAO = 2  # Incrementar quando a forma de quantizar mudar, invalidando os arquivos em disco
+
+
+def caminho_quantizado(modelo):
+    """Arquivo em disco do modelo quantizado, separado por versão do Torch e do Whisper."""
+    import torch
+    import whisper
+
+    versao = f"v{VERSAO_QUANTIZACAO}-torch{torch.__version__}-whisper{whisper.__version__}"
+    nome = os.path.splitext(os.path.basename(modelo))[0]
+    return os.path.join(quantizados_dir, f"{nome}-int8-{versao}.pt".replace("+", "_"))
+
+
+def substituir_lineares(modulo, criar):
+    """Troca, recursivamente, cada camada linear do modelo pela camada devolvida por criar(camada)."""
+    import torch
+
+    for nome, filho in modulo.named_children():
+        if isinstance(filho, torch.nn.Linear):
+            setattr(modulo, nome, criar(filho))
+        else:
+            substituir_lineares(filho, criar)
+
+
+def linear_comum(camada):
+    """nn.Linear exata com os mesmos parâmetros da camada, sem copiá-los.
+
+    O Whisper usa uma subclasse de nn.Linear que o Torch não quantiza (ele compara a classe exata);
+    em fp32 na CPU as duas calculam o mesmo.
+    """
+    import torch
+
+    comum = torch.nn.Linear(camada.in_features, camada.out_features, bias=camada.bias is not None, device="meta")
+    comum.weight = camada.weight
+    if camada.bias is not None:
+        comum.bias = camada.bias
+    return comum
+
+
+def linear_int8_vazia(camada):
+    """Camada linear int8 dinâmica com as dimensões da camada, à espera dos pesos gravados em disco."""
+    import torch
+
+    return torch.ao.nn.quantized.dynamic.Linear(camada.in_features, camada.out_features,
+                                                bias_=camada.bias is not None, dtype=torch.qint8)
+
+
+def quantizar_modelo(modelo_whisper):
+    """Converte as camadas lineares do modelo (CPU, fp32) para int8 com quantização dinâmica."""
+    import torch
+
+    substituir_lineares(modelo_whisper, linear_comum)
+    return torch.ao.quantization.quantize_dynamic(modelo_whisper, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def carregar_modelo_quantizado(modelo):
+    """Carrega o modelo int8 do disco; na primeira vez, converte o modelo fp32 e grava o resultado.
+
+    Em disco fica só o state_dict (lido com weights_only=True, sem executar código do arquivo). A estrutura
+    vem do modelo fp32 da loja local, com as camadas lineares trocadas por camadas int8 vazias.
+    """
+    import torch
+    from modelos_locais import carregar_modelo_local
+
+    caminho = caminho_quantizado(modelo)
+    if os.path.exists(caminho):
+        try:
+            estado = torch.load(caminho, map_location="cpu", weights_only=True)
+            modelo_whisper = carregar_modelo_local(modelo, "cpu")
+            substituir_lineares(modelo_whisper, linear_int8_vazia)
+            modelo_whisper.load_state_dict(estado)
+            return modelo_whisper
+        except Exception as e:
+            print(f"⚠️ Modelo quantizado inválido, convertendo novamente: {e}")
+
+    print(f"⚙️ Quantizando o modelo {modelo} para int8 (feito uma única vez)...")
+    inicio = time.time()
+    modelo_whisper = quantizar_modelo(carregar_modelo_local(modelo, "cpu"))
+
+    os.makedirs(quantizados_dir, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"  # Vários processos podem converter ao mesmo tempo
+    torch.save(modelo_whisper.state_dict(), temporario)
+    os.replace(temporario, caminho)
+    print(f"✅ Modelo quantizado em {time.time() - inicio:.2f} segundos e salvo em {caminho}")
+    return modelo_whisper
+
+
+def preparar_modelo_quantizado(modelo):
+    """Garante que o modelo int8 já existe em disco (antes de iniciar processos que vão carregá-lo)."""
+    if not os.path.exists(caminho_quantizado(modelo)):
+        carregar_modelo_quantizado(modelo)
@@ -0,0 +1,119 @@
+import difflib
+from nucleo_transcricao import transcrever_arquivo, MODO_PADRAO
+
+MODELO_RASCUNHO = "small"  # Modelo do rascunho: várias vezes mais rápido que o large
+PESO_RASCUNHO = 0.2  # Fração da barra de progresso ocupada pelo rascunho
+
+
+def normalizar_palavra(palavra):
+    """Ignora pontuação e maiúsculas ao comparar o rascunho com o texto refinado."""
+    return palavra.strip(".,;:!?\"'").lower()
+
+
+class TranscricaoRefinada:
+    """Rascunho substituído, trecho a trecho, pelos segmentos refinados que vão chegando em ordem.
+
+    Cada segmento da lista mesclada traz "refinado" (já veio do modelo final) e "alterado"
+    (o texto refinado difere do rascunho no mesmo intervalo de tempo).
+    """
+
+    def __init__(self, rascunho=None):
+        self.rascunho = rascunho or []
+        self.refinados = []
+        self.refinado_ate = 0.0  # Tempo (s) do áudio original até onde o rascunho já foi substituído
+
+    def refinar(self, segmentos):
+        """Substitui o trecho do rascunho coberto pelos novos segmentos, marcando os que mudaram."""
+        if not segmentos:
+            return self.segmentos()
+
+        fim = max(s["end"] for s in segmentos)
+        meio = lambda s: (s["start"] + s["end"]) / 2
+        substituidos = [s for s in self.rascunho if self.refinado_ate <= meio(s) < fim]
+
+        # Alinha as palavras do rascunho e do refinado; segmentos com palavras diferentes são marcados
+        palavras_rascunho, donos_rascunho = [], []
+        for indice, segmento in enumerate(substituidos):
+            for palavra in segmento["text"].split():
+                palavras_rascunho.append(normalizar_palavra(palavra))
+                donos_rascunho.append(indice)
+        palavras, donos = [], []
+        for indice, segmento in enumerate(segmentos):
+            for palavra in segmento["text"].split():
+                palavras.append(normalizar_palavra(palavra))
+                donos.append(indice)
+
+        alterados = set()
+        comparador = difflib.SequenceMatcher(None, palavras_rascunho, palavras, autojunk=False)
+        for operacao, inicio_rascunho, _, inicio, fim_trecho in comparador.get_opcodes():
+            if operacao == "equal":
+                continue
+            if inicio == fim_trecho:  # Palavras do rascunho removidas: marca o segmento refinado no mesmo tempo
+                original = substituidos[donos_rascunho[inicio_rascunho]]
+                alterados.add(min(range(len(segmentos)), key=lambda i: abs(meio(segmentos[i]) - meio(original))))
+                continue
+            alterados.update(donos[inicio:fim_trecho])
+
+        self.refinados.extend({**s, "refinado": True, "alterado": i in alterados} for i, s in enumerate(segmentos))
+        self.refinado_ate = max(self.refinado_ate, fim)
+        return self.segmentos()
+
+    def concluir(self):
+        """Descarta o rascunho que o modelo final não cobriu: o resultado final é sempre o refinado."""
+        self.refinado_ate = float("inf")
+        return self.segmentos()
+
+    def segmentos(self):
+        """Transcrição atual: os segmentos refinados seguidos do rascunho ainda não substituído."""
+        pendentes = [{**s, "refinado": False, "alterado": False} for s in self.rascunho
+                     if (s["start"] + s["end"]) / 2 >= self.refinado_ate]
+        return self.refinados + pendentes
+
+
+def transcrever_com_refinamento(input_file, modelo="large", dispositivo="CPU", modo=MODO_PADRAO, streaming=True,
+                                ao_progredir=None, ao_segmentos=None, ao_refinar=None,
+                                deve_parar=None, modelo_rascunho=MODELO_RASCUNHO, **opcoes):
+    """Transcreve primeiro com o modelo do rascunho, exibido na hora, e depois com o modelo final.
+
+    ao_segmentos recebe o rascunho à medida que é decodificado; ao_refinar(segmentos) recebe a
+    transcrição mesclada (ver TranscricaoRefinada) ao fim do rascunho e a cada trecho refinado.
+    As demais opções são repassadas a transcrever_arquivo. Retorna o resultado do modelo final.
+    """
+    def progresso_rascunho(percentual, segundos_restantes):
+        if ao_progredir:
+            ao_progredir(int(percentual * PESO_RASCUNHO), segundos_restantes)
+
+    def progresso_refinamento(percentual, segundos_restantes):
+        if ao_progredir:
+            ao_progredir(int(100 * PESO_RASCUNHO + percentual * (1 - PESO_RASCUNHO)), segundos_restantes)
+
+    print(f"📝 Rascunho com o modelo {modelo_rascunho}...")
+    rascunho = transcrever_arquivo(input_file, modelo_rascunho, dispositivo, modo, streaming,
+                                   ao_progredir=progresso_rascunho, ao_segmentos=ao_segmentos,
+                                   deve_parar=deve_parar, **opcoes)
+    refinada = TranscricaoRefinada(rascunho["segmentos"])
+    if ao_refinar:
+        ao_refinar(refinada.segmentos())
+
+    def refinar(segmentos):
+        mesclada = refinada.refinar(segmentos)
+        if ao_refinar:
+            ao_refinar(mesclada)
+
+    print(f"🎯 Refinando com o modelo {modelo}...")
+    final = transcrever_arquivo(input_file, modelo, dispositivo, modo, streaming,
+                                ao_progredir=progresso_refinamento, ao_segmentos=refinar,
+                                deve_parar=deve_parar, **opcoes)
+
+    # Resultado do cache (ou sem trechos intermediários): o que faltou é refinado de uma vez
+    restantes = [s for s in final["segmentos"] if (s["start"] + s["end"]) / 2 >= refinada.refinado_ate]
+    if restantes:
+        refinar(restantes)
+    mesclada = refinada.concluir()
+    if ao_refinar:
+        ao_refinar(mesclada)
+
+    alterados = sum(1 for s in refinada.refinados if s["alterado"])
+    print(f"✅ Refinamento concluído: {alterados} de {len(refinada.refinados)} trechos mudaram em relação ao rascunho")
+    return {**final, "segmentos": mesclada,
+            "rascunho": {"modelo": modelo_rascunho, "tempo_real": rascunho["tempo_real"], "texto": rascunho["texto"]}}
@@ -0,0 +1,27 @@
+import json
+
+FORMATOS = ("txt", "json", "srt")
+
+
+def formatar_timestamp_srt(segundos):
+    """Converte segundos para o formato de tempo do SRT (HH:MM:SS,mmm)."""
+    milissegundos = int(round(segundos * 1000))
+    horas, milissegundos = divmod(milissegundos, 3600000)
+    minutos, milissegundos = divmod(milissegundos, 60000)
+    segundos, milissegundos = divmod(milissegundos, 1000)
+    return f"{horas:02d}:{minutos:02d}:{segundos:02d},{milissegundos:03d}"
+
+
+def gerar_saida(resultado, formato):
+    """Gera o conteúdo de saída de uma transcrição no formato pedido."""
+    if formato == "json":
+        return json.dumps(resultado, indent=4, ensure_ascii=False)
+
+    if formato == "srt":
+        blocos = [
+            f"{i}\n{formatar_timestamp_srt(s['start'])} --> {formatar_timestamp_srt(s['end'])}\n{s['text'].strip()}\n"
+            for i, s in enumerate(resultado["segmentos"], start=1)
+        ]
+        return "\n".join(blocos)
+
+    return resultado["texto"] + "\n"
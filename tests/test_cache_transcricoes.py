@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+
+import cache_transcricoes
+from janelas import acumular_impressao
+
+
+@pytest.fixture(autouse=True)
+def cache_temporario(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_transcricoes, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(cache_transcricoes, "indice_file", str(tmp_path / "indice_arquivos.json"))
+    return tmp_path
+
+
+def test_impressao_depende_apenas_das_amostras():
+    audio = np.random.default_rng(0).standard_normal(16000).astype(np.float32)
+
+    assert cache_transcricoes.calcular_impressao_audio(audio) == cache_transcricoes.calcular_impressao_audio(audio.copy())
+    alterado = audio.copy()
+    alterado[100] += 1e-3
+    assert cache_transcricoes.calcular_impressao_audio(alterado) != cache_transcricoes.calcular_impressao_audio(audio)
+
+
+def test_impressao_em_blocos_e_igual_a_do_audio_inteiro():
+    audio = np.random.default_rng(1).standard_normal(50000).astype(np.float32)
+    impressao = cache_transcricoes.nova_impressao()
+    for _ in acumular_impressao((audio[i:i + 7000] for i in range(0, len(audio), 7000)), impressao):
+        pass
+
+    assert impressao.hexdigest() == cache_transcricoes.calcular_impressao_audio(audio)
+
+
+def test_chave_muda_com_cada_opcao():
+    base = dict(impressao="abc", modelo="small", dispositivo="CPU", modo="padrao")
+    chave = cache_transcricoes.gerar_chave(**base)
+
+    variacoes = [
+        dict(base, impressao="abd"), dict(base, modelo="medium"), dict(base, dispositivo="GPU"),
+        dict(base, modo="janelas"), dict(base, idioma="en"), dict(base, precisao="int8"),
+        dict(base, motor="ctranslate2"), dict(base, vad=True),
+    ]
+    chaves = {cache_transcricoes.gerar_chave(**opcoes) for opcoes in variacoes}
+    assert len(chaves) == len(variacoes) and chave not in chaves
+
+
+def test_opcoes_padrao_preservam_as_chaves_antigas():
+    # Precisão fp32 e motor whisper explícitos geram a mesma chave de antes de existirem essas opções
+    assert (cache_transcricoes.gerar_chave("abc", "small", "CPU", "padrao", precisao="fp32", motor="whisper")
+            == cache_transcricoes.gerar_chave("abc", "small", "CPU", "padrao"))
+
+
+def test_indice_reconhece_o_arquivo_ate_ele_mudar(tmp_path):
+    arquivo = tmp_path / "oitiva.mp3"
+    arquivo.write_bytes(b"audio")
+    assert cache_transcricoes.impressao_conhecida(str(arquivo)) is None
+    assert cache_transcricoes.impressao_conhecida(str(tmp_path / "inexistente.mp3")) is None
+
+    cache_transcricoes.registrar_impressao(str(arquivo), "abc")
+    assert cache_transcricoes.impressao_conhecida(str(arquivo)) == "abc"
+
+    arquivo.write_bytes(b"outro audio")
+    assert cache_transcricoes.impressao_conhecida(str(arquivo)) is None
+
+
+def test_resultado_salvo_e_recuperado():
+    resultado = {"texto": "Bom dia.", "segmentos": [{"start": 0.0, "end": 1.0, "text": " Bom dia."}]}
+    cache_transcricoes.salvar_resultado("chave", resultado)
+
+    assert cache_transcricoes.buscar_resultado("chave") == resultado
+    assert cache_transcricoes.buscar_resultado("outra") is None
+
+
+def test_limite_remove_os_menos_usados_e_preserva_o_indice(cache_temporario):
+    cache_transcricoes.registrar_impressao(__file__, "abc")
+    for i, nome in enumerate(("antigo", "usado", "novo")):
+        cache_transcricoes.salvar_resultado(nome, {"texto": "x" * 400_000})
+        os.utime(cache_transcricoes.caminho_resultado(nome), (1000 + i, 1000 + i))
+    cache_transcricoes.buscar_resultado("usado")  # Marca como usado agora
+
+    cache_transcricoes.aplicar_limite(limite_mb=1)
+
+    restantes = sorted(nome for nome in os.listdir(cache_temporario) if nome != "indice_arquivos.json")
+    assert restantes == ["novo.json", "usado.json"]
+    assert cache_transcricoes.impressao_conhecida(__file__) == "abc"
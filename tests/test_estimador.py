@@ -0,0 +1,104 @@
+import pytest
+
+import estimador
+from historico import HistoricoTranscricoes
+
+
+@pytest.fixture
+def historico_vazio(tmp_path, monkeypatch):
+    h = HistoricoTranscricoes(str(tmp_path / "historico.jsonl"), legado=None)
+    monkeypatch.setattr(estimador, "historico", h)
+    return h
+
+
+def test_ajustar_reta_recupera_custo_fixo_e_por_segundo():
+    pontos = [(x, 5 + 2 * x) for x in (10, 20, 40, 80)]
+    reta = estimador.ajustar_reta(pontos)
+
+    assert reta["intercepto"] == pytest.approx(5)
+    assert reta["inclinacao"] == pytest.approx(2)
+    assert reta["desvio"] == pytest.approx(0, abs=1e-9)
+    assert estimador.prever(reta, 100)[0] == pytest.approx(205)
+
+
+def test_ajustar_reta_com_poucos_pontos_usa_a_razao_media():
+    reta = estimador.ajustar_reta([(10, 30), (30, 70)])
+
+    assert reta["intercepto"] == 0
+    assert reta["inclinacao"] == pytest.approx(100 / 40)
+    assert estimador.prever(reta, 20) == (pytest.approx(50), None)
+    assert estimador.ajustar_reta([]) is None
+
+
+def test_ajustar_reta_inclinacao_negativa_vira_custo_fixo():
+    reta = estimador.ajustar_reta([(10, 9), (20, 8), (30, 7)])
+
+    assert reta["inclinacao"] == 0
+    assert reta["intercepto"] == pytest.approx(8)
+
+
+def test_ajustar_reta_intercepto_negativo_passa_pela_origem():
+    reta = estimador.ajustar_reta([(10, 1), (20, 12), (30, 23)])
+
+    assert reta["intercepto"] == 0
+    assert reta["inclinacao"] > 0
+
+
+def test_erro_da_predicao_cresce_longe_da_media():
+    reta = estimador.ajustar_reta([(10, 21), (20, 39), (30, 62), (40, 79)])
+
+    _, erro_centro = estimador.prever(reta, 25)
+    _, erro_longe = estimador.prever(reta, 400)
+    assert 0 < erro_centro < erro_longe
+
+
+def test_quantil_t_95():
+    assert estimador.quantil_t_95(1) == 12.71
+    assert estimador.quantil_t_95(11) == 2.18  # Arredonda para o próximo grau tabelado
+    assert estimador.quantil_t_95(1000) == 1.96
+
+
+def test_estimar_etapas_soma_as_etapas_com_intervalo(historico_vazio):
+    for duracao in (60, 120, 240, 480):
+        historico_vazio.registrar("rápido", "CPU", audio_duracao=duracao, tempo_real=10 + duracao, host="maquina",
+                                  etapas={"carregamento": 10, "decodificacao": duracao * 1.0})
+
+    estimativa = estimador.estimar_etapas("small", "CPU", 300, host="maquina")
+
+    assert estimativa["etapas"]["carregamento"] == pytest.approx(10)
+    assert estimativa["etapas"]["decodificacao"] == pytest.approx(300)
+    assert estimativa["total"] == pytest.approx(310)
+    inferior, superior = estimativa["intervalo"]
+    assert inferior <= estimativa["total"] <= superior
+
+    sem_carga = estimador.estimar_etapas("small", "CPU", 300, host="maquina", modelo_carregado=True)
+    assert "carregamento" not in sem_carga["etapas"]
+    assert sem_carga["total"] == pytest.approx(300)
+
+
+def test_estimar_etapas_usa_todos_os_hosts_quando_o_atual_tem_poucos_dados(historico_vazio):
+    for duracao in (60, 120, 240):
+        historico_vazio.registrar("rápido", "CPU", audio_duracao=duracao, tempo_real=2 * duracao, host="outra")
+    historico_vazio.registrar("rápido", "CPU", audio_duracao=60, tempo_real=600, host="maquina")
+
+    estimativa = estimador.estimar_etapas("rápido", "CPU", 100, host="maquina")
+
+    assert set(estimativa["etapas"]) == {"total"}
+    assert len(estimador.registros_para_regressao("rápido", "CPU", "maquina")) == 4
+    assert estimativa["total"] > 200
+
+
+def test_estimar_tempo_sem_historico(historico_vazio):
+    assert estimador.estimar_tempo("small", "CPU", 60) is None
+    assert estimador.calcular_aceleracao("small", "CPU", 60, 30) is None
+
+
+def test_registrar_transcricao_grava_apenas_trabalhos_concluidos(historico_vazio):
+    trabalho_id = estimador.registrar_transcricao("large", "CPU", 60.004, 120, {"decodificacao": 100.12345})
+
+    registro = historico_vazio.obter(trabalho_id)
+    assert registro["modelo"] == "preciso"
+    assert registro["audio_duracao"] == 60.0
+    assert registro["tempo_real"] == 120
+    assert registro["etapas"] == {"decodificacao": 100.123}
+    assert estimador.calcular_fator_medio("large", "CPU") == pytest.approx(2.0, rel=1e-3)
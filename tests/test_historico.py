@@ -0,0 +1,89 @@
+import json
+
+import historico
+from historico import HistoricoTranscricoes
+
+
+def criar_historico(tmp_path, legado=None):
+    return HistoricoTranscricoes(str(tmp_path / "historico.jsonl"), legado=legado)
+
+
+def linhas_do_log(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+
+def test_atualizar_mescla_campos_no_registro(tmp_path):
+    h = criar_historico(tmp_path)
+    trabalho_id = h.registrar("preciso", "CPU", audio_duracao=60.0, tempo_real=120)
+    h.atualizar(trabalho_id, etapas={"decodificacao": 100.0})
+
+    registro = h.obter(trabalho_id)
+    assert registro["audio_duracao"] == 60.0
+    assert registro["tempo_real"] == 120
+    assert registro["etapas"] == {"decodificacao": 100.0}
+    assert h.registros("preciso", "CPU") == [registro]
+    assert h.registros("preciso", "GPU") == []
+
+
+def test_compactar_deixa_uma_linha_por_trabalho(tmp_path):
+    h = criar_historico(tmp_path)
+    ids = [h.registrar("rápido", "CPU", audio_duracao=d, tempo_real=d) for d in (10, 20, 30)]
+    for trabalho_id in ids:
+        h.atualizar(trabalho_id, host="maquina")
+
+    h.compactar()
+
+    linhas = linhas_do_log(h.caminho)
+    assert sorted(linha["id"] for linha in linhas) == sorted(ids)
+    assert all(linha["host"] == "maquina" for linha in linhas)
+    assert [r["audio_duracao"] for r in h.registros("rápido", "CPU")] == [10, 20, 30]
+
+
+def test_compactar_descarta_trabalhos_sem_tempo_real(tmp_path):
+    h = criar_historico(tmp_path)
+    concluido = h.registrar("moderado", "CPU", audio_duracao=60, tempo_real=90)
+    orfao = h.registrar("moderado", "CPU", audio_duracao=60, tempo_real=None)
+
+    h.compactar()
+
+    assert h.obter(concluido) is not None
+    assert h.obter(orfao) is None
+    assert [linha["id"] for linha in linhas_do_log(h.caminho)] == [concluido]
+
+
+def test_compactacao_automatica_limita_o_tamanho_do_log(tmp_path):
+    h = criar_historico(tmp_path)
+    trabalho_id = h.registrar("rápido", "CPU", audio_duracao=10, tempo_real=5)
+    for i in range(300):
+        h.atualizar(trabalho_id, tempo_real=i)
+
+    assert len(linhas_do_log(h.caminho)) <= historico.FATOR_COMPACTACAO + 100
+    assert h.obter(trabalho_id)["tempo_real"] == 299
+
+
+def test_instancias_no_mesmo_arquivo_enxergam_escritas_e_compactacoes(tmp_path):
+    a = criar_historico(tmp_path)
+    b = criar_historico(tmp_path)
+    primeiro = a.registrar("preciso", "CPU", audio_duracao=30, tempo_real=60)
+    assert b.obter(primeiro)["tempo_real"] == 60
+
+    segundo = b.registrar("preciso", "CPU", audio_duracao=40, tempo_real=80)
+    b.compactar()  # Substitui o arquivo: a precisa reconstruir o índice
+    terceiro = b.registrar("preciso", "CPU", audio_duracao=50, tempo_real=100)
+
+    assert [r["id"] for r in a.registros("preciso", "CPU")] == [primeiro, segundo, terceiro]
+
+
+def test_migra_o_formato_antigo_uma_unica_vez(tmp_path):
+    legado = tmp_path / "transcript_data.json"
+    legado.write_text(json.dumps({"preciso": {"CPU": [
+        {"audio_duracao": 60, "tempo_real": 120},
+        {"audio_duracao": 30, "tempo_real": 55},
+    ]}}), encoding="utf-8")
+
+    h = criar_historico(tmp_path, legado=str(legado))
+    assert [r["tempo_real"] for r in h.registros("preciso", "CPU")] == [120, 55]
+
+    h.registrar("preciso", "CPU", audio_duracao=10, tempo_real=20)
+    assert len(criar_historico(tmp_path, legado=str(legado)).registros("preciso", "CPU")) == 3
@@ -0,0 +1,75 @@
+import wave
+
+import numpy as np
+
+from janelas import TAXA_AMOSTRAGEM, agrupar_em_janelas, ler_blocos_wav, CompactadorVAD
+from vad import mapear_tempo
+
+
+def fala_com_pausas(duracao, pausas, duracao_pausa=0.5):
+    """Ruído alto (fala) com pausas silenciosas de duracao_pausa começando nos instantes informados."""
+    audio = 0.3 * np.random.default_rng(0).standard_normal(int(duracao * TAXA_AMOSTRAGEM)).astype(np.float32)
+    for pausa in pausas:
+        audio[int(pausa * TAXA_AMOSTRAGEM):int((pausa + duracao_pausa) * TAXA_AMOSTRAGEM)] = 0
+    return audio
+
+
+def em_blocos(audio, duracao_bloco):
+    amostras = int(duracao_bloco * TAXA_AMOSTRAGEM)
+    return (audio[i:i + amostras] for i in range(0, len(audio), amostras))
+
+
+def test_janelas_reconstroem_o_audio_sem_lacunas():
+    audio = fala_com_pausas(200, pausas=[28, 57, 88, 119, 148, 177])
+    janelas = list(agrupar_em_janelas(em_blocos(audio, 45), duracao_janela=30, busca_silencio=5))
+
+    posicao = 0
+    for inicio, janela in janelas:
+        assert inicio == posicao
+        np.testing.assert_array_equal(janela, audio[inicio:inicio + len(janela)])
+        posicao += len(janela)
+    assert posicao == len(audio)
+
+
+def test_cortes_das_janelas_nao_dependem_dos_blocos_lidos():
+    audio = fala_com_pausas(200, pausas=[28, 57, 88, 119, 148, 177])
+
+    def inicios(duracao_bloco):
+        return [inicio for inicio, _ in agrupar_em_janelas(em_blocos(audio, duracao_bloco), 30, 5)]
+
+    referencia = inicios(200)
+    for duracao_bloco in (45, 70):
+        # O mesmo corte pode cair em outro quadro da mesma pausa, conforme o alinhamento do bloco
+        np.testing.assert_allclose(inicios(duracao_bloco), referencia, atol=0.5 * TAXA_AMOSTRAGEM)
+        for inicio in inicios(duracao_bloco)[1:]:
+            assert audio[inicio] == 0  # Cada corte cai numa pausa
+
+
+def test_ler_blocos_wav_a_partir_de_uma_posicao(tmp_path):
+    audio = (np.arange(5 * TAXA_AMOSTRAGEM) % 1000).astype("<i2")
+    caminho = str(tmp_path / "audio.wav")
+    with wave.open(caminho, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(TAXA_AMOSTRAGEM)
+        f.writeframes(audio.tobytes())
+
+    blocos = list(ler_blocos_wav(caminho, TAXA_AMOSTRAGEM, inicio=2))
+
+    assert [len(bloco) for bloco in blocos] == [TAXA_AMOSTRAGEM] * 3
+    np.testing.assert_allclose(np.concatenate(blocos) * 32768, audio[2 * TAXA_AMOSTRAGEM:])
+
+
+def test_compactador_vad_mapeia_tempos_entre_blocos():
+    silencio = np.zeros(10 * TAXA_AMOSTRAGEM, dtype=np.float32)
+    fala = fala_com_pausas(3, pausas=[])
+    audio = np.concatenate([silencio, fala, silencio, silencio, fala, silencio])  # Falas em 10 s e 33 s
+
+    compactador = CompactadorVAD()
+    compactado = np.concatenate(list(compactador.filtrar(em_blocos(audio, 23))))
+
+    assert len(compactado) < len(audio) / 4
+    assert len(compactador.regioes) == 2
+    assert abs(mapear_tempo(0.5, compactador.mapa) - 10.5) < 0.4
+    segunda_fala = compactador.mapa[1][0]
+    assert abs(mapear_tempo(segunda_fala + 0.5, compactador.mapa) - 33.5) < 0.4
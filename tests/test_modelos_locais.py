@@ -0,0 +1,52 @@
+import sys
+import types
+
+import pytest
+
+import modelos_locais
+
+SHA256 = "a" * 64
+
+
+@pytest.fixture
+def whisper_falso(monkeypatch, tmp_path):
+    modulo = types.ModuleType("whisper")
+    monkeypatch.setitem(sys.modules, "whisper", modulo)
+    monkeypatch.setattr(modelos_locais, "modelos_dir", str(tmp_path))
+    return modulo
+
+
+def test_original_localizado_pela_tabela_de_modelos(whisper_falso, tmp_path):
+    whisper_falso._MODELS = {"small": f"https://exemplo/models/{SHA256}/small.pt"}
+    (tmp_path / "small.pt").write_bytes(b"pesos")
+
+    assert modelos_locais.localizar_original("small") == (str(tmp_path / "small.pt"), SHA256)
+    with pytest.raises(RuntimeError, match="desconhecido"):
+        modelos_locais.localizar_original("enorme")
+
+
+def test_sem_a_tabela_de_modelos_falha_com_mensagem_clara(whisper_falso, tmp_path):
+    with pytest.raises(RuntimeError, match=r"whisper\._MODELS.*caminho do arquivo \.pt"):
+        modelos_locais.localizar_original("small")
+    assert modelos_locais.sha256_oficial("small") is None
+
+    arquivo = tmp_path / "proprio.pt"
+    arquivo.write_bytes(b"pesos")
+    assert modelos_locais.localizar_original(str(arquivo)) == (str(arquivo), None)
+
+
+def test_url_em_outro_formato_nao_gera_checksum(whisper_falso):
+    whisper_falso._MODELS = {"small": "small.pt"}
+    assert modelos_locais.sha256_oficial("small") is None
+
+
+def test_cabecas_do_checkpoint_tem_prioridade_sobre_a_tabela(whisper_falso):
+    whisper_falso._ALIGNMENT_HEADS = {"small": b"tabela"}
+
+    assert modelos_locais.cabecas_alinhamento("small", {"alignment_heads": b"checkpoint"}) == "checkpoint"
+    assert modelos_locais.cabecas_alinhamento("small", {}) == "tabela"
+
+
+def test_sem_cabecas_conhecidas_usa_o_padrao(whisper_falso, capsys):
+    assert modelos_locais.cabecas_alinhamento("small", {}) is None
+    assert "desconhecidas" in capsys.readouterr().out
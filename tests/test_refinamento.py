@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+import checkpoints
+import estimador
+import metricas
+import motores
+import nucleo_transcricao
+from historico import HistoricoTranscricoes
+from nucleo_transcricao import TAXA_AMOSTRAGEM
+from refinamento import TranscricaoRefinada, transcrever_com_refinamento
+
+
+def segmento(inicio, fim, texto):
+    return {"start": inicio, "end": fim, "text": texto}
+
+
+RASCUNHO = [
+    segmento(0, 4, " Bom dia a todos."),
+    segmento(4, 8, " O depoente foi intimado."),
+    segmento(8, 12, " Passo a palavra à defesa."),
+]
+
+
+def textos(segmentos):
+    return [s["text"] for s in segmentos]
+
+
+def test_sem_refinamento_mostra_o_rascunho():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+
+    assert textos(transcricao.segmentos()) == textos(RASCUNHO)
+    assert not any(s["refinado"] or s["alterado"] for s in transcricao.segmentos())
+
+
+def test_refinamento_substitui_so_o_trecho_coberto():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    segmentos = transcricao.refinar([segmento(0, 4.1, " Bom dia a todos."), segmento(4.1, 7.9, " O depoente foi intimidado.")])
+
+    assert textos(segmentos) == [" Bom dia a todos.", " O depoente foi intimidado.", " Passo a palavra à defesa."]
+    assert [s["refinado"] for s in segmentos] == [True, True, False]
+    assert [s["alterado"] for s in segmentos] == [False, True, False]
+
+
+def test_pontuacao_e_caixa_nao_contam_como_alteracao():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    segmentos = transcricao.refinar([segmento(0, 4, " bom dia, a todos")])
+
+    assert segmentos[0]["refinado"] and not segmentos[0]["alterado"]
+
+
+def test_palavras_removidas_marcam_o_segmento_onde_estavam():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    segmentos = transcricao.refinar([segmento(0, 4, " Bom dia."), segmento(4, 8, " O depoente foi intimado.")])
+
+    assert [s["alterado"] for s in segmentos[:2]] == [True, False]
+
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    segmentos = transcricao.refinar([segmento(0, 4, " Bom dia a todos."), segmento(4, 8, " Foi intimado.")])
+
+    assert [s["alterado"] for s in segmentos[:2]] == [False, True]
+
+
+def test_refinamentos_sucessivos_seguem_em_ordem():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    transcricao.refinar([segmento(0, 4, " Bom dia a todos.")])
+    segmentos = transcricao.refinar([segmento(4, 12, " O depoente foi intimado. Passo a palavra à defesa.")])
+
+    assert textos(segmentos) == [" Bom dia a todos.", " O depoente foi intimado. Passo a palavra à defesa."]
+    assert all(s["refinado"] and not s["alterado"] for s in segmentos)
+    assert transcricao.refinar([]) == segmentos
+
+
+def test_concluir_descarta_o_rascunho_nao_coberto():
+    transcricao = TranscricaoRefinada(RASCUNHO)
+    transcricao.refinar([segmento(0, 8, " Bom dia a todos. O depoente foi intimado.")])
+
+    assert textos(transcricao.concluir()) == [" Bom dia a todos. O depoente foi intimado."]
+
+
+class MotorEmTrechos(motores.MotorTranscricao):
+    """Motor falso que entrega um segmento a cada 10 s, como a passagem única do Whisper em fluxo."""
+
+    nome = "em_trechos"
+    modulo = "numpy"
+
+    def carregar(self, modelo, dispositivo, precisao="fp32", threads=None):
+        return modelo
+
+    def transcrever_fluxo(self, modelo_carregado, audio, idioma="pt", contexto=None, ao_avancar=None):
+        duracao = len(audio) / TAXA_AMOSTRAGEM
+        for inicio in range(0, int(duracao), 10):
+            fim = min(inicio + 10, duracao)
+            yield fim, [segmento(inicio, fim, f" {modelo_carregado} {inicio}.")]
+
+
+@pytest.fixture
+def pipeline_falso(tmp_path, monkeypatch):
+    audio = np.full(60 * TAXA_AMOSTRAGEM, 0.1, dtype=np.float32)
+    arquivo = tmp_path / "oitiva.wav"
+    arquivo.write_bytes(b"")
+    monkeypatch.setitem(motores.MOTORES, MotorEmTrechos.nome, MotorEmTrechos())
+    monkeypatch.setattr(nucleo_transcricao, "calcular_duracao_audio", lambda f: len(audio) / TAXA_AMOSTRAGEM)
+    monkeypatch.setattr(nucleo_transcricao, "carregar_audio", lambda f, d, s=True: (audio.copy(), None))
+    monkeypatch.setattr(estimador, "historico", HistoricoTranscricoes(str(tmp_path / "historico.jsonl"), legado=None))
+    monkeypatch.setattr(metricas, "metricas_file", str(tmp_path / "metricas.jsonl"))
+    monkeypatch.setattr(checkpoints, "checkpoints_dir", str(tmp_path / "checkpoints"))
+    return str(arquivo)
+
+
+def test_rascunho_e_substituido_trecho_a_trecho(pipeline_falso):
+    refinados_por_envio = []
+    resultado = transcrever_com_refinamento(
+        pipeline_falso, "medium", motor=MotorEmTrechos.nome, usar_cache=False, usar_vad=False,
+        ao_refinar=lambda segmentos: refinados_por_envio.append(sum(s["refinado"] for s in segmentos)),
+    )
+
+    assert refinados_por_envio == [0, 1, 2, 3, 4, 5, 6, 6]
+    assert textos(resultado["segmentos"])[0] == " medium 0."
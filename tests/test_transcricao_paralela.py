@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from transcricao_paralela import (
+    TAXA_AMOSTRAGEM, calcular_pontos_corte, dividir_em_blocos, remover_texto_repetido, costurar_segmentos
+)
+
+
+def fala_com_pausas(duracao, pausas, duracao_pausa=0.5):
+    """Ruído alto (fala) com pausas silenciosas de duracao_pausa começando nos instantes informados."""
+    audio = 0.3 * np.random.default_rng(0).standard_normal(int(duracao * TAXA_AMOSTRAGEM)).astype(np.float32)
+    for pausa in pausas:
+        audio[int(pausa * TAXA_AMOSTRAGEM):int((pausa + duracao_pausa) * TAXA_AMOSTRAGEM)] = 0
+    return audio
+
+
+def test_pontos_de_corte_caem_nas_pausas_perto_de_cada_alvo():
+    audio = fala_com_pausas(400, pausas=[115, 243])
+    cortes = calcular_pontos_corte(audio, duracao_bloco=120, janela_busca=10)
+
+    assert cortes[0] == 0 and cortes[-1] == len(audio)
+    assert 115 <= cortes[1] / TAXA_AMOSTRAGEM <= 115.5
+    assert 243 <= cortes[2] / TAXA_AMOSTRAGEM <= 243.5  # Alvo contado a partir do corte anterior, não de 240
+    assert len(cortes) == 5
+    assert cortes == sorted(cortes)
+
+
+def test_audio_curto_nao_e_cortado():
+    audio = fala_com_pausas(100, pausas=[50])
+    assert calcular_pontos_corte(audio, duracao_bloco=120, janela_busca=10) == [0, len(audio)]
+
+
+def test_blocos_cobrem_o_audio_com_sobreposicao():
+    audio = fala_com_pausas(400, pausas=[115, 243])
+    blocos = dividir_em_blocos(audio, duracao_bloco=120, sobreposicao=2.0)
+
+    assert blocos[0][0] == blocos[0][1] == 0
+    for (_, _, fim_anterior), (inicio, corte, _) in zip(blocos, blocos[1:]):
+        assert corte == fim_anterior
+        assert corte - inicio == 2 * TAXA_AMOSTRAGEM
+    assert blocos[-1][2] == len(audio)
+
+
+def test_remover_texto_repetido_ignora_pontuacao_e_caixa():
+    assert remover_texto_repetido("e então ele disse que sim.", "Disse que sim, e saiu.") == "e saiu."
+    assert remover_texto_repetido("nada em comum", "outra frase") == "outra frase"
+
+
+def test_costurar_segmentos_descarta_a_sobreposicao():
+    resultados = [
+        (10.0, [{"start": 8.5, "end": 9.5, "text": " repetido."}, {"start": 10.0, "end": 12.0, "text": " Depois do corte."}]),
+        (0.0, [{"start": 0.0, "end": 5.0, "text": " Primeiro bloco."}, {"start": 8.5, "end": 9.5, "text": " repetido."}]),
+    ]
+    segmentos = costurar_segmentos(resultados)
+
+    assert [s["text"] for s in segmentos] == [" Primeiro bloco.", " repetido.", " Depois do corte."]
+    assert [s["start"] for s in segmentos] == pytest.approx([0.0, 8.5, 10.0])
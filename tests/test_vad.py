@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from vad import TAXA_AMOSTRAGEM, detectar_fala, compactar_audio, mapear_tempo, mapear_segmentos, resumir_vad
+
+
+def tom(duracao, amplitude, frequencia=220):
+    t = np.arange(int(duracao * TAXA_AMOSTRAGEM)) / TAXA_AMOSTRAGEM
+    return (amplitude * np.sin(2 * np.pi * frequencia * t)).astype(np.float32)
+
+
+def silencio(duracao):
+    return np.zeros(int(duracao * TAXA_AMOSTRAGEM), dtype=np.float32)
+
+
+def com_ruido(audio, amplitude=0.001):
+    return audio + amplitude * np.random.default_rng(0).standard_normal(len(audio)).astype(np.float32)
+
+
+def em_amostras(*regioes_segundos):
+    return [(int(inicio * TAXA_AMOSTRAGEM), int(fim * TAXA_AMOSTRAGEM)) for inicio, fim in regioes_segundos]
+
+
+def test_compactar_audio_concatena_regioes_e_monta_o_mapa():
+    audio = np.arange(10 * TAXA_AMOSTRAGEM, dtype=np.float32)
+    compactado, mapa = compactar_audio(audio, em_amostras((1, 3), (6, 7)))
+
+    assert len(compactado) == 3 * TAXA_AMOSTRAGEM
+    assert compactado[0] == audio[TAXA_AMOSTRAGEM]
+    assert compactado[2 * TAXA_AMOSTRAGEM] == audio[6 * TAXA_AMOSTRAGEM]
+    assert mapa == [(0.0, 1.0), (2.0, 6.0)]
+
+    vazio, mapa_vazio = compactar_audio(audio, [])
+    assert len(vazio) == 0 and mapa_vazio == []
+
+
+def test_mapear_tempo_devolve_a_linha_do_tempo_original():
+    mapa = [(0.0, 1.0), (2.0, 6.0), (5.0, 20.0)]
+
+    assert mapear_tempo(0.5, mapa) == pytest.approx(1.5)
+    assert mapear_tempo(2.5, mapa) == pytest.approx(6.5)
+    assert mapear_tempo(6.0, mapa) == pytest.approx(21.0)
+    assert mapear_tempo(3.0, []) == 3.0  # Sem VAD, o tempo não muda
+
+
+def test_mapear_tempo_na_juncao_de_regioes():
+    mapa = [(0.0, 1.0), (2.0, 6.0)]
+
+    assert mapear_tempo(2.0, mapa) == pytest.approx(6.0)  # Início: pertence à região seguinte
+    assert mapear_tempo(2.0, mapa, fim=True) == pytest.approx(3.0)  # Fim: pertence à região anterior
+
+
+def test_mapear_segmentos_preserva_os_demais_campos():
+    mapa = [(0.0, 1.0), (2.0, 6.0)]
+    segmentos = mapear_segmentos([{"start": 0.0, "end": 2.0, "text": " a"}, {"start": 2.0, "end": 2.5, "text": " b"}], mapa)
+
+    assert segmentos == [{"start": 1.0, "end": 3.0, "text": " a"}, {"start": 6.0, "end": 6.5, "text": " b"}]
+
+
+def test_detectar_fala_encontra_trechos_entre_silencios():
+    audio = com_ruido(np.concatenate([silencio(5), tom(4, 0.3), silencio(6), tom(3, 0.3), silencio(5)]))
+    regioes = detectar_fala(audio)
+
+    assert len(regioes) == 2
+    for (inicio, fim), (esperado_inicio, esperado_fim) in zip(regioes, [(5, 9), (15, 18)]):
+        assert inicio / TAXA_AMOSTRAGEM == pytest.approx(esperado_inicio, abs=0.4)
+        assert fim / TAXA_AMOSTRAGEM == pytest.approx(esperado_fim, abs=0.4)
+
+    resumo = resumir_vad(len(audio) / TAXA_AMOSTRAGEM, regioes)
+    assert resumo["regioes"] == 2
+    assert resumo["duracao_fala"] == pytest.approx(7, abs=1.5)
+
+
+def test_detectar_fala_une_pausas_curtas_e_descarta_cliques():
+    audio = com_ruido(np.concatenate([
+        silencio(5), tom(2, 0.3), silencio(0.5), tom(2, 0.3),  # Pausa curta: uma região só
+        silencio(6), tom(0.06, 0.5), silencio(6),  # Clique: descartado
+    ]))
+
+    regioes = detectar_fala(audio)
+    assert len(regioes) == 1
+    assert regioes[0][1] / TAXA_AMOSTRAGEM == pytest.approx(9.5, abs=0.4)
+
+
+def test_detectar_fala_mantem_quem_fala_baixo_perto_de_quem_fala_alto():
+    # Cinco minutos de fala alta sem pausas e depois frases 30 dB mais baixas: o percentil global cai na fala alta
+    frases_baixas = [parte for _ in range(4) for parte in (tom(4, 0.5 * 10 ** (-30 / 20), 180), silencio(2))]
+    audio = com_ruido(np.concatenate([tom(300, 0.5)] + frases_baixas), amplitude=0.0005)
+
+    fala = np.zeros(len(audio), dtype=bool)
+    for inicio, fim in detectar_fala(audio):
+        fala[inicio:fim] = True
+
+    fala_baixa = np.concatenate(frases_baixas) != 0
+    assert fala[300 * TAXA_AMOSTRAGEM:][fala_baixa].mean() > 0.99
+
+
+def test_detectar_fala_sem_audio():
+    assert detectar_fala(np.zeros(0, dtype=np.float32)) == []
+    assert resumir_vad(0, [])["percentual_ignorado"] == 0.0
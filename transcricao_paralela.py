@@ -0,0 +1,183 @@
+import os
+import time
+import queue
+import signal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from quantizacao import PRECISAO_PADRAO
+
+TAXA_AMOSTRAGEM = 16000
+DURACAO_BLOCO = 120  # Duração alvo de cada bloco (segundos)
+JANELA_BUSCA_SILENCIO = 10  # Distância máxima (segundos) entre o alvo e o ponto de corte escolhido
+SOBREPOSICAO = 2.0  # Contexto extra (segundos) antes de cada bloco
+DURACAO_QUADRO = 0.03  # Quadro usado no cálculo de energia (segundos)
+ESPERA_ENCERRAMENTO = 5  # Segundos aguardando, no cancelamento, o PID de processos que ainda estão subindo
+
+# 🔥 Modelo carregado uma única vez por processo trabalhador (e o motor que o executa)
+_modelo_worker = None
+_motor_worker = None
+
+
+def calcular_energia(audio, tamanho_quadro):
+    """Calcula a energia RMS de cada quadro do áudio."""
+    n_quadros = len(audio) // tamanho_quadro
+    quadros = audio[:n_quadros * tamanho_quadro].reshape(n_quadros, tamanho_quadro)
+    return np.sqrt(np.einsum("ij,ij->i", quadros, quadros) / tamanho_quadro)
+
+
+def calcular_pontos_corte(audio, duracao_bloco=DURACAO_BLOCO, janela_busca=JANELA_BUSCA_SILENCIO):
+    """Escolhe pontos de corte (em amostras) no trecho mais silencioso perto de cada limite de bloco."""
+    tamanho_quadro = int(DURACAO_QUADRO * TAXA_AMOSTRAGEM)
+    energia = calcular_energia(audio, tamanho_quadro)
+    quadros_por_segundo = TAXA_AMOSTRAGEM / tamanho_quadro
+
+    cortes = [0]
+    alvo = duracao_bloco
+    duracao_total = len(audio) / TAXA_AMOSTRAGEM
+
+    while alvo + janela_busca < duracao_total:
+        inicio = int((alvo - janela_busca) * quadros_por_segundo)
+        fim = int((alvo + janela_busca) * quadros_por_segundo)
+        quadro = inicio + int(np.argmin(energia[inicio:fim]))
+        corte = quadro * tamanho_quadro + tamanho_quadro // 2
+        cortes.append(corte)
+        alvo = corte / TAXA_AMOSTRAGEM + duracao_bloco
+
+    cortes.append(len(audio))
+    return cortes
+
+
+def dividir_em_blocos(audio, duracao_bloco=DURACAO_BLOCO, sobreposicao=SOBREPOSICAO):
+    """Divide o áudio em blocos sobrepostos, cortados em silêncios.
+
+    Retorna uma lista de tuplas (inicio_amostra, corte_amostra, fim_amostra): o bloco começa em
+    inicio_amostra (com a sobreposição), mas só é "dono" do texto a partir de corte_amostra.
+    """
+    cortes = calcular_pontos_corte(audio, duracao_bloco)
+    amostras_sobreposicao = int(sobreposicao * TAXA_AMOSTRAGEM)
+    return [
+        (max(0, cortes[i] - amostras_sobreposicao), cortes[i], cortes[i + 1])
+        for i in range(len(cortes) - 1)
+    ]
+
+
+def remover_texto_repetido(texto_anterior, texto_novo, max_palavras=20):
+    """Remove do início de texto_novo as palavras que repetem o final de texto_anterior."""
+    anteriores = texto_anterior.split()
+    novas = texto_novo.split()
+    limite = min(max_palavras, len(anteriores), len(novas))
+
+    normalizar = lambda palavras: [p.strip(".,;:!?\"'").lower() for p in palavras]
+    for n in range(limite, 0, -1):
+        if normalizar(anteriores[-n:]) == normalizar(novas[:n]):
+            return " ".join(novas[n:])
+    return texto_novo.strip()
+
+
+def costurar_segmentos(resultados):
+    """Junta os segmentos dos blocos em ordem, descartando o que foi transcrito na sobreposição."""
+    segmentos = []
+    for corte, segmentos_bloco in sorted(resultados, key=lambda r: r[0]):
+        for segmento in segmentos_bloco:
+            # Segmentos centrados antes do corte já foram cobertos pelo bloco anterior
+            if (segmento["start"] + segmento["end"]) / 2 < corte:
+                continue
+            texto = segmento["text"].strip()
+            if segmentos:
+                texto = remover_texto_repetido(segmentos[-1]["text"], texto)
+            if texto:
+                segmentos.append({**segmento, "text": " " + texto})
+    return segmentos
+
+
+def _inicializar_worker(modelo, threads_por_worker, precisao=PRECISAO_PADRAO, motor=None, pids=None):
+    """Prepara o processo trabalhador: carrega o modelo pelo motor, limitado às threads do processo.
+
+    Se pids for informado, o processo publica nele o seu PID antes de carregar o modelo.
+    """
+    global _modelo_worker, _motor_worker
+    if pids is not None:
+        pids.put(os.getpid())
+    from motores import obter_motor, MOTOR_PADRAO
+
+    _motor_worker = obter_motor(motor or MOTOR_PADRAO)
+    _modelo_worker = _motor_worker.carregar(modelo, "cpu", precisao, threads=threads_por_worker)
+
+
+def _transcrever_bloco(inicio, corte, audio_bloco, idioma):
+    """Transcreve um bloco e devolve os segmentos na linha do tempo original."""
+    resultado = _motor_worker.transcrever(_modelo_worker, audio_bloco, idioma)
+    deslocamento = inicio / TAXA_AMOSTRAGEM
+    segmentos = [
+        {"start": s["start"] + deslocamento, "end": s["end"] + deslocamento, "text": s["text"]}
+        for s in resultado["segments"]
+    ]
+    return corte / TAXA_AMOSTRAGEM, segmentos
+
+
+def _encerrar_workers(pids, workers, espera=ESPERA_ENCERRAMENTO):
+    """Encerra na hora os processos do pool pelos PIDs que eles publicaram, inclusive os que ainda estão subindo."""
+    limite = time.monotonic() + espera
+    for _ in range(workers):
+        try:
+            pid = pids.get(timeout=max(0, limite - time.monotonic()))
+        except queue.Empty:
+            break
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # O processo já terminou
+
+
+def calcular_workers(workers=None, threads_por_worker=None):
+    """Define quantos processos usar e quantas threads cada um recebe, com base nos núcleos disponíveis."""
+    nucleos = os.cpu_count() or 1
+    workers = workers or int(os.environ.get("TRANSCRITOR_WORKERS", max(1, nucleos // 4)))
+    threads_por_worker = threads_por_worker or max(1, nucleos // workers)
+    return workers, threads_por_worker
+
+
+def transcrever_paralelo(audio, modelo, idioma="pt", workers=None, threads_por_worker=None, ao_concluir=None,
+                         precisao=PRECISAO_PADRAO, motor=None, deve_parar=None):
+    """Transcreve o áudio em blocos distribuídos num pool de processos (somente CPU).
+
+    Se informado, ao_concluir(segundos) recebe o total de áudio já transcrito a cada bloco concluído.
+    Se deve_parar() retornar True, os processos são encerrados na hora e a função retorna None.
+    """
+    workers, threads_por_worker = calcular_workers(workers, threads_por_worker)
+    blocos = dividir_em_blocos(audio)
+    workers = min(workers, len(blocos))
+    from motores import obter_motor, MOTOR_PADRAO
+
+    motor = motor or MOTOR_PADRAO
+    obter_motor(motor).preparar(modelo, precisao)  # Ex.: converte o int8 uma vez aqui, em vez de em cada processo
+    print(f"🧩 {len(blocos)} blocos distribuídos em {workers} processos ({threads_por_worker} threads cada)")
+
+    contexto = multiprocessing.get_context("spawn")  # Evita herdar o estado do torch/Qt do processo principal
+    pids = contexto.Queue()  # PIDs dos processos do pool, para o cancelamento não depender dos internos do executor
+    with ProcessPoolExecutor(max_workers=workers, mp_context=contexto, initializer=_inicializar_worker,
+                             initargs=(modelo, threads_por_worker, precisao, motor, pids)) as pool:
+        futuros = {
+            pool.submit(_transcrever_bloco, inicio, corte, audio[inicio:fim], idioma): (fim - corte) / TAXA_AMOSTRAGEM
+            for inicio, corte, fim in blocos
+        }
+        resultados = []
+        segundos_concluidos = 0
+        pendentes = set(futuros)
+        while pendentes:
+            # Acorda a cada segundo para atender um cancelamento mesmo no meio de blocos longos
+            concluidos, pendentes = wait(pendentes, timeout=1, return_when=FIRST_COMPLETED)
+            if deve_parar and deve_parar():
+                # Encerra os processos já, liberando os modelos, em vez de esperar os blocos em andamento
+                pool.shutdown(wait=False, cancel_futures=True)
+                _encerrar_workers(pids, workers)
+                return None
+            for futuro in concluidos:
+                resultados.append(futuro.result())
+                segundos_concluidos += futuros[futuro]
+                if ao_concluir:
+                    ao_concluir(segundos_concluidos)
+
+    segmentos = costurar_segmentos(resultados)
+    return {"text": "".join(s["text"] for s in segmentos), "segments": segmentos, "language": idioma}
@@ -1,117 +1,104 @@
-import os
-import subprocess
-import whisper
-import torch
-import warnings
-import random
-import time
 from PyQt6.QtCore import QThread, pyqtSignal
-from estimador import atualizar_tempo_real
+from nucleo_transcricao import transcrever_arquivo, MODO_PADRAO, PRECISAO_PADRAO, MOTOR_PADRAO
+from refinamento import transcrever_com_refinamento, MODELO_RASCUNHO
+from fila_transcricao import processar_fila
+from checkpoints import TranscricaoCancelada
 
-# Suprimir warnings desnecessários
-warnings.filterwarnings("ignore", category=UserWarning, module="whisper.transcribe")
-warnings.filterwarnings("ignore", category=FutureWarning, module="whisper")
-
-def criar_diretorio_temp():
-    """Garante que o diretório temp_converter exista."""
-    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp_converter")
-    os.makedirs(temp_dir, exist_ok=True)
-    return temp_dir
-
-def gerar_nome_temporario():
-    """Gera um nome de arquivo temporário único."""
-    return f"temp_audio{random.randint(100000, 999999)}.wav"
-
-def converter_para_wav(input_file, output_dir):
-    """Converte qualquer arquivo de áudio/vídeo para WAV usando FFmpeg."""
-    if not os.path.exists(input_file):
-        raise FileNotFoundError(f"Erro: O arquivo '{input_file}' não foi encontrado.")
-
-    output_file = os.path.join(output_dir, gerar_nome_temporario())
-    
-    try:
-        comando = [
-            "ffmpeg", "-i", input_file, "-ar", "16000", "-ac", "1",
-            "-c:a", "pcm_s16le", output_file, "-y", "-loglevel", "error"
-        ]
-        resultado = subprocess.run(comando, capture_output=True, text=True)
-
-        if resultado.returncode != 0:
-            raise RuntimeError(f"Erro ao converter para WAV: {resultado.stderr}")
-
-        return output_file
-    except Exception as e:
-        raise RuntimeError(f"Erro ao converter para WAV: {e}")
-
-def calcular_duracao_audio(input_file):
-    """Obtém a duração do arquivo de áudio usando FFprobe."""
-    if not os.path.exists(input_file):
-        raise FileNotFoundError(f"Erro: O arquivo '{input_file}' não foi encontrado.")
-
-    comando = [
-        "ffprobe", "-i", input_file, "-v", "error",
-        "-select_streams", "a:0", "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1"
-    ]
-    
-    try:
-        resultado = subprocess.run(comando, capture_output=True, text=True)
-
-        if resultado.returncode != 0:
-            raise RuntimeError(f"Erro ao calcular duração do áudio: {resultado.stderr}")
-
-        return float(resultado.stdout.strip())
-    except Exception as e:
-        raise RuntimeError(f"Erro ao calcular duração do áudio: {e}")
 
 class TranscricaoThread(QThread):
     """Thread para rodar a transcrição sem travar a interface."""
-    transcricao_finalizada = pyqtSignal(str)
+    transcricao_finalizada = pyqtSignal(dict)  # Resultado completo: texto formatado e segmentos com horários
     erro_ocorrido = pyqtSignal(str)
     progresso_atualizado = pyqtSignal(int)
+    tempo_restante_atualizado = pyqtSignal(int)  # Segundos restantes estimados pelo fator de tempo real atual
+    segmentos_decodificados = pyqtSignal(list)  # Segmentos de cada janela, emitidos assim que decodificados
+    transcricao_cancelada = pyqtSignal(float)  # Segundos salvos no checkpoint (0: nada a retomar)
+    transcricao_refinada = pyqtSignal(list)  # Rascunho mesclado com os trechos já refinados (modo rascunho)
 
-    def __init__(self, input_file, modelo="base", dispositivo="cuda"):
+    def __init__(self, input_file, modelo="base", dispositivo="cuda", streaming=True, modo=MODO_PADRAO,
+                 precisao=PRECISAO_PADRAO, motor=MOTOR_PADRAO, usar_vad=True, refinar=False):
         super().__init__()
         self.input_file = input_file
         self.modelo = modelo
-        self.dispositivo = "GPU" if dispositivo == "cuda" else "CPU"
+        self.dispositivo = "GPU" if dispositivo in ("cuda", "GPU") else "CPU"
+        self.streaming = streaming  # Decodifica direto para memória em vez de gravar WAV temporário
+        self.modo = modo
+        self.precisao = precisao  # "int8" usa o modelo quantizado (somente CPU)
+        self.motor = motor  # Motor de inferência (ver motores.py)
+        self.usar_vad = usar_vad  # Decodifica só as regiões com fala
+        self.cancelado = False  # Verificado entre as janelas decodificadas
+        self.refinar = refinar and modelo != MODELO_RASCUNHO  # Rascunho rápido e depois o modelo escolhido
+
+    def cancelar(self):
+        """Pede a interrupção da transcrição; o progresso já concluído fica no checkpoint para ser retomado."""
+        self.cancelado = True
+
+    def reportar_progresso(self, percentual, segundos_restantes):
+        """Repassa o progresso da decodificação para a interface."""
+        self.progresso_atualizado.emit(percentual)
+        self.tempo_restante_atualizado.emit(segundos_restantes)
 
     def run(self):
         """Executa a transcrição do áudio na thread separada."""
-        temp_dir = criar_diretorio_temp()
-        arquivo_wav = None  
-        inicio_transcricao = time.time()
-
         try:
-            duracao = calcular_duracao_audio(self.input_file)
-            print(f"🎵 Duração do áudio: {duracao:.2f} segundos")
             self.progresso_atualizado.emit(0)
+            opcoes = dict(ao_progredir=self.reportar_progresso, precisao=self.precisao, motor=self.motor, usar_vad=self.usar_vad,
+                          deve_parar=lambda: self.cancelado)
+            if self.refinar:
+                resultado = transcrever_com_refinamento(
+                    self.input_file, self.modelo, self.dispositivo, self.modo, self.streaming,
+                    ao_segmentos=self.segmentos_decodificados.emit, ao_refinar=self.transcricao_refinada.emit, **opcoes
+                )
+            else:
+                resultado = transcrever_arquivo(self.input_file, self.modelo, self.dispositivo, self.modo,
+                                                self.streaming, ao_segmentos=self.segmentos_decodificados.emit, **opcoes)
+            self.progresso_atualizado.emit(100)
+            self.transcricao_finalizada.emit(resultado)
+
+        except TranscricaoCancelada as cancelamento:
+            self.transcricao_cancelada.emit(cancelamento.posicao)
 
-            arquivo_wav = converter_para_wav(self.input_file, temp_dir)
+        except Exception as e:
+            self.erro_ocorrido.emit(f"Erro na transcrição: {e}")
 
-            if self.dispositivo == "GPU" and not torch.cuda.is_available():
-                print("⚠️ CUDA não está disponível. Usando CPU.")
-                self.dispositivo = "CPU"
 
-            print("📥 Carregando modelo Whisper...")
-            modelo_whisper = whisper.load_model(self.modelo, device="cuda" if self.dispositivo == "GPU" else "cpu")  
+class FilaTranscricaoThread(QThread):
+    """Thread que processa a fila de trabalhos, reaproveitando o modelo carregado entre os arquivos."""
+    trabalho_iniciado = pyqtSignal(dict)
+    trabalho_concluido = pyqtSignal(dict, str)
+    trabalho_falhou = pyqtSignal(dict, str)
+    fila_finalizada = pyqtSignal(dict)  # Resumo agregado: concluídos, erros, áudio e tempo totais
+    progresso_atualizado = pyqtSignal(int)
+    tempo_restante_atualizado = pyqtSignal(int)
+    segmentos_decodificados = pyqtSignal(list)
+    trabalho_cancelado = pyqtSignal(dict)  # O trabalho volta à fila (e é retomado do checkpoint, se houver)
 
-            print("🔍 Iniciando transcrição...")
-            transcricao = modelo_whisper.transcribe(arquivo_wav, language="pt")
-            
-            # 🔥 Modificação para adicionar '|' entre frases detectadas
-            texto_formatado = " | ".join(transcricao["text"].split('. '))
-            
-            self.transcricao_finalizada.emit(texto_formatado)
+    def __init__(self, por_prioridade=True):
+        super().__init__()
+        self.por_prioridade = por_prioridade
+        self.parar = False  # Interrompe a fila após o trabalho atual
+        self.cancelado = False  # Interrompe também o trabalho atual
 
-            tempo_real = time.time() - inicio_transcricao
-            atualizar_tempo_real(self.modelo, self.dispositivo, duracao, int(tempo_real))
-            print(f"⏳ Tempo real da transcrição: {tempo_real:.2f} segundos")
+    def cancelar(self):
+        """Interrompe o trabalho atual (que volta a ficar pendente) e encerra a fila."""
+        self.parar = self.cancelado = True
 
-        except Exception as e:
-            self.erro_ocorrido.emit(f"Erro na transcrição: {e}")
+    def reportar_progresso(self, percentual, segundos_restantes):
+        """Repassa o progresso do trabalho atual para a interface."""
+        self.progresso_atualizado.emit(percentual)
+        self.tempo_restante_atualizado.emit(segundos_restantes)
 
-        finally:
-            if arquivo_wav and os.path.exists(arquivo_wav):
-                os.remove(arquivo_wav)
-                print(f"🗑️ Arquivo temporário removido: {arquivo_wav}")
+    def run(self):
+        """Executa os trabalhos pendentes em sequência."""
+        resumo = processar_fila(
+            self.por_prioridade,
+            ao_iniciar=self.trabalho_iniciado.emit,
+            ao_concluir=self.trabalho_concluido.emit,
+            ao_falhar=self.trabalho_falhou.emit,
+            ao_progredir=self.reportar_progresso,
+            ao_segmentos=self.segmentos_decodificados.emit,
+            deve_parar=lambda: self.parar,
+            deve_cancelar=lambda: self.cancelado,
+            ao_cancelar=self.trabalho_cancelado.emit,
+        )
+        self.fila_finalizada.emit(resumo)
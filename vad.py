@@ -0,0 +1,122 @@
+from bisect import bisect_left, bisect_right
+import numpy as np
+from transcricao_paralela import calcular_energia
+
+TAXA_AMOSTRAGEM = 16000
+DURACAO_QUADRO = 0.03  # Quadro da análise de energia (segundos)
+MARGEM_RUIDO_DB = 6  # Fala: energia pelo menos esta quantidade de dB acima do ruído de fundo (conservador: na dúvida, é fala)
+PISO_ABSOLUTO_DB = -60  # Abaixo disto (dBFS) é sempre silêncio, mesmo em gravações muito limpas
+PERCENTIL_RUIDO = 10  # Percentil da energia dos quadros tomado como ruído de fundo
+JANELA_RUIDO = 20  # Segundos em volta de cada trecho usados para estimar o ruído de fundo local
+PASSO_RUIDO = 2  # Segundos entre duas estimativas do ruído de fundo local
+SILENCIO_MINIMO = 1.5  # Pausas mais curtas que isto (s) continuam dentro da região de fala
+FALA_MINIMA = 0.25  # Rajadas mais curtas que isto (s) são descartadas (cliques, batidas na mesa)
+MARGEM_REGIAO = 0.3  # Folga (s) antes e depois de cada região, para não cortar o início e o fim das palavras
+
+
+def estimar_ruido(energia_db, quadros_por_segundo):
+    """Ruído de fundo de cada quadro: o percentil baixo da energia nos JANELA_RUIDO segundos em volta dele.
+
+    Um limiar único para a gravação inteira descarta a fala de quem está longe do microfone quando outra
+    pessoa fala bem mais alto. O piso local nunca passa do piso global: num trecho sem pausas, o percentil
+    local seria a própria fala.
+    """
+    global_db = np.percentile(energia_db, PERCENTIL_RUIDO)
+    janela = int(JANELA_RUIDO * quadros_por_segundo)
+    passo = max(int(PASSO_RUIDO * quadros_por_segundo), 1)
+    if len(energia_db) <= janela:
+        return np.full(len(energia_db), global_db)
+
+    # Percentil de janelas deslizantes a cada passo, repetido para os quadros de cada passo
+    janelas = np.lib.stride_tricks.sliding_window_view(energia_db, janela)[::passo]
+    local_db = np.repeat(np.percentile(janelas, PERCENTIL_RUIDO, axis=1), passo)
+    local_db = np.concatenate((np.full(janela // 2, local_db[0]), local_db))  # Cada janela vale para o seu centro
+    local_db = np.pad(local_db[:len(energia_db)], (0, max(len(energia_db) - len(local_db), 0)), mode="edge")
+    return np.minimum(local_db, global_db)
+
+
+def detectar_fala(audio):
+    """Detecta as regiões com fala pela energia dos quadros, com limiar adaptado ao ruído de fundo local.
+
+    Retorna uma lista de tuplas (inicio, fim) em amostras, ordenadas e sem sobreposição.
+    """
+    tamanho_quadro = int(DURACAO_QUADRO * TAXA_AMOSTRAGEM)
+    energia = calcular_energia(audio, tamanho_quadro)
+    if len(energia) == 0:
+        return []
+
+    energia_db = 20 * np.log10(energia + 1e-10)
+    limiar = np.maximum(estimar_ruido(energia_db, TAXA_AMOSTRAGEM / tamanho_quadro) + MARGEM_RUIDO_DB, PISO_ABSOLUTO_DB)
+    fala = energia_db > limiar
+
+    # Bordas das sequências de quadros com fala
+    bordas = np.diff(np.concatenate(([0], fala.astype(np.int8), [0])))
+    inicios, fins = np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)
+
+    quadros_por_segundo = TAXA_AMOSTRAGEM / tamanho_quadro
+    regioes = []
+    for inicio, fim in zip(inicios, fins):
+        if regioes and (inicio - regioes[-1][1]) < SILENCIO_MINIMO * quadros_por_segundo:
+            regioes[-1][1] = fim  # Pausa curta: une com a região anterior
+        else:
+            regioes.append([inicio, fim])
+    regioes = [(inicio, fim) for inicio, fim in regioes if fim - inicio >= FALA_MINIMA * quadros_por_segundo]
+
+    margem = int(MARGEM_REGIAO * TAXA_AMOSTRAGEM)
+    resultado = []
+    for inicio, fim in regioes:
+        inicio = max(0, int(inicio) * tamanho_quadro - margem)
+        fim = min(len(audio), int(fim) * tamanho_quadro + margem)
+        if resultado and inicio <= resultado[-1][1]:
+            resultado[-1] = (resultado[-1][0], fim)  # As margens se encostaram
+        else:
+            resultado.append((inicio, fim))
+    return resultado
+
+
+def compactar_audio(audio, regioes):
+    """Concatena apenas as regiões de fala.
+
+    Retorna (audio_compactado, mapa), onde o mapa tem tuplas (inicio_compactado, inicio_original) em segundos,
+    usado para devolver os tempos à linha do tempo original.
+    """
+    if not regioes:
+        return audio[:0], []
+
+    partes, mapa, posicao = [], [], 0
+    for inicio, fim in regioes:
+        partes.append(audio[inicio:fim])
+        mapa.append((posicao / TAXA_AMOSTRAGEM, inicio / TAXA_AMOSTRAGEM))
+        posicao += fim - inicio
+    return np.concatenate(partes), mapa
+
+
+def mapear_tempo(tempo, mapa, fim=False):
+    """Converte um tempo do áudio compactado para a linha do tempo do arquivo original.
+
+    Um fim de segmento exatamente na junção de duas regiões pertence à região anterior.
+    """
+    if not mapa:
+        return tempo
+    busca = bisect_left if fim else bisect_right
+    indice = max(busca(mapa, tempo, key=lambda item: item[0]) - 1, 0)
+    inicio_compactado, inicio_original = mapa[indice]
+    return inicio_original + (tempo - inicio_compactado)
+
+
+def mapear_segmentos(segmentos, mapa):
+    """Devolve os segmentos transcritos à linha do tempo original."""
+    return [{**s, "start": mapear_tempo(s["start"], mapa), "end": mapear_tempo(s["end"], mapa, fim=True)} for s in segmentos]
+
+
+def resumir_vad(duracao_total, regioes):
+    """Relatório de quanto áudio foi descartado como silêncio."""
+    duracao_fala = sum(fim - inicio for inicio, fim in regioes) / TAXA_AMOSTRAGEM
+    ignorado = max(duracao_total - duracao_fala, 0.0)
+    return {
+        "duracao_total": round(duracao_total, 2),
+        "duracao_fala": round(duracao_fala, 2),
+        "duracao_ignorada": round(ignorado, 2),
+        "percentual_ignorado": round(100 * ignorado / duracao_total, 1) if duracao_total else 0.0,
+        "regioes": len(regioes),
+    }
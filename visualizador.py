@@ -0,0 +1,267 @@
+from bisect import bisect_left, bisect_right
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListView, QApplication, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont, QShortcut, QKeySequence
+from nucleo_transcricao import formatar_texto
+
+
+def formatar_tempo_segmento(segundos):
+    """Converte segundos em HH:MM:SS para exibir ao lado de cada trecho."""
+    segundos = int(segundos)
+    return f"{segundos // 3600:02d}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+
+class ModeloSegmentos(QAbstractListModel):
+    """Armazena os segmentos da transcrição; a lista só pede ao modelo as linhas visíveis."""
+
+    def __init__(self):
+        super().__init__()
+        self.segmentos = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.segmentos)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        segmento = self.segmentos[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"[{formatar_tempo_segmento(segmento['start'])}]  {formatar_texto(segmento['text'])}"
+        if role == Qt.ItemDataRole.EditRole:
+            return segmento["text"].strip()
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{formatar_tempo_segmento(segmento['start'])} – {formatar_tempo_segmento(segmento['end'])}"
+        # Modo rascunho: rascunho ainda não refinado em cinza e itálico, trechos alterados com fundo amarelo
+        if role == Qt.ItemDataRole.ForegroundRole and segmento.get("refinado") is False:
+            return QColor("#6c757d")
+        if role == Qt.ItemDataRole.FontRole and segmento.get("refinado") is False:
+            fonte = QFont()
+            fonte.setItalic(True)
+            return fonte
+        if role == Qt.ItemDataRole.BackgroundRole and segmento.get("alterado"):
+            return QColor("#fff3cd")
+        return None
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, valor, role=Qt.ItemDataRole.EditRole):
+        """Edição do operador: o texto editado passa a valer para a cópia e a exportação."""
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        self.segmentos[index.row()] = {**self.segmentos[index.row()], "text": " " + valor.strip()}
+        self.dataChanged.emit(index, index)
+        return True
+
+    def adicionar(self, segmentos):
+        """Acrescenta segmentos no final (transcrição em andamento)."""
+        if not segmentos:
+            return
+        inicio = len(self.segmentos)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(segmentos) - 1)
+        self.segmentos.extend(segmentos)
+        self.endInsertRows()
+
+    def definir(self, segmentos):
+        """Substitui todos os segmentos."""
+        self.beginResetModel()
+        self.segmentos = list(segmentos)
+        self.endResetModel()
+
+
+class IndiceBusca:
+    """Texto de todos os segmentos em minúsculas, com o início de cada um, para buscar sem percorrer a lista.
+
+    Acréscimos no final são indexados de forma incremental; edições e substituições refazem o índice na próxima busca.
+    """
+
+    def __init__(self):
+        self.partes = []
+        self.inicios = []
+        self.tamanho = 0
+        self.texto = ""
+        self.desatualizado = False
+
+    def sincronizar(self, segmentos):
+        """Atualiza o índice para a lista de segmentos atual."""
+        if self.desatualizado or len(self.inicios) > len(segmentos):
+            self.partes, self.inicios, self.tamanho, self.desatualizado = [], [], 0, False
+        if len(self.inicios) == len(segmentos):
+            return
+        for segmento in segmentos[len(self.inicios):]:
+            parte = segmento["text"].strip().lower() + " "  # Espaço: trechos podem continuar no segmento seguinte
+            self.inicios.append(self.tamanho)
+            self.partes.append(parte)
+            self.tamanho += len(parte)
+        self.texto = "".join(self.partes)
+
+    def buscar(self, termo):
+        """Retorna as linhas (sem repetição, em ordem) onde o termo começa."""
+        termo = termo.strip().lower()
+        linhas = []
+        posicao = self.texto.find(termo) if termo else -1
+        while posicao != -1:
+            linha = bisect_right(self.inicios, posicao) - 1
+            if not linhas or linhas[-1] != linha:
+                linhas.append(linha)
+            posicao = self.texto.find(termo, posicao + 1)
+        return linhas
+
+
+class VisualizadorTranscricao(QWidget):
+    """Exibe a transcrição como uma lista de segmentos com horário, desenhando apenas os visíveis.
+
+    Mantém os segmentos (editáveis com duplo clique) como fonte única para a cópia e a exportação.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.modelo = ModeloSegmentos()
+        self.indice = IndiceBusca()
+        self.resultados = []  # Linhas encontradas pela busca atual
+        self.resultado_atual = -1
+        # Edições e substituições (o refinamento troca o rascunho inteiro) refazem o índice na próxima busca
+        self.modelo.dataChanged.connect(lambda *_: setattr(self.indice, "desatualizado", True))
+        self.modelo.modelReset.connect(lambda: setattr(self.indice, "desatualizado", True))
+        self.initUI()
+
+    def initUI(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        buscaLayout = QHBoxLayout()
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText("Buscar no texto (Ctrl+F)...")
+        self.searchInput.textChanged.connect(self.buscar)
+        self.searchInput.returnPressed.connect(lambda: self.irParaResultado(1))
+        self.searchLabel = QLabel("")
+        btnAnterior = QPushButton("▲")
+        btnAnterior.setFixedWidth(32)
+        btnAnterior.clicked.connect(lambda: self.irParaResultado(-1))
+        btnProximo = QPushButton("▼")
+        btnProximo.setFixedWidth(32)
+        btnProximo.clicked.connect(lambda: self.irParaResultado(1))
+        buscaLayout.addWidget(self.searchInput)
+        buscaLayout.addWidget(self.searchLabel)
+        buscaLayout.addWidget(btnAnterior)
+        buscaLayout.addWidget(btnProximo)
+        layout.addLayout(buscaLayout)
+
+        # Mensagem de espera (exibida no lugar da lista enquanto não há texto)
+        self.messageLabel = QLabel("O texto transcrito aparecerá aqui...")
+        self.messageLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.messageLabel.setWordWrap(True)
+        self.messageLabel.setStyleSheet("color: #6c757d")
+        layout.addWidget(self.messageLabel)
+
+        self.listView = QListView()
+        self.listView.setModel(self.modelo)
+        self.listView.setWordWrap(True)
+        self.listView.setUniformItemSizes(False)
+        self.listView.setLayoutMode(QListView.LayoutMode.Batched)  # Calcula a altura das linhas em lotes
+        self.listView.setBatchSize(200)
+        self.listView.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.listView.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.listView.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked | QAbstractItemView.EditTrigger.EditKeyPressed)
+        self.listView.setStyleSheet("font-size: 14px")
+        self.listView.hide()
+        layout.addWidget(self.listView)
+
+        QShortcut(QKeySequence.StandardKey.Find, self, activated=self.searchInput.setFocus)
+        QShortcut(QKeySequence.StandardKey.Copy, self.listView, activated=self.copiarSelecao)
+
+        self.setLayout(layout)
+
+    def mostrarMensagem(self, mensagem, destaque=False):
+        """Troca a lista por uma mensagem (por exemplo, a de espera no início da transcrição)."""
+        self.modelo.definir([])
+        self.messageLabel.setText(mensagem)
+        self.messageLabel.setStyleSheet("font-size: 24px; font-weight: bold" if destaque else "color: #6c757d")
+        self.messageLabel.show()
+        self.listView.hide()
+
+    def limpar(self):
+        """Remove o texto e a busca."""
+        self.searchInput.clear()
+        self.mostrarMensagem("O texto transcrito aparecerá aqui...")
+
+    def exibirLista(self):
+        if self.listView.isHidden():
+            self.messageLabel.hide()
+            self.listView.show()
+
+    def adicionarSegmentos(self, segmentos):
+        """Acrescenta os trechos recém-decodificados, sem redesenhar os anteriores."""
+        self.exibirLista()
+        self.modelo.adicionar(segmentos)
+        if self.searchInput.text():
+            self.atualizarResultados()
+
+    def definirSegmentos(self, segmentos):
+        """Substitui a transcrição inteira, mantendo a posição de leitura do operador."""
+        self.exibirLista()
+        rolagem = self.listView.verticalScrollBar().value()
+        self.modelo.definir(segmentos)
+        self.listView.verticalScrollBar().setValue(rolagem)
+        if self.searchInput.text():
+            self.atualizarResultados()
+
+    def segmentos(self):
+        """Segmentos atuais, com as edições do operador."""
+        return list(self.modelo.segmentos)
+
+    def texto(self):
+        """Texto completo formatado como no resto do sistema (frases separadas por '|')."""
+        return formatar_texto("".join(s["text"] for s in self.modelo.segmentos))
+
+    def buscar(self, termo):
+        """Atualiza os resultados da busca e vai para o primeiro."""
+        self.indice.sincronizar(self.modelo.segmentos)
+        self.resultados = self.indice.buscar(termo)
+        self.resultado_atual = -1
+        if not termo.strip():
+            self.searchLabel.setText("")
+            return
+        if not self.resultados:
+            self.searchLabel.setText("Nenhum resultado")
+            return
+        self.irParaResultado(1)
+
+    def atualizarResultados(self):
+        """Refaz a busca atual com o texto novo, sem mudar a seleção nem a rolagem (o operador pode estar lendo)."""
+        linha_atual = self.resultados[self.resultado_atual] if self.resultado_atual >= 0 else None
+        self.indice.sincronizar(self.modelo.segmentos)
+        self.resultados = self.indice.buscar(self.searchInput.text())
+        if not self.resultados:
+            self.resultado_atual = -1
+            self.searchLabel.setText("Nenhum resultado")
+            return
+        # Mantém o resultado em foco; se ele deixou de existir, o próximo avanço vai para o seguinte
+        posicao = bisect_left(self.resultados, linha_atual) if linha_atual is not None else 0
+        if linha_atual is not None and posicao < len(self.resultados) and self.resultados[posicao] == linha_atual:
+            self.resultado_atual = posicao
+            self.searchLabel.setText(f"{posicao + 1} de {len(self.resultados)}")
+        else:
+            self.resultado_atual = posicao - 1
+            total = len(self.resultados)
+            self.searchLabel.setText(f"{total} resultado{'s' if total > 1 else ''}")
+
+    def irParaResultado(self, passo):
+        """Seleciona o resultado seguinte (passo 1) ou anterior (passo -1) e rola até ele."""
+        if not self.resultados:
+            return
+        self.resultado_atual = (self.resultado_atual + passo) % len(self.resultados)
+        indice = self.modelo.index(self.resultados[self.resultado_atual])
+        self.listView.setCurrentIndex(indice)
+        self.listView.scrollTo(indice, QAbstractItemView.ScrollHint.PositionAtCenter)
+        self.searchLabel.setText(f"{self.resultado_atual + 1} de {len(self.resultados)}")
+
+    def copiarSelecao(self):
+        """Copia para a área de transferência o texto das linhas selecionadas."""
+        linhas = sorted(indice.row() for indice in self.listView.selectionModel().selectedIndexes())
+        if linhas:
+            texto = formatar_texto("".join(self.modelo.segmentos[linha]["text"] for linha in linhas))
+            QApplication.clipboard().setText(texto)